@@ -1,6 +1,8 @@
 import pygame
 import sys
 import logging
+import threading
+import time
 import cv2
 import numpy as np
 import os
@@ -81,14 +83,28 @@ class ExplorerGUI:
         is_robot: bool = True,
         mqtt_broker_host_ip: str = "localhost",
         mqtt_port: int = 1883,
+        command_transport: str = "mqtt",
+        udp_command_host_ip: Optional[str] = None,
+        udp_command_port: int = 5005,
     ):
         """
         Args:
             background_image_path: Path to the background image file
             command_callback: Callback function for handling commands to PI
+            command_transport: "mqtt" (via broker) or "udp" (direct to the Pi)
+            udp_command_host_ip: Pi IP address for the udp command transport
+            udp_command_port: Pi UDP port for the udp command transport
         """
-        # Initialise core components
-        pygame.init()
+        # Staged startup: only what is needed to draw happens here, the
+        # joystick comes up on the first frame and the transports (gRPC, MQTT/UDP)
+        # on a background thread, so the window is responsive immediately.
+        self._startup_start = time.perf_counter()
+        self.startup_timings = {}
+
+        # Initialise core components (pygame.init() would also bring up audio
+        # and joystick subsystems we don't need to draw the first frame)
+        pygame.display.init()
+        pygame.font.init()
         self.config = GuiConfig()
         self.colours = Colour()
         self.is_robot = is_robot
@@ -102,41 +118,78 @@ class ExplorerGUI:
         # Initialise application state
         self._init_state()
         
-        # Initialise joystick (if present)
-        try:
-            pygame.joystick.init()
-            self.joystick = None
-            if pygame.joystick.get_count() > 0:
-                self.joystick = pygame.joystick.Joystick(0)
-                if not self.joystick.get_init():
-                    self.joystick.init()
-                logger.info(f"Joystick initialised: {self.joystick.get_name()} | axes={self.joystick.get_numaxes()}")
-            else:
-                logger.info("No joystick detected")
-        except Exception as e:
-            self.joystick = None
-            logger.warning(f"Joystick init failed: {e}")
-        
-        # Setup Server and shared frame queue
-        self.server_manager = TialityServerManager(
+        # Joystick is enumerated on the main thread during the first frame
+        self.joystick = None
+        self._joystick_pending = True
+
+        # Setup Server and shared frame queue in the background
+        self.server_manager = None
+        self.transports_ready_event = threading.Event()
+        self._server_manager_kwargs = dict(
             grpc_port = 50051,
             mqtt_port = mqtt_port, 
             mqtt_broker_host_ip = mqtt_broker_host_ip,
             decode_video_func = _decode_video_frame_opencv,
-            num_decode_video_workers = 1 # Don't change this for now
+            num_decode_video_workers = 1, # Don't change this for now
+            command_transport = command_transport,
+            udp_command_host_ip = udp_command_host_ip,
+            udp_command_port = udp_command_port
             )
-        self.server_manager.start_servers()
+        self._transport_thread = threading.Thread(target=self._init_transports, daemon=True)
+        self._transport_thread.start()
 
         # Setup timing
         self.clock = pygame.time.Clock()
         self.running = True
         
+        self._record_startup_phase("gui_ready")
         logger.info("Wildlife Explorer GUI initialised successfully")
 
     # ============================================================================
     # INIT METHODS
     # ============================================================================
 
+    def _record_startup_phase(self, phase: str) -> None:
+        """Record seconds since construction started for a startup phase."""
+        self.startup_timings[phase] = time.perf_counter() - self._startup_start
+        logger.info(f"Startup: {phase} after {self.startup_timings[phase] * 1000:.1f} ms")
+
+    def _init_joystick(self) -> None:
+        """Initialise joystick (if present). Runs on the main thread."""
+        self._joystick_pending = False
+        try:
+            pygame.joystick.init()
+            self.joystick = None
+            if pygame.joystick.get_count() > 0:
+                self.joystick = pygame.joystick.Joystick(0)
+                if not self.joystick.get_init():
+                    self.joystick.init()
+                logger.info(f"Joystick initialised: {self.joystick.get_name()} | axes={self.joystick.get_numaxes()}")
+            else:
+                logger.info("No joystick detected")
+        except Exception as e:
+            self.joystick = None
+            logger.warning(f"Joystick init failed: {e}")
+        self._record_startup_phase("joystick_ready")
+
+    def _init_transports(self) -> None:
+        """Create and start the server manager. Runs on a background thread."""
+        try:
+            server_manager = TialityServerManager(**self._server_manager_kwargs)
+            server_manager.start_servers()
+            self.server_manager = server_manager
+            self._record_startup_phase("transports_started")
+        except Exception as e:
+            logger.error(f"Failed to start servers: {e}")
+        finally:
+            self.transports_ready_event.set()
+
+    def _close_servers(self) -> None:
+        # Startup may still be in progress when the user quits
+        self._transport_thread.join()
+        if self.server_manager is not None and self.server_manager.servers_active:
+            self.server_manager.close_servers()
+
     def _init_fonts(self) -> None:
         self.fonts = {
             'small': pygame.font.Font(None, 20),
@@ -194,6 +247,9 @@ class ExplorerGUI:
         """
         Send command to Pi via callback function 
         """
+        if self.server_manager is None:
+            # Transports still starting up, drop the command
+            return
         try:
             self.server_manager.send_command(command)
             logger.debug(f"Command sent: {command}")
@@ -251,7 +307,7 @@ class ExplorerGUI:
                     waiting_for_input = False
                     
                     if event.type == pygame.QUIT:
-                        self.server_manager.close_servers()
+                        self._close_servers()
                         self.running = False
 
     # ============================================================================
@@ -417,6 +473,8 @@ class ExplorerGUI:
         
         try:
             while self.running:
+                if self._joystick_pending:
+                    self._init_joystick()
                 self.handle_events()
                 self.update()
                 self.clock.tick(self.config.FPS)
@@ -428,7 +486,7 @@ class ExplorerGUI:
     def cleanup(self) -> None:
         """Clean up resources before exit."""
         logger.info("Cleaning up resources...")
-        self.server_manager.close_servers()
+        self._close_servers()
         pygame.quit()
         sys.exit()
 
@@ -444,6 +502,9 @@ if __name__ == "__main__":
     parser.add_argument("--robot", action='store_true', help="Whether to run the robot or sim")
     parser.add_argument("--broker", default="10.1.1.78", help="MQTT broker host/IP for robot mode")
     parser.add_argument("--broker_port", type=int, default=2883, help="MQTT broker TCP port for robot mode")
+    parser.add_argument("--command_transport", default="mqtt", choices=["mqtt", "udp"], help="Send commands via the MQTT broker or directly to the Pi over UDP")
+    parser.add_argument("--robot_ip", default=None, help="Pi IP address for the udp command transport")
+    parser.add_argument("--udp_port", type=int, default=5005, help="Pi UDP port for the udp command transport")
     args = parser.parse_args()
     gui_type = "Robot" if args.robot else "Sim"
     print(f"Wildlife Explorer for {gui_type}")
@@ -464,7 +525,8 @@ if __name__ == "__main__":
         logger.info(f"GUI Command: {command}")
     
     try:
-        gui = ExplorerGUI(image_path, command_callback, args.robot, mqtt_broker_host_ip=args.broker, mqtt_port=args.broker_port)
+        gui = ExplorerGUI(image_path, command_callback, args.robot, mqtt_broker_host_ip=args.broker, mqtt_port=args.broker_port,
+                          command_transport=args.command_transport, udp_command_host_ip=args.robot_ip, udp_command_port=args.udp_port)
         gui.run()
     except KeyboardInterrupt:
         logger.info("Application interrupted by user")
@@ -2,6 +2,9 @@
 import argparse
 import json
 import logging
+import os
+import queue
+import sys
 import threading
 import time
 from typing import List, Tuple, Optional
@@ -37,6 +40,7 @@ MOTOR_POLARITY = [1, 1, 1, 1]
 
 MQTT_BROKER_HOST = "localhost"
 TX_TOPIC = "robot/tx"
+UDP_COMMAND_PORT = 5005
 
 assert len(INPUT_PINS) == 8, "Expect 8 input pins (2 per motor)"
 MOTOR_PAIRS: List[Tuple[int, int]] = [
@@ -289,10 +293,50 @@ def handle_command(ctrl: MotorController, cmd: dict, client: mqtt.Client):
     # TODO: per-motor control if needed later
 
 
+def run_udp(ctrl: MotorController, udp_port: int):
+    """Receive commands straight from the GUI over UDP, newest command wins."""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from tiality_server.command_streaming import udp_subscriber
+
+    command_queue = queue.Queue(maxsize=1)
+    bound_event = threading.Event()
+
+    def decode(payload: bytes):
+        return parse_command(payload.decode("utf-8", errors="ignore"))
+
+    sub_client = udp_subscriber.setup_udp_command_subscriber(udp_port, "0.0.0.0", command_queue, bound_event, decode)
+    if not bound_event.is_set():
+        ctrl.cleanup()
+        return
+
+    logging.info("Motor controller listening for UDP commands on port %s. Press Ctrl+C to stop.", udp_port)
+    try:
+        while True:
+            try:
+                cmd = command_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if not cmd:
+                logging.warning("Unrecognized command payload; ignoring")
+                continue
+            try:
+                handle_command(ctrl, cmd, None)
+            except Exception as e:
+                logging.exception("Error handling command: %s", e)
+    except KeyboardInterrupt:
+        logging.info("Shutting down")
+    finally:
+        sub_client.loop_stop()
+        logging.info("UDP commands received=%d, stale dropped=%d", sub_client.packets_received, sub_client.packets_dropped_stale)
+        ctrl.cleanup()
+
+
 def main():
     parser = argparse.ArgumentParser(description="MQTT -> GPIO PWM motor controller")
     parser.add_argument("--broker", default=MQTT_BROKER_HOST, help="MQTT broker host")
     parser.add_argument("--broker_port", type=int, default=1883, help="MQTT broker TCP port (default: 1883)")
+    parser.add_argument("--transport", default="mqtt", choices=["mqtt", "udp"], help="Receive commands via the MQTT broker or directly from the GUI over UDP")
+    parser.add_argument("--udp_port", type=int, default=UDP_COMMAND_PORT, help=f"UDP port for the udp transport (default: {UDP_COMMAND_PORT})")
     parser.add_argument("--freq", type=int, default=PWM_FREQUENCY_HZ, help="PWM frequency in Hz")
     parser.add_argument("--ramp_ms", type=int, default=DEFAULT_RAMP_MS, help="Default ramp time for spool commands")
     parser.add_argument("--loglevel", default="info", choices=["debug", "info", "warning", "error", "critical"], help="Logging level")
@@ -303,6 +347,10 @@ def main():
 
     ctrl = MotorController(ENABLE_PINS, MOTOR_PAIRS, args.freq)
 
+    if args.transport == "udp":
+        run_udp(ctrl, args.udp_port)
+        return
+
     client = mqtt.Client()
 
     def on_connect(cli, _userdata, _flags, rc):
@@ -38,9 +38,10 @@ echo "--- Parsing arguments ---"
 VIDEO_SERVER=""
 BROKER=""
 BROKER_PORT="1883"
+UDP_PORT=""
 
 usage() {
-    echo "Usage: $0 [--video_server HOST:PORT] [--broker HOST] [--broker_port PORT]"
+    echo "Usage: $0 [--video_server HOST:PORT] [--broker HOST] [--broker_port PORT] [--udp_port PORT]"
 }
 
 while [[ $# -gt 0 ]]; do
@@ -51,6 +52,8 @@ while [[ $# -gt 0 ]]; do
             BROKER="$2"; shift 2;;
         --broker_port)
             BROKER_PORT="$2"; shift 2;;
+        --udp_port)
+            UDP_PORT="$2"; shift 2;;
         -h|--help)
             usage; exit 0;;
         *)
@@ -64,7 +67,9 @@ done
 #     echo "video_server not supplied; video manager will not start"
 # fi
 
-if [ -n "$BROKER" ]; then
+if [ -n "$UDP_PORT" ]; then
+    echo "Using direct UDP commands on port: $UDP_PORT"
+elif [ -n "$BROKER" ]; then
     echo "Using broker: $BROKER:$BROKER_PORT"
 else
     echo "broker not supplied; MQTT->PWM controller will not start"
@@ -84,7 +89,11 @@ echo "--- Starting services ---"
 # Function to start MQTT->PWM controller
 start_mqtt_pwm() {
     echo "Starting MQTT->PWM controller... (Press Ctrl+C to stop all)"
-    python3 "$SCRIPT_DIR/mqtt_to_pwm.py" --broker "$BROKER" --broker_port "$BROKER_PORT" &
+    if [ -n "$UDP_PORT" ]; then
+        python3 "$SCRIPT_DIR/mqtt_to_pwm.py" --transport udp --udp_port "$UDP_PORT" &
+    else
+        python3 "$SCRIPT_DIR/mqtt_to_pwm.py" --broker "$BROKER" --broker_port "$BROKER_PORT" &
+    fi
     MQTT_PID=$!
     echo "MQTT->PWM controller started with PID $MQTT_PID."
 }
@@ -93,13 +102,13 @@ start_mqtt_pwm() {
 if [ -n "$VIDEO_SERVER" ]; then
     start_video_manager
 fi
-if [ -n "$BROKER" ]; then
+if [ -n "$BROKER" ] || [ -n "$UDP_PORT" ]; then
     start_mqtt_pwm
 fi
 
 # If neither service requested, print usage and exit
-if [ -z "$VIDEO_SERVER" ] && [ -z "$BROKER" ]; then
-    echo "No services requested. Provide --video_server and/or --broker."
+if [ -z "$VIDEO_SERVER" ] && [ -z "$BROKER" ] && [ -z "$UDP_PORT" ]; then
+    echo "No services requested. Provide --video_server and/or --broker (or --udp_port)."
     usage
     exit 1
 fi
@@ -0,0 +1,135 @@
+"""
+Command Latency Benchmark
+
+Measures per-command latency from the GUI side command queue (as filled by
+TialityServerManager.send_command) to the decoded command arriving on the
+robot side command queue, over loopback, for both command transports:
+
+    mqtt: publisher -> Mosquitto broker -> subscriber (needs a running broker)
+    udp:  publisher -> subscriber, no broker
+
+Example:
+    mosquitto -p 1883 &
+    python3 benchmarks/command_latency.py --count 2000 --broker localhost --broker_port 1883
+"""
+import argparse
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from tiality_server.command_streaming import publisher, subscriber, udp_publisher
+
+
+def _decode(payload) -> dict:
+    return json.loads(payload)
+
+
+def _send_latest(command_queue: queue.Queue, command: bytes):
+    """Same latest-wins queueing as TialityServerManager.send_command."""
+    try:
+        command_queue.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        command_queue.put_nowait(command)
+    except queue.Full:
+        pass
+
+
+def _measure(command_queue: queue.Queue, received_queue: queue.Queue, count: int, timeout: float):
+    latencies = []
+    lost = 0
+    for i in range(count):
+        command = json.dumps({"type": "vector", "action": "set", "vx": i % 100, "vy": 0, "w": 0, "id": i}).encode()
+        start = time.perf_counter()
+        _send_latest(command_queue, command)
+        while True:
+            try:
+                received = received_queue.get(timeout=timeout)
+            except queue.Empty:
+                lost += 1
+                break
+            if received.get("id") == i:
+                latencies.append(time.perf_counter() - start)
+                break
+    return latencies, lost
+
+
+def run_transport(transport: str, args) -> dict:
+    command_queue = queue.Queue(maxsize=1)
+    received_queue = queue.Queue(maxsize=1)
+    shutdown_event = threading.Event()
+    connected_event = threading.Event()
+
+    if transport == "udp":
+        sub_client = subscriber.setup_command_subscriber(args.udp_port, "127.0.0.1", received_queue, "robot/tx", connected_event, _decode, transport="udp")
+        worker = threading.Thread(target=udp_publisher.publish_commands_worker_udp, args=(args.udp_port, "127.0.0.1", command_queue, shutdown_event))
+    else:
+        sub_client = subscriber.setup_command_subscriber(args.broker_port, args.broker, received_queue, "robot/tx", connected_event, _decode)
+        worker = threading.Thread(target=publisher.publish_commands_worker, args=(args.broker_port, args.broker, command_queue, "robot/tx", shutdown_event))
+
+    if not connected_event.is_set():
+        return {"transport": transport, "skipped": "subscriber could not connect"}
+
+    worker.start()
+    try:
+        # Warm up connections / subscriptions before timing
+        _measure(command_queue, received_queue, args.warmup, args.timeout)
+        latencies, lost = _measure(command_queue, received_queue, args.count, args.timeout)
+    finally:
+        shutdown_event.set()
+        worker.join()
+        sub_client.loop_stop()
+
+    if not latencies:
+        return {"transport": transport, "skipped": f"no commands received ({lost} lost)"}
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "transport": transport,
+        "count": len(latencies_ms),
+        "lost": lost,
+        "mean_ms": statistics.fmean(latencies_ms),
+        "p50_ms": latencies_ms[len(latencies_ms) // 2],
+        "p99_ms": latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))],
+        "max_ms": latencies_ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback per-command latency, MQTT vs direct UDP")
+    parser.add_argument("--count", type=int, default=1000, help="Commands to time per transport")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed commands sent first")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Seconds before a command counts as lost")
+    parser.add_argument("--broker", default="localhost", help="MQTT broker host")
+    parser.add_argument("--broker_port", type=int, default=1883, help="MQTT broker TCP port")
+    parser.add_argument("--udp_port", type=int, default=5005, help="Loopback UDP port")
+    parser.add_argument("--transports", nargs="+", default=["mqtt", "udp"], choices=["mqtt", "udp"])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run_transport(transport, args) for transport in args.transports]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'transport':<10}{'count':>8}{'lost':>6}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['transport']:<10} skipped: {result['skipped']}")
+            continue
+        print(f"{result['transport']:<10}{result['count']:>8}{result['lost']:>6}"
+              f"{result['mean_ms']:>10.3f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Import / Startup Time Benchmark
+
+Import time: runs a fresh interpreter with `python -X importtime` for each
+scenario and reports the total import time plus the slowest modules.
+Startup time: times how long TialityServerManager construction and
+start_servers() take to return, and optionally how long ExplorerGUI takes to
+become ready to draw (with SDL's dummy video driver).
+
+--pi-profile pins the import runs to a single core to approximate a Pi
+Zero 2 class CPU, and each scenario lists the GUI/codec extras (pygame, cv2,
+numpy, ...) it pulled in, which should be none for the Pi scenarios.
+
+Example:
+    python3 benchmarks/startup_time.py
+    python3 benchmarks/startup_time.py --gui --json
+    python3 benchmarks/startup_time.py --pi-profile --scenarios package pi_video_client udp_subscriber
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Statement run in the child interpreter for each import scenario
+IMPORT_SCENARIOS = {
+    "package": "import tiality_server",
+    "pi_video_client": "import tiality_server; tiality_server.client; tiality_server.video_streaming_pb2",
+    "command_subscriber": "import tiality_server; tiality_server.subscriber",
+    "udp_subscriber": "import tiality_server; tiality_server.udp_subscriber",
+    "server_manager": "from tiality_server import TialityServerManager",
+    # What the connection manager thread imports once start_servers() is called
+    "server_transports": "import tiality_server; tiality_server.server; tiality_server.decoder_worker; tiality_server.publisher",
+}
+
+# Optional GUI/codec extras that the transport core must not import
+EXTRAS_MODULES = ("pygame", "cv2", "numpy", "PIL", "serial", "OpenGL")
+
+# Single core, like a Pi Zero 2 running the video client next to the motor controller
+PI_PROFILE_CPU_LIST = "0"
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        Tuple[float, List[Tuple[str, float, float]]]: total ms, and (module, self ms, cumulative ms) per module
+    """
+    modules = []
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        self_us = int(self_us)
+        # Nested imports are indented by two extra spaces per level
+        modules.append((name.rstrip()[1:], self_us / 1000, int(cumulative_us) / 1000))
+        total_us += self_us
+    return total_us / 1000, modules
+
+
+def measure_import(statement: str, repeat: int, cpu_list: str = None) -> dict:
+    command = [sys.executable, "-X", "importtime", "-c", statement]
+    if cpu_list is not None:
+        command = ["taskset", "-c", cpu_list] + command
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(command, cwd=parent_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        runs.append(parse_importtime(result.stderr))
+
+    # Report the fastest run, the others are mostly disk cache noise
+    total_ms, modules = min(runs, key=lambda run: run[0])
+    top_level = sorted((m for m in modules if not m[0].startswith(" ")), key=lambda m: m[2], reverse=True)
+    loaded = {name.split(".")[0] for name, _self, _cumulative in modules}
+    return {
+        "total_ms": total_ms,
+        "modules_imported": len(modules),
+        "extras_imported": [name for name in EXTRAS_MODULES if name in loaded],
+        "slowest": [{"module": name.strip(), "cumulative_ms": cumulative} for name, _self, cumulative in top_level[:8]],
+    }
+
+
+def measure_server_startup() -> dict:
+    sys.path.append(parent_dir)
+    import threading
+    from tiality_server import TialityServerManager
+
+    start = time.perf_counter()
+    manager = TialityServerManager(
+        grpc_port=0,
+        mqtt_port=1883,
+        mqtt_broker_host_ip="localhost",
+        decode_video_func=lambda frame_bytes: frame_bytes,
+        num_decode_video_workers=1,
+        command_transport="udp",
+        udp_command_host_ip="127.0.0.1",
+        )
+    constructed = time.perf_counter()
+    manager.start_servers()
+    started = time.perf_counter()
+    # Time until the manager thread has brought every worker up
+    manager.connection_established_event.wait(timeout=30)
+    workers_up = time.perf_counter()
+    manager.close_servers()
+    return {
+        "construct_ms": (constructed - start) * 1000,
+        "start_servers_returns_ms": (started - constructed) * 1000,
+        "workers_running_ms": (workers_up - constructed) * 1000,
+        "threads_left": threading.active_count() - 1,
+    }
+
+
+def measure_gui_startup() -> dict:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.path.append(os.path.join(parent_dir, "GUI"))
+    start = time.perf_counter()
+    import gui
+    imported = time.perf_counter()
+    explorer = gui.ExplorerGUI("", is_robot=True, command_transport="udp", udp_command_host_ip="127.0.0.1")
+    ready_to_draw = time.perf_counter()
+    explorer.transports_ready_event.wait(timeout=30)
+    transports_ready = time.perf_counter()
+    explorer._close_servers()
+    gui.pygame.quit()
+    return {
+        "import_gui_ms": (imported - start) * 1000,
+        "ready_to_draw_ms": (ready_to_draw - imported) * 1000,
+        "transports_started_ms": (transports_ready - imported) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tiality_server import time and GUI/server startup time")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per import scenario")
+    parser.add_argument("--scenarios", nargs="+", default=list(IMPORT_SCENARIOS), choices=list(IMPORT_SCENARIOS))
+    parser.add_argument("--gui", action="store_true", help="Also time ExplorerGUI startup (needs pygame/cv2)")
+    parser.add_argument("--pi-profile", action="store_true", help="Pin import runs to one core (Pi-class CPU)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    cpu_list = PI_PROFILE_CPU_LIST if args.pi_profile else None
+    report = {"python": sys.version.split()[0], "pi_profile": args.pi_profile, "imports": {}, "startup": {}}
+    for scenario in args.scenarios:
+        report["imports"][scenario] = measure_import(IMPORT_SCENARIOS[scenario], args.repeat, cpu_list)
+    report["startup"]["server_manager"] = measure_server_startup()
+    if args.gui:
+        report["startup"]["gui"] = measure_gui_startup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("Import time (fastest of %d runs)" % args.repeat)
+    for scenario, result in report["imports"].items():
+        if "error" in result:
+            print(f"  {scenario:<28} error: {result['error']}")
+            continue
+        extras = ", ".join(result["extras_imported"]) or "none"
+        print(f"  {scenario:<28} {result['total_ms']:8.1f} ms  ({result['modules_imported']} modules, extras: {extras})")
+        for module in result["slowest"][:3]:
+            print(f"      {module['module']:<32} {module['cumulative_ms']:8.1f} ms")
+    print("Startup time")
+    for name, timings in report["startup"].items():
+        print(f"  {name}")
+        for key, value in timings.items():
+            print(f"      {key:<28} {value:8.1f}" if isinstance(value, float) else f"      {key:<28} {value:8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,37 @@
-# Video imports
-from .video_streaming import client
-from .video_streaming import server
-from .video_streaming import decoder_worker
-from .video_streaming import video_streaming_pb2
-from .video_streaming import video_streaming_pb2_grpc
-from .command_streaming import publisher
-from .command_streaming import subscriber
-from .server_manager import TialityServerManager
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562) so that importing
+# the package stays cheap, e.g. the Pi only pays for grpc when it touches
+# tiality_server.client, and the GUI can draw before paho/grpc are loaded.
+_LAZY_ATTRIBUTES = {
+    # Video imports
+    "client": (".video_streaming.client", None),
+    "server": (".video_streaming.server", None),
+    "decoder_worker": (".video_streaming.decoder_worker", None),
+    "video_streaming_pb2": (".video_streaming.video_streaming_pb2", None),
+    "video_streaming_pb2_grpc": (".video_streaming.video_streaming_pb2_grpc", None),
+    # Command imports
+    "publisher": (".command_streaming.publisher", None),
+    "subscriber": (".command_streaming.subscriber", None),
+    "udp_publisher": (".command_streaming.udp_publisher", None),
+    "udp_subscriber": (".command_streaming.udp_subscriber", None),
+    "TialityServerManager": (".server_manager", "TialityServerManager"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    # Cache so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
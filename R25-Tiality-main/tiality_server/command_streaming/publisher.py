@@ -1,17 +1,14 @@
 import logging
-import sys
-import argparse
-from typing import Optional
+import queue
 
-import cv2
-import grpc
-import numpy as np
 import paho.mqtt.client as mqtt
-import pygame
-import queue
 
 def connect_mqtt(mqtt_port: int, broker_host_ip: str) -> mqtt.Client:
-    """Initialise and connect an MQTT client (loop runs in background)."""
+    """
+    Initialise an MQTT client and connect in the background.
+    connect_async returns immediately; the network loop connects (and reconnects)
+    so a slow or missing broker never blocks startup.
+    """
     client = mqtt.Client()
 
     def _on_connect(cli, _userdata, _flags, rc):
@@ -21,7 +18,7 @@ def connect_mqtt(mqtt_port: int, broker_host_ip: str) -> mqtt.Client:
             logging.error("Failed to connect to MQTT broker (rc=%s)", rc)
 
     client.on_connect = _on_connect
-    client.connect(broker_host_ip, mqtt_port, 60)
+    client.connect_async(broker_host_ip, mqtt_port, 60)
     client.loop_start()
     return client
 
@@ -40,8 +37,8 @@ def publish_commands_worker(mqtt_port: int, broker_host_ip: str, command_queue:
     try:
         while not shutdown_event.is_set():
             try:            
-                # Attempt to retrieve new command
-                command = command_queue.get_nowait()
+                # Attempt to retrieve new command, block briefly rather than spin
+                command = command_queue.get(timeout=0.1)
 
                 # Send command when available
                 publish_command(command, mqtt_client, topic)
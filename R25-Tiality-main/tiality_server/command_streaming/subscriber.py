@@ -1,12 +1,10 @@
 #!/usr/bin/env python3
 import logging
-import argparse
-import serial
 import paho.mqtt.client as mq
-import time
 import queue
 from dataclasses import dataclass
 from typing import Callable
+from . import udp_subscriber
 
 @dataclass
 class mqtt_subscriber_dataclass():
@@ -66,11 +64,25 @@ def on_message(client, userdata, msg):
         print(f"Unknown Exception: {e}")
 
 
-def setup_command_subscriber(mqtt_port: int, broker_host_ip: str, command_queue: queue.Queue, tx_topic: str, connection_established_event, message_decode_func: Callable[[str], dict]) -> mq.Client:
+def setup_command_subscriber(mqtt_port: int, broker_host_ip: str, command_queue: queue.Queue, tx_topic: str, connection_established_event, message_decode_func: Callable[[str], dict], transport: str = "mqtt") -> mq.Client:
     """
     RUN IN SEPERATE THREAD
     Run method 
+
+    With transport="udp" commands are received directly from the GUI instead of
+    through the broker: mqtt_port is the UDP port to listen on, broker_host_ip the
+    local interface to bind ("0.0.0.0" for all) and tx_topic is unused.
+    The returned client supports loop_start / loop_stop for either transport.
     """
+    assert transport in ("mqtt", "udp"), f"Unknown command transport: {transport}"
+    if transport == "udp":
+        return udp_subscriber.setup_udp_command_subscriber(
+            udp_port=mqtt_port,
+            bind_host_ip=broker_host_ip,
+            command_queue=command_queue,
+            connection_established_event=connection_established_event,
+            message_decode_func=message_decode_func
+            )
 
     # Setup subscriber client
     sub_client = mq.Client()
@@ -0,0 +1,57 @@
+import os
+import struct
+from typing import Optional, Tuple
+
+# Datagram layout: magic | version | session id | sequence number | payload
+UDP_COMMAND_HEADER = struct.Struct("!2sBIQ")
+UDP_COMMAND_MAGIC = b"TC"
+UDP_COMMAND_VERSION = 1
+
+# Commands are small JSON strings, keep well under a typical MTU
+UDP_COMMAND_MAX_DATAGRAM_SIZE = 1400
+
+
+def new_session_id() -> int:
+    """
+    Random 32-bit id identifying one publisher run, so the subscriber can
+    reset its sequence tracking when the GUI is restarted.
+    """
+    return int.from_bytes(os.urandom(4), "big")
+
+
+def encode_command_datagram(session_id: int, sequence_number: int, command) -> bytes:
+    """
+    Pack a command into a sequence-numbered datagram.
+
+    Args:
+        session_id (int): Id of the publishing session
+        sequence_number (int): Monotonically increasing number within the session
+        command (bytes | str): Encoded command, as passed to send_command
+
+    Returns:
+        bytes: Datagram ready to be sent
+    """
+    if isinstance(command, str):
+        command = command.encode("utf-8")
+    datagram = UDP_COMMAND_HEADER.pack(UDP_COMMAND_MAGIC, UDP_COMMAND_VERSION, session_id, sequence_number) + command
+    if len(datagram) > UDP_COMMAND_MAX_DATAGRAM_SIZE:
+        raise ValueError(f"Command too large for a single datagram ({len(datagram)} bytes)")
+    return datagram
+
+
+def decode_command_datagram(datagram: bytes) -> Optional[Tuple[int, int, bytes]]:
+    """
+    Unpack a datagram produced by encode_command_datagram.
+
+    Args:
+        datagram (bytes): Raw datagram
+
+    Returns:
+        Optional[Tuple[int, int, bytes]]: (session_id, sequence_number, payload), or None if the datagram is not a valid command
+    """
+    if len(datagram) < UDP_COMMAND_HEADER.size:
+        return None
+    magic, version, session_id, sequence_number = UDP_COMMAND_HEADER.unpack_from(datagram)
+    if magic != UDP_COMMAND_MAGIC or version != UDP_COMMAND_VERSION:
+        return None
+    return session_id, sequence_number, datagram[UDP_COMMAND_HEADER.size:]
@@ -0,0 +1,40 @@
+import socket
+import queue
+from .udp_protocol import encode_command_datagram, new_session_id
+
+def publish_commands_worker_udp(udp_port: int, robot_host_ip: str, command_queue: queue.Queue, shutdown_event):
+    """
+    Broker-less alternative to publish_commands_worker.
+    Sends each command straight to the robot as a sequence-numbered UDP datagram.
+    Delivery is best effort, the subscriber keeps only the newest command.
+
+    Args:
+        udp_port (int): UDP port the robot is listening on
+        robot_host_ip (str): IP address of the robot
+        command_queue (queue.Queue): Queue to read commands off of
+        shutdown_event (threading.Event): Set to stop the worker
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = (robot_host_ip, udp_port)
+    session_id = new_session_id()
+    sequence_number = 0
+    print(f"Sending commands over UDP to {robot_host_ip}:{udp_port}")
+
+    try:
+        while not shutdown_event.is_set():
+            try:
+                # Block briefly so a new command is sent as soon as it is queued
+                command = command_queue.get(timeout=0.1)
+            except queue.Empty:
+                # No command in queue
+                continue
+
+            sequence_number += 1
+            try:
+                sock.sendto(encode_command_datagram(session_id, sequence_number, command), address)
+            except (OSError, ValueError) as exc:
+                print(f"Failed to send UDP command: {exc}")
+
+    finally:
+        sock.close()
+        print("UDP Commands Worker Thread shutting down")
@@ -0,0 +1,149 @@
+import socket
+import threading
+import queue
+from collections import deque
+from typing import Callable, Optional
+from .udp_protocol import decode_command_datagram, UDP_COMMAND_MAX_DATAGRAM_SIZE
+
+class UdpCommandSubscriber:
+    """
+    Receives sequence-numbered command datagrams sent by publish_commands_worker_udp.
+
+    Latest-wins: a datagram whose sequence number is not newer than the last
+    accepted one is a late or duplicated packet and is dropped. A publisher
+    restart shows up as a session id that has never been seen; sessions that
+    have been replaced are retired, so late packets from them are dropped too
+    instead of switching tracking back to the old session. Exposes
+    loop_start / loop_stop so it can be used wherever the MQTT subscriber client is.
+
+    Args:
+        udp_port (int): UDP port to listen on
+        bind_host_ip (str): Local interface to bind, "0.0.0.0" for all
+        command_queue (queue.Queue): Queue the newest decoded command is placed on
+        connection_established_event (threading.Event): Set once the socket is bound
+        message_decode_func (Callable[[bytes], dict]): Decoding function to decode command messages to a dictionary.
+    """
+
+    # Replaced session ids remembered, far more than publisher restarts that can
+    # overlap with packets still in flight
+    RETIRED_SESSIONS_KEPT = 16
+
+    def __init__(self, udp_port: int, bind_host_ip: str, command_queue: queue.Queue, connection_established_event, message_decode_func: Callable[[bytes], dict]):
+        self.udp_port = udp_port
+        self.bind_host_ip = bind_host_ip
+        self.command_queue = command_queue
+        self.connection_established_event = connection_established_event
+        self.message_decode_func = message_decode_func
+
+        self.sock = None
+        self._receive_thread = None
+        self._stop_event = threading.Event()
+
+        # Sequence tracking, reset whenever a never-seen publisher session appears
+        self.session_id: Optional[int] = None
+        self.last_sequence_number = 0
+        # Recently replaced sessions, whose packets are always stale
+        self.retired_session_ids = deque(maxlen=self.RETIRED_SESSIONS_KEPT)
+
+        # Counters
+        self.packets_received = 0
+        self.packets_dropped_stale = 0
+        self.packets_dropped_invalid = 0
+
+    def bind(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.bind_host_ip, self.udp_port))
+        # Timeout lets the receive loop notice loop_stop
+        self.sock.settimeout(0.2)
+        self.connection_established_event.set()
+
+    def loop_start(self):
+        self._stop_event.clear()
+        self._receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self._receive_thread.start()
+
+    def loop_stop(self):
+        self._stop_event.set()
+        if self._receive_thread is not None:
+            self._receive_thread.join()
+            self._receive_thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _is_newest(self, session_id: int, sequence_number: int) -> bool:
+        if session_id != self.session_id:
+            if session_id in self.retired_session_ids:
+                # Late packet from a publisher session that has since been replaced
+                return False
+            # New publisher, start tracking its sequence from scratch
+            if self.session_id is not None:
+                self.retired_session_ids.append(self.session_id)
+            self.session_id = session_id
+            self.last_sequence_number = sequence_number
+            return True
+        if sequence_number <= self.last_sequence_number:
+            return False
+        self.last_sequence_number = sequence_number
+        return True
+
+    def _receive_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                datagram, _address = self.sock.recvfrom(UDP_COMMAND_MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            decoded = decode_command_datagram(datagram)
+            if decoded is None:
+                self.packets_dropped_invalid += 1
+                continue
+            session_id, sequence_number, payload = decoded
+            self.packets_received += 1
+
+            if not self._is_newest(session_id, sequence_number):
+                self.packets_dropped_stale += 1
+                continue
+
+            try:
+                # Clear any old command that hasn't been used yet.
+                self.command_queue.get_nowait()
+            except queue.Empty:
+                # This is normal, the queue was already empty.
+                pass
+
+            try:
+                # Put the newest, most relevant command into the queue.
+                command = self.message_decode_func(payload)
+                self.command_queue.put_nowait(command)
+            except queue.Full:
+                # Receiver is processing a command already.
+                pass
+            except Exception as e:
+                print(f"Unknown Exception: {e}")
+
+
+def setup_udp_command_subscriber(udp_port: int, bind_host_ip: str, command_queue: queue.Queue, connection_established_event, message_decode_func: Callable[[bytes], dict]) -> UdpCommandSubscriber:
+    """
+    Bind a UdpCommandSubscriber and start its receive thread.
+    """
+    sub_client = UdpCommandSubscriber(
+        udp_port=udp_port,
+        bind_host_ip=bind_host_ip,
+        command_queue=command_queue,
+        connection_established_event=connection_established_event,
+        message_decode_func=message_decode_func
+        )
+
+    try:
+        sub_client.bind()
+    except OSError as e:
+        print(f"Could not bind UDP command socket on {bind_host_ip}:{udp_port}: {e}")
+
+    if connection_established_event.is_set():
+        sub_client.loop_start()
+
+    return sub_client
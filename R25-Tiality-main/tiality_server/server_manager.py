@@ -1,10 +1,10 @@
 import threading
 import queue
-from typing import Callable
+from typing import Callable, Optional
 from .server_utils import _connection_manager_worker
 
 class TialityServerManager:
-    def __init__(self, grpc_port: int, mqtt_port: int, mqtt_broker_host_ip: str, decode_video_func, num_decode_video_workers: int):
+    def __init__(self, grpc_port: int, mqtt_port: int, mqtt_broker_host_ip: str, decode_video_func, num_decode_video_workers: int, command_transport: str = "mqtt", udp_command_host_ip: Optional[str] = None, udp_command_port: int = 5005):
         """
         Tiality Robot Server Manager
 
@@ -16,11 +16,17 @@ class TialityServerManager:
             mqtt_broker_host_ip (str): _description_
             decode_video_func (Callable): _description_
             num_decode_video_workers (int): KEEP THIS AT 1 FOR NOW, DOES NOT SCALE WELL
+            command_transport (str): "mqtt" to publish commands through the broker, "udp" to send them straight to the robot
+            udp_command_host_ip (Optional[str]): IP of the robot, required for the udp transport
+            udp_command_port (int): UDP port the robot listens on for commands
         """
         self.servers_active = False
         self.decode_video_func = decode_video_func
         assert num_decode_video_workers >= 1, "Must have at least one worker decoding video"
         self.num_decode_video_workers = num_decode_video_workers
+        assert command_transport in ("mqtt", "udp"), f"Unknown command transport: {command_transport}"
+        assert command_transport != "udp" or udp_command_host_ip, "udp command transport requires the robot IP"
+        self.command_transport = command_transport
 
         # Define shared, thread-safe queues
         self.incoming_video_queue = queue.Queue(maxsize=1)
@@ -33,6 +39,8 @@ class TialityServerManager:
         self.mqtt_broker_host_ip = mqtt_broker_host_ip  # Change to your laptop/host running Mosquitto
         self.tx_topic = "robot/tx"
         self.rx_topic = "robot/rx"
+        self.udp_command_host_ip = udp_command_host_ip
+        self.udp_command_port = udp_command_port
         
         self._connection_manager_thread = None
 
@@ -86,7 +94,10 @@ class TialityServerManager:
                 self.connection_established_event, 
                 self.shutdown_event,
                 self.decode_video_func,
-                self.num_decode_video_workers))
+                self.num_decode_video_workers,
+                self.command_transport,
+                self.udp_command_host_ip,
+                self.udp_command_port))
         self._connection_manager_thread.start()
 
         self.servers_active = True
@@ -1,11 +1,11 @@
 import socket
 import threading
 import queue
-from .video_streaming import server as video_server
-from .video_streaming import decoder_worker
-from .command_streaming import publisher as command_publisher
 
-def _connection_manager_worker(grpc_port, incoming_video_queue, decoded_video_queue, mqtt_broker_host_ip, mqtt_port, tx_topic, rx_topic, command_queue, connection_established_event, shutdown_event, decode_video_func, num_decode_video_workers):
+# How often the connection manager checks on its worker threads
+CONNECTION_MANAGER_POLL_SECONDS = 0.5
+
+def _connection_manager_worker(grpc_port, incoming_video_queue, decoded_video_queue, mqtt_broker_host_ip, mqtt_port, tx_topic, rx_topic, command_queue, connection_established_event, shutdown_event, decode_video_func, num_decode_video_workers, command_transport="mqtt", udp_command_host_ip=None, udp_command_port=5005):
     """
     Thread to manage all connections.
     These threads include:
@@ -24,7 +24,18 @@ def _connection_manager_worker(grpc_port, incoming_video_queue, decoded_video_qu
         shutdown_event (_type_): _description_
         decode_video_func (_type_): _description_
         num_decode_video_workers (_type_): _description_
+        command_transport (str): "mqtt" or "udp", selects the command sender worker
+        udp_command_host_ip (str): Robot IP for the udp command transport
+        udp_command_port (int): Robot UDP port for the udp command transport
     """
+    # Transport imports (grpc, paho) happen here, on the connection manager
+    # thread, so starting the servers never blocks the caller
+    from .video_streaming import server as video_server
+    from .video_streaming import decoder_worker
+    if command_transport == "udp":
+        from .command_streaming import udp_publisher as command_udp_publisher
+    else:
+        from .command_streaming import publisher as command_publisher
 
     video_producer_thread = None
     video_decoder_threads = [None for _ in range(num_decode_video_workers)]
@@ -64,20 +75,33 @@ def _connection_manager_worker(grpc_port, incoming_video_queue, decoded_video_qu
                 if type(command_sender_thread) == type(None) or not command_sender_thread.is_alive():
                     print("Waiting for Command Sending Connection")
                     # Create the command worker for this connection
-                    command_sender_thread = threading.Thread(
-                        target=command_publisher.publish_commands_worker, 
-                        args=(
-                            mqtt_port, 
-                            mqtt_broker_host_ip, 
-                            command_queue, 
-                            tx_topic, 
-                            shutdown_event
-                            ))
+                    if command_transport == "udp":
+                        command_sender_thread = threading.Thread(
+                            target=command_udp_publisher.publish_commands_worker_udp,
+                            args=(
+                                udp_command_port,
+                                udp_command_host_ip,
+                                command_queue,
+                                shutdown_event
+                                ))
+                    else:
+                        command_sender_thread = threading.Thread(
+                            target=command_publisher.publish_commands_worker, 
+                            args=(
+                                mqtt_port, 
+                                mqtt_broker_host_ip, 
+                                command_queue, 
+                                tx_topic, 
+                                shutdown_event
+                                ))
                     command_sender_thread.start()
                     connection_established_event.set()
 
             except Exception as e:
                 print(f"Exception Encountered: {e}")
+
+            # Workers only need restarting when they die, don't spin on the GIL
+            shutdown_event.wait(CONNECTION_MANAGER_POLL_SECONDS)
     finally:
         print("Ensuring Threads successfully shutdown")
 
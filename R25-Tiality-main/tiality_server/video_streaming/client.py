@@ -1,7 +1,5 @@
 import grpc
-from . import video_streaming_pb2
 from . import video_streaming_pb2_grpc
-import queue
 import time
 
 def run_grpc_client(server_address, frame_queue, frame_generator_func):
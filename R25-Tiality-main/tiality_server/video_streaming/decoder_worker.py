@@ -1,16 +1,12 @@
 from typing import Callable
-import numpy as np
-import pygame
 import queue
-import io
-import time
 
 def start_decoder_worker(incoming_video_queue: queue.Queue, decoded_video_queue: queue.Queue, decode_video_func, shutdown_event):
     print("Decoder thread started")
     while not shutdown_event.is_set():
         # Get frame from incoming queue
         try:
-            frame_bytes = incoming_video_queue.get_nowait()
+            frame_bytes = incoming_video_queue.get(timeout=0.1)
         except queue.Empty:
             continue
 
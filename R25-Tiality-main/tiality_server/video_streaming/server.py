@@ -1,5 +1,4 @@
 import grpc
-import time
 from concurrent import futures
 import queue
 
@@ -93,7 +92,7 @@ def serve(grpc_port, video_queue, connection_established_event, shutdown_event):
         # This is the core of handling reconnections: the server never stops.
         while not shutdown_event.is_set():
             
-            time.sleep(5) # Sleep for one day at a time.
+            shutdown_event.wait(5) # Wakes early when shutdown is requested.
     except KeyboardInterrupt:
         # This allows you to stop the server cleanly with Ctrl+C.
         print("Server stopping...")
@@ -101,5 +100,7 @@ def serve(grpc_port, video_queue, connection_established_event, shutdown_event):
         print("Server stopped.")
 
     finally:
+        # Release the port so the servers can be restarted in the same process
+        server.stop(0)
         print(f"Shutdown: {shutdown_event.is_set()}")
         print("Video Producer thread manager completely shutdown")
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Streaming audio classification over the classifier ring buffer.
+
+StreamingClassifierDriver slides a window of configurable length and hop
+over an AudioRingBuffer, skips windows that a cheap energy/onset gate marks
+as silent, and turns the per-window scores into timestamped detection events
+using hysteresis, so a call is reported once rather than once per window.
+
+With an IncrementalFeatureExtractor the driver feeds it the ring buffer's
+audio as it arrives and classifies each window from the cached frame
+features, so overlapping windows only transform their newest hop.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_processing import AudioRingBuffer
+
+
+@dataclass
+class WindowResult:
+    """Outcome of one analysis window"""
+    start_time: float  # wall clock time of the first sample
+    end_time: float  # wall clock time just after the last sample
+    rms: float
+    gated: bool  # True if the window was skipped as silent
+    predictions: List[Tuple[str, float]] = field(default_factory=list)
+    compute_seconds: float = 0.0
+    started: List[str] = field(default_factory=list)  # species whose event began with this window
+
+
+@dataclass
+class DetectionEvent:
+    """A species detected over one or more consecutive windows"""
+    species: str
+    start_time: float
+    end_time: float
+    peak_score: float
+    windows: int = 1
+    active: bool = True
+
+
+class StreamingClassifierDriver:
+    """Runs a classifier on overlapping windows of a mono ring buffer.
+
+    Args:
+        ring_buffer: Mono AudioRingBuffer with sample_rate set
+        predict_func: Returns [(species, score), ...] for a window of audio
+        window_seconds: Length of each analysed window
+        hop_seconds: Time between consecutive window starts
+        energy_threshold: Windows with RMS above this always pass the gate
+        onset_ratio: Windows whose newest hop is this much louder than the
+            noise floor pass the gate even if quiet overall
+        on_threshold: Smoothed score needed to start an event
+        off_threshold: Smoothed score below which an active event ends
+        smoothing: Weight of the newest window in the smoothed scores (0-1]
+        feature_extractor: Optional audio_features.IncrementalFeatureExtractor at
+            the ring buffer's sample rate, used together with predict_features_func.
+            The hop is then rounded down to whole feature frames, so every window
+            starts on the extractor's frame grid
+        predict_features_func: Returns [(species, score), ...] for a window's
+            feature vector, called instead of predict_func
+    """
+
+    def __init__(
+        self,
+        ring_buffer: AudioRingBuffer,
+        predict_func: Callable[[np.ndarray], List[Tuple[str, float]]],
+        window_seconds: float = 5.0,
+        hop_seconds: float = 1.0,
+        energy_threshold: float = 0.01,
+        onset_ratio: float = 4.0,
+        on_threshold: float = 0.5,
+        off_threshold: float = 0.3,
+        smoothing: float = 0.6,
+        max_events: int = 50,
+        feature_extractor=None,
+        predict_features_func: Callable[[np.ndarray], List[Tuple[str, float]]] = None,
+    ):
+        assert ring_buffer.sample_rate, "Ring buffer needs a sample rate"
+        assert (feature_extractor is None) == (predict_features_func is None), \
+            "feature_extractor and predict_features_func go together"
+        assert feature_extractor is None or feature_extractor.sr == ring_buffer.sample_rate, \
+            "Feature extractor must run at the ring buffer's sample rate"
+        assert 0 < hop_seconds <= window_seconds, "Hop must be positive and no longer than the window"
+        assert off_threshold <= on_threshold, "Hysteresis needs off_threshold <= on_threshold"
+        self.ring_buffer = ring_buffer
+        self.predict_func = predict_func
+        self.sample_rate = ring_buffer.sample_rate
+        self.window_samples = int(window_seconds * self.sample_rate)
+        self.hop_samples = int(hop_seconds * self.sample_rate)
+        if feature_extractor is not None:
+            self.hop_samples -= self.hop_samples % feature_extractor.hop_length
+            assert self.hop_samples > 0, "Hop must be at least one feature frame"
+        self.energy_threshold = energy_threshold
+        self.onset_ratio = onset_ratio
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.smoothing = smoothing
+        self.feature_extractor = feature_extractor
+        self.predict_features_func = predict_features_func
+        self._feature_origin = 0  # ring buffer index of the extractor's first sample
+
+        self.noise_floor = energy_threshold
+        self.smoothed_scores: Dict[str, float] = {}
+        self.active_events: Dict[str, DetectionEvent] = {}
+        self.events = deque(maxlen=max_events)  # newest last, includes active events
+
+        # Per-window compute time, to size the hop against available CPU
+        self.compute_times = deque(maxlen=200)
+        self.windows_classified = 0
+        self.windows_gated = 0
+        self.windows_missed = 0  # fell out of the ring buffer before they were analysed
+
+        self._next_window_end = None
+
+    def reset(self):
+        """Start from the audio arriving next, dropping any smoothing/event state."""
+        self._next_window_end = self.ring_buffer.total_written + self.window_samples
+        if self.feature_extractor is not None:
+            self.feature_extractor.reset()
+            self._feature_origin = self.ring_buffer.total_written
+        self.smoothed_scores.clear()
+        self.active_events.clear()
+
+    def poll(self) -> List[WindowResult]:
+        """Analyse every window that has become available since the last call."""
+        if self._next_window_end is None:
+            self.reset()
+
+        results = []
+        while self._next_window_end <= self.ring_buffer.total_written:
+            end = self._next_window_end
+            self._next_window_end += self.hop_samples
+            if not self.ring_buffer.is_available(end, self.window_samples):
+                self.windows_missed += 1
+                continue
+            results.append(self._process_window(end))
+        return results
+
+    def _sample_time(self, index: int) -> float:
+        # Capture time of an absolute sample index, relative to the newest sample
+        return time.time() - (self.ring_buffer.total_written - index) / self.sample_rate
+
+    def _feed_features(self, end: int):
+        """Push the ring buffer's audio up to index end into the feature extractor"""
+        start = self._feature_origin + self.feature_extractor.samples_pushed
+        if not self.ring_buffer.is_available(end, end - start):
+            # Fell behind the ring buffer, restart the extractor at this window
+            self.feature_extractor.reset()
+            self._feature_origin = start = end - self.window_samples
+        if end > start:
+            self.feature_extractor.push(self.ring_buffer.window(end, end - start))
+
+    def _passes_gate(self, audio: np.ndarray) -> Tuple[bool, float]:
+        rms = float(np.sqrt(np.mean(np.square(audio))))
+        newest_hop = audio[-self.hop_samples:]
+        hop_rms = float(np.sqrt(np.mean(np.square(newest_hop))))
+        passed = rms >= self.energy_threshold or hop_rms >= self.onset_ratio * self.noise_floor
+        if not passed:
+            # Track the background level from windows we consider silent
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * max(rms, 1e-6)
+        return passed, rms
+
+    def _process_window(self, end: int) -> WindowResult:
+        start = time.perf_counter()
+        if self.feature_extractor is not None:
+            # Every window's audio goes in, gated or not, so the frames stay contiguous
+            self._feed_features(end)
+        audio = self.ring_buffer.window(end, self.window_samples)
+        result = WindowResult(
+            start_time=self._sample_time(end - self.window_samples),
+            end_time=self._sample_time(end),
+            rms=0.0,
+            gated=False,
+        )
+
+        passed, result.rms = self._passes_gate(audio)
+        if not passed:
+            result.gated = True
+            self.windows_gated += 1
+            self._update_events({}, result)
+            return result
+
+        if self.feature_extractor is not None:
+            features = self.feature_extractor.window_features(audio, end - self._feature_origin)
+            result.predictions = self.predict_features_func(features)
+        else:
+            result.predictions = self.predict_func(audio)
+        result.compute_seconds = time.perf_counter() - start
+        self.compute_times.append(result.compute_seconds)
+        self.windows_classified += 1
+
+        self._update_events(dict(result.predictions), result)
+        return result
+
+    def _update_events(self, scores: Dict[str, float], result: WindowResult):
+        # Exponential smoothing, species missing from this window decay towards 0
+        for species in set(self.smoothed_scores) | set(scores):
+            previous = self.smoothed_scores.get(species, 0.0)
+            self.smoothed_scores[species] = (1 - self.smoothing) * previous + self.smoothing * scores.get(species, 0.0)
+
+        for species, score in list(self.smoothed_scores.items()):
+            event = self.active_events.get(species)
+            if event is None:
+                if score >= self.on_threshold:
+                    event = DetectionEvent(species, result.start_time, result.end_time, score)
+                    self.active_events[species] = event
+                    self.events.append(event)
+                    result.started.append(species)
+            elif score < self.off_threshold:
+                event.active = False
+                del self.active_events[species]
+            else:
+                event.end_time = result.end_time
+                event.peak_score = max(event.peak_score, score)
+                event.windows += 1
+
+            if species not in self.active_events and score < 1e-3:
+                del self.smoothed_scores[species]
+
+    def compute_stats(self) -> Optional[Dict[str, float]]:
+        """Mean/max per-window compute time and the share of the hop it uses."""
+        if not self.compute_times:
+            return None
+        times = np.array(self.compute_times)
+        hop_seconds = self.hop_samples / self.sample_rate
+        return {
+            "mean_ms": float(times.mean() * 1000),
+            "p95_ms": float(np.percentile(times, 95) * 1000),
+            "max_ms": float(times.max() * 1000),
+            "hop_load": float(times.mean() / hop_seconds),
+        }
@@ -0,0 +1,242 @@
+"""
+Spectral feature extraction shared by the audio classifiers.
+
+The feature vector is the 58-dim layout of SimpleAudioFeatureExtractor:
+MFCC mean/std/max/min (4 x 13), then spectral centroid, zero crossing rate
+and RMS mean/std (3 x 2).
+
+fused_features computes that vector from a single STFT, matching the separate
+librosa mfcc/spectral_centroid/zero_crossing_rate/rms calls it replaces.
+IncrementalFeatureExtractor computes STFT frames once as audio streams in and
+keeps per-frame mel power/centroid/ZCR/RMS values in a frame-indexed ring,
+so overlapping windows only transform the frames they add and still get the
+same features as fused_features.
+
+librosa is only imported for the mel filterbank, on its first use, so
+loading a trained classifier does not pay for it up front.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+FEATURE_LENGTH = 58
+
+
+@lru_cache(maxsize=None)
+def mel_basis(sr: int, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """Slaney mel filterbank, same as librosa.feature.melspectrogram's default"""
+    import librosa
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+
+@lru_cache(maxsize=None)
+def dct_matrix(n_mfcc: int, n_mels: int = N_MELS) -> np.ndarray:
+    """(n_mfcc, n_mels) orthonormal DCT-II, so mfcc = dct_matrix @ mel_db"""
+    return scipy.fft.dct(np.eye(n_mels), type=2, norm="ortho", axis=0)[:n_mfcc]
+
+
+@lru_cache(maxsize=None)
+def stft_window(n_fft: int = N_FFT) -> np.ndarray:
+    """Periodic Hann window, as used by librosa.stft"""
+    return scipy.signal.get_window("hann", n_fft, fftbins=True)
+
+
+def fused_features(audio: np.ndarray, sr: int = 22050, n_mfcc: int = 13) -> np.ndarray:
+    """
+    58-dim feature vector of a 1D clip (at least N_FFT samples) from one STFT.
+
+    Uses the librosa defaults of the per-feature calls: centred frames with
+    zero padding (edge padding for ZCR), Slaney mel power spectrogram in dB
+    with an 80 dB floor, orthonormal DCT, centroid of the magnitude spectrum.
+    """
+    pad = N_FFT // 2
+    padded = np.pad(audio, pad, mode="constant")
+    frames = sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+    num_frames = len(frames)
+
+    # One STFT: magnitude for the centroid, power for the mel spectrogram
+    magnitude = np.abs(scipy.fft.rfft(frames * stft_window().astype(audio.dtype, copy=False), axis=1))
+    power = np.square(magnitude)
+
+    mel_db = 10.0 * np.log10(np.maximum(power @ mel_basis(sr).T, 1e-10))
+    np.maximum(mel_db, mel_db.max() - 80.0, out=mel_db)
+    mfccs = mel_db @ dct_matrix(n_mfcc).T
+
+    freqs = np.fft.rfftfreq(N_FFT, 1.0 / sr)  # librosa.fft_frequencies
+    norm = magnitude.sum(axis=1)
+    norm[norm < np.finfo(magnitude.dtype).tiny] = 1.0
+    centroid = (magnitude @ freqs) / norm
+
+    # Frame sums from prefix sums instead of framing the signal again
+    starts = np.arange(num_frames) * HOP_LENGTH
+    square_sums = np.concatenate(([0.0], np.cumsum(np.square(padded, dtype=np.float64))))
+    rms = np.sqrt((square_sums[starts + N_FFT] - square_sums[starts]) / N_FFT)
+
+    edge_padded = np.pad(audio, pad, mode="edge")
+    signs = np.signbit(np.where(np.abs(edge_padded) <= 1e-10, 0, edge_padded))
+    crossings = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+    zcr = (crossings[starts + N_FFT - 1] - crossings[starts]) / N_FFT
+
+    return np.concatenate((
+        mfccs.mean(axis=0), mfccs.std(axis=0), mfccs.max(axis=0), mfccs.min(axis=0),
+        [centroid.mean(), centroid.std(), zcr.mean(), zcr.std(), rms.mean(), rms.std()],
+    ))
+
+
+class IncrementalFeatureExtractor:
+    """Frame cache giving fused_features of overlapping windows without redoing their STFT.
+
+    Each pushed frame is transformed once and its mel spectrum in dB,
+    spectral centroid, zero crossing rate, RMS and peak are kept in a
+    frame-indexed ring. window_features() rebuilds the features
+    SimpleAudioFeatureExtractor computes for a window (peak normalised
+    fused_features) from the cached frames: the normalisation, the 80 dB
+    floor and the DCT are applied per window, which needs no FFT, and only
+    the few frames reaching into the centre padding at either end of the
+    window are transformed from the window's own audio.
+
+    The cached frames lie on a HOP_LENGTH grid starting at the first pushed
+    sample, so a window must start a whole number of hops after it. The
+    features then match fused_features to float32 rounding.
+
+    Args:
+        sr: Sample rate of the pushed audio
+        n_mfcc: Number of MFCCs per frame
+        history_seconds: How far back windows can reach
+    """
+
+    def __init__(self, sr: int = 22050, n_mfcc: int = 13, history_seconds: float = 30.0):
+        self.sr = sr
+        self.n_mfcc = n_mfcc
+        self.n_fft = N_FFT
+        self.hop_length = HOP_LENGTH
+        self.capacity = int(history_seconds * sr) // HOP_LENGTH + 1
+
+        self._window = stft_window().astype(np.float32)
+        self._dct = dct_matrix(n_mfcc)
+        self._freqs = np.fft.rfftfreq(N_FFT, 1.0 / sr)  # librosa.fft_frequencies
+
+        self._mel_db = np.zeros((self.capacity, N_MELS), dtype=np.float32)  # before normalisation
+        # Per frame: centroid, ZCR, RMS, peak
+        self._values = np.zeros((self.capacity, 4))
+
+        self._pending = np.zeros(0, dtype=np.float32)  # samples not yet in a complete frame
+        self.frames_written = 0
+        self.samples_pushed = 0
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.float32)
+        self.frames_written = 0
+        self.samples_pushed = 0
+
+    def push(self, samples: np.ndarray):
+        """Append mono samples and analyse every frame they complete."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self.samples_pushed += len(samples)
+        audio = np.concatenate((self._pending, samples))
+        if len(audio) < N_FFT:
+            self._pending = audio
+            return
+
+        frames = sliding_window_view(audio, N_FFT)[::HOP_LENGTH]
+        self._pending = audio[len(frames) * HOP_LENGTH:]
+        for start in range(0, len(frames), self.capacity):
+            self._store(frames[start:start + self.capacity])
+
+    def _analyse(self, frames: np.ndarray, zcr_frames: np.ndarray = None):
+        """Mel spectra in dB and (centroid, ZCR, RMS, peak) of frames, as fused_features computes them"""
+        magnitude = np.abs(scipy.fft.rfft(frames * self._window, axis=1))
+        # Floored far below the 1e-10 fused_features applies after normalisation, see window_features
+        mel_db = 10.0 * np.log10(np.maximum(np.square(magnitude) @ mel_basis(self.sr).T, 1e-30))
+
+        values = np.empty((len(frames), 4))
+        norm = magnitude.sum(axis=1)
+        norm[norm < np.finfo(magnitude.dtype).tiny] = 1.0
+        values[:, 0] = (magnitude @ self._freqs) / norm
+        zcr_frames = frames if zcr_frames is None else zcr_frames
+        signs = np.signbit(np.where(np.abs(zcr_frames) <= 1e-10, 0, zcr_frames))
+        values[:, 1] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / N_FFT
+        values[:, 2] = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        values[:, 3] = np.max(np.abs(frames), axis=1)
+        return mel_db, values
+
+    def _store(self, frames: np.ndarray):
+        mel_db, values = self._analyse(frames)
+        slots = (self.frames_written + np.arange(len(frames))) % self.capacity
+        self._mel_db[slots] = mel_db
+        self._values[slots] = values
+        self.frames_written += len(frames)
+
+    def _edge_frames(self, audio: np.ndarray, first: int, stop: int):
+        """
+        Centred frames first..stop-1 of a window (frame k starts k hops minus
+        half a frame into it), zero padded, and edge padded for the ZCR.
+        """
+        pad = N_FFT // 2
+        lo = first * HOP_LENGTH - pad
+        hi = (stop - 1) * HOP_LENGTH - pad + N_FFT
+        segment = audio[max(lo, 0):min(hi, len(audio))]
+        padding = (max(-lo, 0), max(hi - len(audio), 0))
+        frames = sliding_window_view(np.pad(segment, padding), N_FFT)[::HOP_LENGTH]
+        zcr_frames = sliding_window_view(np.pad(segment, padding, mode="edge"), N_FFT)[::HOP_LENGTH]
+        return self._analyse(frames, zcr_frames)
+
+    def window_features(self, audio: np.ndarray, end_sample: int = None) -> np.ndarray:
+        """
+        58-dim feature vector of a window, equal to SimpleAudioFeatureExtractor's.
+
+        Args:
+            audio: The window's samples (at least N_FFT), already pushed
+            end_sample: Pushed sample count at the end of the window, default the newest
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        end = self.samples_pushed if end_sample is None else end_sample
+        start = end - len(audio)
+        assert len(audio) >= N_FFT, "Window is shorter than one frame"
+        assert start % HOP_LENGTH == 0, "Window must start a whole number of hops after the first sample"
+
+        # fused_features frame k covers window samples [k * hop - pad, k * hop - pad + N_FFT),
+        # frames first_inner..stop_inner-1 lie inside the window and are cached frames
+        pad = N_FFT // 2
+        num_frames = len(audio) // HOP_LENGTH + 1
+        first_inner = pad // HOP_LENGTH
+        stop_inner = (len(audio) - pad) // HOP_LENGTH + 1
+        first_cached = start // HOP_LENGTH
+        stop_cached = first_cached + stop_inner - first_inner
+        assert stop_cached <= self.frames_written, "Window is not pushed yet"
+        assert first_cached >= self.frames_written - self.capacity, "Window has left the frame history"
+
+        peak = float(np.max(np.abs(audio)))
+        if peak == 0:
+            return np.zeros(FEATURE_LENGTH)  # silent audio
+
+        slots = np.arange(first_cached, stop_cached) % self.capacity
+        head_mel, head_values = self._edge_frames(audio, 0, first_inner)
+        tail_mel, tail_values = self._edge_frames(audio, stop_inner, num_frames)
+        mel_db = np.concatenate((head_mel, self._mel_db[slots], tail_mel))
+        values = np.concatenate((head_values, self._values[slots], tail_values))
+
+        # Peak normalisation scales power by 1 / peak^2, a dB shift, applied before the
+        # 1e-10 (-100 dB) and 80 dB floors as in fused_features
+        mel_db -= np.float32(20.0 * np.log10(peak))
+        np.maximum(mel_db, -100.0, out=mel_db)
+        np.maximum(mel_db, mel_db.max() - 80.0, out=mel_db)
+        mfccs = mel_db @ self._dct.T
+        centroid, zcr = values[:, 0], values[:, 1]
+        rms = values[:, 2] / peak
+
+        return np.concatenate((
+            mfccs.mean(axis=0), mfccs.std(axis=0), mfccs.max(axis=0), mfccs.min(axis=0),
+            [centroid.mean(), centroid.std(), zcr.mean(), zcr.std(), rms.mean(), rms.std()],
+        ))
+
+    def latest_window_features(self, audio: np.ndarray) -> np.ndarray:
+        """Features of a window made of the newest samples pushed."""
+        return self.window_features(audio, self.samples_pushed)
@@ -0,0 +1,356 @@
+"""
+Streaming audio buffering and pre-processing.
+
+The sounddevice callback hands over stereo float32 blocks at the capture rate.
+AudioRingBuffer keeps a fixed-size history of them without allocating per
+block. DownmixResampleStage turns each block into mono at the classifier's
+rate and appends it to its own AudioRingBuffer, so classification can read the
+most recent audio as one contiguous array without concatenating or resampling.
+DurationHistogram records how long each capture callback took.
+"""
+
+from bisect import bisect_left
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from scipy.signal import firwin
+
+
+class AudioRingBuffer:
+    """Preallocated float32 circular buffer of audio frames with a write cursor.
+
+    Mono buffers hold a 1D array, multi-channel buffers a (frames, channels)
+    array. Reads return views of the newest frames and never copy:
+
+    - mirrored=True writes every frame twice (at the cursor and at
+      cursor + capacity), so the newest n frames are always one contiguous
+      slice. Costs twice the memory, used where a single array is needed.
+    - mirrored=False stores each frame once and latest_slices() returns the
+      newest frames as (older, newer) views either side of the wrap point.
+
+    Views stay valid until another capacity - n frames have been written.
+
+    Writes can carry the monotonic time they were captured at. With a
+    sample_rate set, the buffer then maps absolute frame indices to capture
+    times (time_at / index_at), so audio can be lined up with video frames.
+    The clock offset is smoothed over writes to absorb callback jitter.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1, sample_rate: int = None, mirrored: bool = True,
+                 time_smoothing: float = 0.05):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.mirrored = mirrored
+        length = 2 * self.capacity if mirrored else self.capacity
+        shape = (length,) if channels == 1 else (length, channels)
+        self._data = np.zeros(shape, dtype=np.float32)
+        self._cursor = 0
+        self.total_written = 0
+        self.time_smoothing = time_smoothing
+        self._time_offset = None  # capture time of absolute frame 0, see write()
+
+    def __len__(self):
+        return min(self.total_written, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def write(self, samples: np.ndarray, timestamp: float = None):
+        """
+        Append frames, overwriting the oldest ones. Does not allocate.
+
+        Args:
+            samples: (frames,) or (frames, channels) block
+            timestamp: Monotonic time the last frame of the block was captured
+        """
+        if self.channels == 1 and samples.ndim > 1:
+            samples = samples.reshape(len(samples))
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self.total_written += n - self.capacity
+            n = self.capacity
+
+        cap = self.capacity
+        first = min(n, cap - self._cursor)
+        end = self._cursor + first
+        rest = n - first
+        self._data[self._cursor:end] = samples[:first]
+        if rest:
+            self._data[:rest] = samples[first:]
+        if self.mirrored:
+            self._data[self._cursor + cap:end + cap] = samples[:first]
+            if rest:
+                self._data[cap:cap + rest] = samples[first:]
+
+        self._cursor = (self._cursor + n) % cap
+        self.total_written += n
+
+        if timestamp is not None and self.sample_rate:
+            offset = timestamp - self.total_written / self.sample_rate
+            if self._time_offset is None:
+                self._time_offset = offset
+            else:
+                self._time_offset += self.time_smoothing * (offset - self._time_offset)
+
+    @property
+    def has_timestamps(self) -> bool:
+        return self._time_offset is not None
+
+    def time_at(self, index: int) -> float:
+        """Capture time of absolute frame index (see total_written)"""
+        return self._time_offset + index / self.sample_rate
+
+    def index_at(self, timestamp: float) -> int:
+        """Absolute index of the frame captured at timestamp, may be outside the buffer"""
+        return int(round((timestamp - self._time_offset) * self.sample_rate))
+
+    @property
+    def oldest_index(self) -> int:
+        return self.total_written - len(self)
+
+    def latest_slices(self, n: int):
+        """
+        The most recent n frames (fewer if the buffer isn't full yet) as an
+        (older, newer) pair of views. For mirrored buffers older is empty.
+        """
+        return self._slices_ending_at(self.total_written, n)
+
+    def _slices_ending_at(self, end_index: int, n: int):
+        skip = self.total_written - end_index  # frames newer than the requested range
+        n = min(n, len(self) - skip)
+        cursor = self._cursor - skip
+        if self.mirrored:
+            end = cursor + self.capacity
+            return self._data[end - n:end - n], self._data[end - n:end]
+        cursor %= self.capacity
+        start = cursor - n
+        if start >= 0:
+            return self._data[start:start], self._data[start:cursor]
+        return self._data[self.capacity + start:], self._data[:cursor]
+
+    def is_available(self, end_index: int, n: int) -> bool:
+        """Whether frames [end_index - n, end_index) are written and not yet overwritten."""
+        return end_index <= self.total_written and end_index - n >= self.total_written - len(self)
+
+    def window(self, end_index: int, n: int) -> np.ndarray:
+        """
+        Frames [end_index - n, end_index), indexed by absolute frame count
+        (see total_written). A view for mirrored buffers, a copy otherwise.
+        """
+        assert self.is_available(end_index, n), "Requested frames are not in the buffer"
+        older, newer = self._slices_ending_at(end_index, n)
+        if len(older) == 0:
+            return newer
+        return np.concatenate((older, newer))
+
+    def latest(self, n: int) -> np.ndarray:
+        """
+        The most recent n frames (fewer if the buffer isn't full yet) as one
+        array. A view for mirrored buffers, a copy otherwise.
+        """
+        older, newer = self.latest_slices(n)
+        if len(older) == 0:
+            return newer
+        return np.concatenate((older, newer))
+
+    def latest_seconds(self, seconds: float) -> np.ndarray:
+        """Same as latest(), sized in seconds using sample_rate."""
+        return self.latest(int(seconds * self.sample_rate))
+
+
+class StreamingResampler:
+    """Stateful polyphase FIR resampler for block-by-block audio.
+
+    Equivalent to upsampling by `up`, low-pass filtering and downsampling by
+    `down`, but only the output samples are ever computed. Filter history is
+    carried across blocks so there are no discontinuities at block edges.
+
+    Safe to run in an audio callback: blocks of up to max_block samples are
+    resampled in preallocated buffers. Every up-th output sample uses the
+    same filter phase and its input window starts `down` samples after the
+    previous one, so each phase is one strided view of the input and one
+    einsum into the output buffer (a single einsum for 2:1 decimation). When
+    there are more phases than taps per phase (e.g. 48 kHz -> 22.05 kHz) the
+    outputs are accumulated tap by tap instead, from per-block index and
+    phase tables written into preallocated arrays.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, max_block: int = 1024):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+
+        # Same anti-aliasing design as scipy.signal.resample_poly
+        max_rate = max(self.up, self.down)
+        taps = firwin(20 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * self.up
+        self.num_phase_taps = -(-len(taps) // self.up)
+        taps = np.pad(taps, (0, self.num_phase_taps * self.up - len(taps)))
+        # Row p holds the taps used by outputs whose position falls on phase p,
+        # reversed so they line up with oldest -> newest input windows
+        self._phases = np.ascontiguousarray(taps.reshape(self.num_phase_taps, self.up).T[:, ::-1], dtype=np.float32)
+
+        self._history = self.num_phase_taps - 1
+        self._work = np.zeros(self._history, dtype=np.float32)
+        self._allocate(max_block)
+        # Position of the next output sample within _work, in units of 1/up input samples
+        self._position = self._history * self.up
+
+    def _allocate(self, max_block: int):
+        """Input and output buffers for blocks of up to max_block samples, keeping the filter history"""
+        work = np.zeros(self._history + max_block, dtype=np.float32)
+        work[:self._history] = self._work[:self._history]
+        self._work = work
+        # The next output position is always within the block's first input sample,
+        # so a block yields at most this many outputs
+        max_count = (max_block * self.up - 1) // self.down + 1
+        self._output = np.zeros(max_count, dtype=np.float32)
+        if self.up > self.num_phase_taps:
+            # Tap by tap accumulation, see _filter_by_tap
+            self._tap_phases = np.ascontiguousarray(self._phases.T)
+            self._steps = self.down * np.arange(max_count)  # output positions after the block's first
+            self._positions = np.zeros(max_count, dtype=np.int64)
+            self._index = np.zeros(max_count, dtype=np.int64)
+            self._phase = np.zeros(max_count, dtype=np.int64)
+            self._column = np.zeros(max_count, dtype=np.float32)
+            self._weights = np.zeros(max_count, dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample one block of mono samples, returns the new output samples
+        (a view of an internal buffer, valid until the next call).
+        """
+        n = len(block)
+        if self._history + n > len(self._work):
+            self._allocate(n)  # only for blocks larger than max_block
+        end = self._history + n
+        self._work[self._history:end] = block
+
+        last_position = end * self.up - 1
+        if self._position > last_position:
+            count = 0
+        else:
+            count = (last_position - self._position) // self.down + 1
+        output = self._output[:count]
+        if self.up > self.num_phase_taps:
+            self._filter_by_tap(output)
+        else:
+            self._filter_by_phase(output)
+
+        # Keep the filter history and move positions to be relative to it
+        self._work[:self._history] = self._work[n:end]
+        self._position += count * self.down - n * self.up
+        return output
+
+    def _filter_by_phase(self, output: np.ndarray):
+        count = len(output)
+        itemsize = self._work.itemsize
+        for first in range(min(self.up, count)):
+            position = self._position + first * self.down
+            # Window of output first + k * up starts k * down samples after output first's
+            start = position // self.up - self._history
+            rows = (count - first - 1) // self.up + 1
+            windows = as_strided(self._work[start:], shape=(rows, self.num_phase_taps),
+                                 strides=(self.down * itemsize, itemsize), writeable=False)
+            np.einsum("ij,j->i", windows, self._phases[position % self.up], out=output[first::self.up])
+
+    def _filter_by_tap(self, output: np.ndarray):
+        count = len(output)
+        positions = self._positions[:count]
+        np.add(self._steps[:count], self._position, out=positions)
+        index = self._index[:count]
+        np.floor_divide(positions, self.up, out=index)
+        index -= self._history  # first input sample of each output's window
+        phase = self._phase[:count]
+        np.remainder(positions, self.up, out=phase)
+
+        output[:] = 0
+        column = self._column[:count]
+        weights = self._weights[:count]
+        for tap in range(self.num_phase_taps):
+            # mode="clip" gathers without a temporary
+            np.take(self._work[tap:], index, out=column, mode="clip")
+            np.take(self._tap_phases[tap], phase, out=weights, mode="clip")
+            np.multiply(column, weights, out=column)
+            np.add(output, column, out=output)
+
+
+class DownmixResampleStage:
+    """Capture callback stage: downmix to mono, resample, append to a ring buffer."""
+
+    def __init__(self, in_rate: int, out_rate: int, ring_buffer: AudioRingBuffer, max_block: int = 1024):
+        self.ring_buffer = ring_buffer
+        self.resampler = None if in_rate == out_rate else StreamingResampler(in_rate, out_rate, max_block)
+        self._mono = np.zeros(max_block, dtype=np.float32)
+
+    def process(self, indata: np.ndarray):
+        frames = len(indata)
+        if frames > len(self._mono):
+            self._mono = np.zeros(frames, dtype=np.float32)
+        mono = self._mono[:frames]
+        if indata.ndim > 1 and indata.shape[1] > 1:
+            # Channel by channel, np.mean(axis=1) would allocate a reduction buffer
+            channels = indata.shape[1]
+            np.copyto(mono, indata[:, 0])
+            for channel in range(1, channels):
+                np.add(mono, indata[:, channel], out=mono)
+            mono *= 1.0 / channels
+        else:
+            mono[:] = indata.reshape(frames)
+
+        if self.resampler is not None:
+            mono = self.resampler.process(mono)
+        self.ring_buffer.write(mono)
+
+
+class DurationHistogram:
+    """Fixed-bin histogram of callback durations that records without allocating arrays.
+
+    Args:
+        budget_seconds: Time available per call (block size / sample rate);
+            calls over budget_fraction of it are counted as at risk of underrun
+        budget_fraction: Share of the budget considered safe
+    """
+
+    # Upper bin edges in seconds, the last bin is everything slower
+    EDGES = (25e-6, 50e-6, 100e-6, 250e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3)
+
+    def __init__(self, budget_seconds: float, budget_fraction: float = 0.5):
+        self.budget_seconds = budget_seconds
+        self.risk_threshold = budget_fraction * budget_seconds
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.over_budget = 0
+        self.at_risk = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect_left(self.EDGES, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        if seconds > self.risk_threshold:
+            self.at_risk += 1
+            if seconds > self.budget_seconds:
+                self.over_budget += 1
+
+    def summary_lines(self) -> list:
+        if self.count == 0:
+            return ["no callbacks recorded"]
+        lines = [
+            f"{self.count} callbacks, mean {self.total_seconds / self.count * 1e6:.0f} us, "
+            f"max {self.max_seconds * 1e6:.0f} us, budget {self.budget_seconds * 1e3:.1f} ms",
+            f"over {self.risk_threshold / self.budget_seconds:.0%} of budget: {self.at_risk}, over budget: {self.over_budget}",
+        ]
+        lower = 0.0
+        for edge, count in zip(self.EDGES + (float("inf"),), self.counts):
+            if count:
+                upper = "inf" if edge == float("inf") else f"{edge * 1e6:.0f} us"
+                lines.append(f"  {lower * 1e6:>6.0f} us - {upper:<9} {count:>8}  {'#' * max(1, 40 * count // self.count)}")
+            lower = edge
+        return lines
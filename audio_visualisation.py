@@ -0,0 +1,193 @@
+"""
+Live spectrogram and level meter for the "Audio Visualisation" panel.
+
+IncrementalSpectrogram reads an AudioRingBuffer by absolute frame index and
+only transforms the FFT frames that arrived since the previous update, with
+one cached Hann window and a fixed FFT size (numpy caches the rFFT plan per
+size). Each frame becomes one coloured image column.
+
+SpectrogramView shows the columns on a Tk canvas. The image is a ring of
+columns: new columns are written into one PhotoImage at a moving cursor and
+the canvas shows it twice, side by side, shifted so the newest column is at
+the right edge. Scrolling is two canvas coords() calls, so a redraw costs the
+same however much history is on screen. Redraws are capped at max_fps.
+"""
+
+import tkinter as tk
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from audio_processing import AudioRingBuffer
+
+# Colour anchors of the spectrogram colormap, quiet to loud
+COLORMAP_ANCHORS = [(0, 0, 0), (60, 15, 110), (180, 50, 90), (250, 140, 30), (255, 250, 180)]
+
+
+def make_colormap(anchors=COLORMAP_ANCHORS) -> np.ndarray:
+    """(256, 3) uint8 lookup table interpolated between the anchor colours"""
+    positions = np.linspace(0, 255, len(anchors))
+    levels = np.arange(256)
+    return np.stack([np.interp(levels, positions, [colour[c] for colour in anchors]) for c in range(3)],
+                    axis=1).astype(np.uint8)
+
+
+class IncrementalSpectrogram:
+    """Spectrogram columns of the audio written to a ring buffer since the last call.
+
+    Args:
+        ring_buffer: Mono AudioRingBuffer to read (mirrored, so reads don't copy)
+        rows: Image height, FFT bins are averaged into this many frequency rows
+        max_columns: Most columns returned by one update, older new frames are
+            skipped (e.g. after the panel was hidden)
+        n_fft: FFT frame length
+        hop_length: Samples between FFT frames
+        min_db, max_db: Power range mapped onto the colormap, dB relative to a full scale sine
+    """
+
+    def __init__(self, ring_buffer: AudioRingBuffer, rows: int = 128, max_columns: int = 400, n_fft: int = 1024,
+                 hop_length: int = 512, min_db: float = -100.0, max_db: float = -20.0):
+        self.ring_buffer = ring_buffer
+        self.max_columns = max_columns
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.min_db = min_db
+        self.max_db = max_db
+        self.window = np.hanning(n_fft + 1)[:-1].astype(np.float32)  # periodic Hann
+        # A full scale sine then has power 0.25 in its bin
+        self._power_scale = 1.0 / float(self.window.sum()) ** 2
+        n_bins = n_fft // 2 + 1
+        self.rows = min(rows, n_bins)
+        self._row_starts = np.linspace(0, n_bins, self.rows + 1).astype(int)
+        self._row_sizes = np.diff(self._row_starts).astype(np.float32)
+        self.colormap = make_colormap()
+        self._next_start = None  # absolute index of the next FFT frame
+        self.columns_computed = 0
+
+    def _restart_index(self, end: int) -> int:
+        """Frame start that leaves max_columns frames before end"""
+        return max(0, end - self.n_fft - (self.max_columns - 1) * self.hop_length)
+
+    def update(self) -> Tuple[np.ndarray, float]:
+        """
+        Columns for the FFT frames completed since the last call.
+
+        Returns:
+            Tuple[np.ndarray, float]: (count, rows, 3) uint8 RGB columns, oldest first and
+            lowest frequency last, and the RMS level of the new audio in dBFS (None if none)
+        """
+        ring = self.ring_buffer
+        end = ring.total_written
+        if self._next_start is None or self._next_start < end - len(ring):
+            self._next_start = self._restart_index(end)
+        count = (end - self._next_start - self.n_fft) // self.hop_length + 1
+        if count <= 0:
+            return np.empty((0, self.rows, 3), dtype=np.uint8), None
+        if count > self.max_columns:
+            self._next_start += (count - self.max_columns) * self.hop_length
+            count = self.max_columns
+
+        span = (count - 1) * self.hop_length + self.n_fft
+        audio = ring.window(self._next_start + span, span)
+        frames = sliding_window_view(audio, self.n_fft)[::self.hop_length]
+        spectrum = np.fft.rfft(frames * self.window, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) * self._power_scale
+        rows = np.add.reduceat(power, self._row_starts[:-1], axis=1) / self._row_sizes
+        db = 10 * np.log10(rows + 1e-12)
+        levels = np.clip((db - self.min_db) * (255 / (self.max_db - self.min_db)), 0, 255).astype(np.uint8)
+        columns = self.colormap[levels[:, ::-1]]  # high frequencies at the top of the image
+
+        new_audio = audio[-count * self.hop_length:]
+        level_db = 10 * np.log10(float(np.mean(np.square(new_audio))) + 1e-12)
+        self._next_start += count * self.hop_length
+        self.columns_computed += count
+        return columns, level_db
+
+
+class SpectrogramView(tk.Frame):
+    """Scrolling spectrogram canvas with a level meter beside it.
+
+    Args:
+        parent: Tk container
+        spectrogram: Source of the columns, its rows set the canvas height
+        width: Columns of history on screen
+        max_fps: Cap on redraws per second
+        meter_width: Width of the level meter in pixels
+        meter_range_db: dBFS range of the meter (bottom, top)
+    """
+
+    def __init__(self, parent, spectrogram: IncrementalSpectrogram, width: int = 400, max_fps: float = 15,
+                 meter_width: int = 14, meter_range_db: Tuple[float, float] = (-60.0, 0.0)):
+        super().__init__(parent)
+        self.spectrogram = spectrogram
+        self.width = width
+        self.height = spectrogram.rows
+        self.max_fps = max_fps
+        self.meter_range_db = meter_range_db
+        spectrogram.max_columns = width
+
+        self.canvas = tk.Canvas(self, width=width, height=self.height, bg="black", highlightthickness=0)
+        self.canvas.pack(side="left", fill="y")
+        self.meter = tk.Canvas(self, width=meter_width, height=self.height, bg="black", highlightthickness=0)
+        self.meter.pack(side="left", fill="y", padx=(4, 0))
+
+        self.photo = tk.PhotoImage(width=width, height=self.height)
+        # The same image twice: [cursor, width) of the ring on the left, [0, cursor) after it
+        self._left_item = self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self._right_item = self.canvas.create_image(width, 0, image=self.photo, anchor="nw")
+        self._cursor = 0  # next ring column to write
+        self._level_bar = self.meter.create_rectangle(0, self.height, meter_width, self.height, fill="#3c3", width=0)
+        self._peak_line = self.meter.create_line(0, self.height, meter_width, self.height, fill="#fc3")
+        self._peak_db = meter_range_db[0]
+        self._after_id = None
+        self.redraws = 0
+
+    def start(self):
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = self.after(int(1000 / self.max_fps), self._tick)
+        columns, level_db = self.spectrogram.update()
+        if len(columns) == 0:
+            return
+        self._write_columns(columns)
+        self._scroll()
+        self._draw_level(level_db)
+        self.redraws += 1
+
+    def _put(self, columns: np.ndarray, x: int):
+        """Write (count, rows, 3) columns into the photo at column x as binary PPM"""
+        count = len(columns)
+        pixels = np.ascontiguousarray(columns.transpose(1, 0, 2))
+        data = f"P6\n{count} {self.height}\n255\n".encode() + pixels.tobytes()
+        self.photo.tk.call(self.photo.name, "put", data, "-format", "ppm", "-to", x, 0)
+
+    def _write_columns(self, columns: np.ndarray):
+        first = min(len(columns), self.width - self._cursor)
+        self._put(columns[:first], self._cursor)
+        if first < len(columns):
+            self._put(columns[first:], 0)
+        self._cursor = (self._cursor + len(columns)) % self.width
+
+    def _scroll(self):
+        self.canvas.coords(self._left_item, -self._cursor, 0)
+        self.canvas.coords(self._right_item, self.width - self._cursor, 0)
+
+    def _draw_level(self, level_db: float):
+        bottom, top = self.meter_range_db
+        fraction = min(max((level_db - bottom) / (top - bottom), 0.0), 1.0)
+        # Peak hold, falling 1 dB per redraw
+        self._peak_db = max(level_db, self._peak_db - 1.0)
+        peak_fraction = min(max((self._peak_db - bottom) / (top - bottom), 0.0), 1.0)
+        meter_width = int(self.meter.cget("width"))
+        self.meter.coords(self._level_bar, 0, self.height * (1 - fraction), meter_width, self.height)
+        peak_y = self.height * (1 - peak_fraction)
+        self.meter.coords(self._peak_line, 0, peak_y, meter_width, peak_y)
+        self.meter.itemconfig(self._level_bar, fill="#c33" if level_db > top - 3 else "#3c3")
@@ -0,0 +1,103 @@
+"""
+Auto White Balance Benchmark
+
+Per-frame cost of gray-world white balance on the preview path:
+
+    float: the original float32 implementation (four full-frame passes)
+    lut:   GrayWorldAWB, gains estimated on a subsampled frame every
+           --update_interval frames and applied with cv2.LUT in place
+
+at 720p and 1080p. Also checks that GrayWorldAWB configured to estimate on
+every full frame without smoothing matches the float version to within one
+level (exits non-zero if it doesn't).
+
+Example:
+    python3 benchmarks/awb.py
+    python3 benchmarks/awb.py --frames 200 --update_interval 10 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from frame_processing import GrayWorldAWB
+from video_buffer_memory import RESOLUTIONS, synthetic_frames
+
+
+def float_gray_world(img):
+    """The previous implementation, for reference"""
+    img_float = img.astype(np.float32)
+    avg_b = np.mean(img_float[:, :, 0])
+    avg_g = np.mean(img_float[:, :, 1])
+    avg_r = np.mean(img_float[:, :, 2])
+    avg_gray = (avg_b + avg_g + avg_r) / 3
+    img_float[:, :, 0] *= avg_gray / avg_b
+    img_float[:, :, 1] *= avg_gray / avg_g
+    img_float[:, :, 2] *= avg_gray / avg_r
+    return np.clip(img_float, 0, 255).astype(np.uint8)
+
+
+def time_per_frame(process, frames, repeat: int) -> float:
+    # Work on copies so the in-place version sees fresh frames every time
+    inputs = [frames[i % len(frames)].copy() for i in range(repeat)]
+    start = time.perf_counter()
+    for frame in inputs:
+        process(frame)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Float vs LUT gray-world white balance per frame")
+    parser.add_argument("--resolutions", nargs="+", default=["720p", "1080p"], choices=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=100, help="Frames timed per method")
+    parser.add_argument("--update_interval", type=int, default=5, help="GrayWorldAWB update interval")
+    parser.add_argument("--subsample", type=int, default=8, help="GrayWorldAWB subsampling")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    mismatch = False
+    for name in args.resolutions:
+        height, width = RESOLUTIONS[name]
+        frames = synthetic_frames(height, width, 8)
+        # Colour cast, so there is something to correct
+        frames = [np.clip(frame * np.array([0.8, 1.0, 1.25]), 0, 255).astype(np.uint8) for frame in frames]
+
+        exact = GrayWorldAWB(update_interval=1, smoothing=1.0, subsample=1)
+        max_difference = max(
+            int(np.abs(exact(frame.copy()).astype(int) - float_gray_world(frame).astype(int)).max()) for frame in frames
+        )
+        mismatch |= max_difference > 1
+
+        awb = GrayWorldAWB(update_interval=args.update_interval, subsample=args.subsample)
+        float_ms = time_per_frame(float_gray_world, frames, args.frames) * 1000
+        lut_ms = time_per_frame(awb, frames, args.frames) * 1000
+        results.append({
+            "resolution": name,
+            "float_ms": float_ms,
+            "lut_ms": lut_ms,
+            "speedup": float_ms / lut_ms,
+            "max_difference_exact_settings": max_difference,
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'resolution':>10}{'float ms':>10}{'lut ms':>9}{'speedup':>9}{'max diff':>10}")
+        for result in results:
+            print(f"{result['resolution']:>10}{result['float_ms']:>10.2f}{result['lut_ms']:>9.2f}"
+                  f"{result['speedup']:>8.1f}x{result['max_difference_exact_settings']:>10}")
+    if mismatch:
+        print("✗ LUT white balance differs from the float version by more than one level")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
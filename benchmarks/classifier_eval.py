@@ -0,0 +1,247 @@
+"""
+Classifier Evaluation Benchmark
+
+Accuracy: cross-validation over the reference recordings, grouped by file so
+a recording's windows and augmented copies never appear in both the training
+and test side. Each fold trains SimpleAnimalClassifier through its normal
+training path on the training files, then classifies every --eval_window
+second window of the held-out files. Reports top-1/top-3 window accuracy and
+a confusion matrix.
+
+Throughput: feature extraction and inference latency (p50/p99) and
+windows/sec for each --windows length and --sample_rates rate, using the
+shipped model.
+
+Writes a machine-readable report with --output; with --baseline, compares
+against an earlier report and exits non-zero on an accuracy drop or a
+latency increase beyond the tolerances.
+
+Example:
+    python3 benchmarks/classifier_eval.py --audio_dir "ECE4191 - Potential Audio Targets" --output eval.json
+    python3 benchmarks/classifier_eval.py --baseline eval.json --skip_accuracy
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import librosa
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from simple_classifier import SimpleAnimalClassifier, SimpleAudioFeatureExtractor
+from training_pipeline import extract_animal_name, write_synthetic_set
+
+
+def reference_files(audio_dir: str, extensions) -> dict:
+    """Class name -> sorted file paths"""
+    files = {}
+    for filename in sorted(os.listdir(audio_dir)):
+        if filename.lower().endswith(extensions):
+            files.setdefault(extract_animal_name(filename), []).append(os.path.join(audio_dir, filename))
+    return files
+
+
+def split_windows(audio: np.ndarray, window: int) -> list:
+    if len(audio) <= window:
+        return [audio]
+    return [audio[start:start + window] for start in range(0, len(audio) - window + 1, window)]
+
+
+def cross_validate(audio_dir: str, extensions, folds: int, eval_window: float, work_dir: str, workers: int) -> dict:
+    files = reference_files(audio_dir, extensions)
+    classes = sorted(files)
+    confusion = np.zeros((len(classes), len(classes)), dtype=int)
+    top1 = top3 = windows = 0
+    cache_dir = os.path.join(work_dir, "cache")  # shared, so each file is featurised once across folds
+    fold_results = []
+
+    for fold in range(folds):
+        # The i-th recording of each class is held out in fold i % folds
+        train_dir = os.path.join(work_dir, f"fold{fold}")
+        os.makedirs(train_dir)
+        test_files = []
+        for paths in files.values():
+            for i, path in enumerate(paths):
+                if i % folds == fold and len(paths) > 1:
+                    test_files.append(path)
+                else:
+                    shutil.copy(path, train_dir)
+        if not test_files:
+            continue
+
+        start = time.perf_counter()
+        classifier = SimpleAnimalClassifier(train_dir, model_path=os.path.join(train_dir, "model.pkl"),
+                                            cache_dir=cache_dir, training_workers=workers, audio_extensions=extensions)
+        train_seconds = time.perf_counter() - start
+
+        fold_top1 = fold_windows = 0
+        for path in test_files:
+            label = extract_animal_name(os.path.basename(path))
+            audio, _ = librosa.load(path, sr=classifier.sample_rate)
+            clips = split_windows(audio, int(eval_window * classifier.sample_rate))
+            for predictions in classifier.predict_batch(clips):
+                names = [name for name, _score in predictions]
+                confusion[classes.index(label), classes.index(names[0])] += 1
+                top1 += names[0] == label
+                top3 += label in names
+                fold_top1 += names[0] == label
+                fold_windows += 1
+        windows += fold_windows
+        fold_results.append({
+            "fold": fold,
+            "test_files": len(test_files),
+            "windows": fold_windows,
+            "top1_accuracy": fold_top1 / max(fold_windows, 1),
+            "train_seconds": train_seconds,
+        })
+
+    return {
+        "classes": classes,
+        "folds": fold_results,
+        "windows": windows,
+        "top1_accuracy": top1 / max(windows, 1),
+        "top3_accuracy": top3 / max(windows, 1),
+        "confusion_matrix": confusion.tolist(),
+    }
+
+
+def percentiles(latencies) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.median(latencies_ms)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "windows_per_second": float(1000 / latencies_ms.mean()),
+    }
+
+
+def measure_throughput(classifier: SimpleAnimalClassifier, window_seconds_list, sample_rates, repeat: int) -> list:
+    rng = np.random.default_rng(0)
+    results = []
+    for sample_rate in sample_rates:
+        extractor = SimpleAudioFeatureExtractor(sr=sample_rate)
+        for window_seconds in window_seconds_list:
+            t = np.arange(int(window_seconds * sample_rate)) / sample_rate
+            clips = [
+                (0.3 * np.sin(2 * np.pi * rng.uniform(300, 3000) * t) + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+                for _ in range(repeat)
+            ]
+            extractor.extract_features(clips[0])  # warm up
+            feature_latencies, inference_latencies = [], []
+            for clip in clips:
+                start = time.perf_counter()
+                features = extractor.extract_features(clip)
+                extracted = time.perf_counter()
+                classifier.score_features(features[None, :])
+                feature_latencies.append(extracted - start)
+                inference_latencies.append(time.perf_counter() - extracted)
+            results.append({
+                "sample_rate": sample_rate,
+                "window_seconds": window_seconds,
+                "features": percentiles(feature_latencies),
+                "inference": percentiles(inference_latencies),
+                "end_to_end": percentiles(np.add(feature_latencies, inference_latencies)),
+            })
+    return results
+
+
+def compare(report: dict, baseline: dict, accuracy_tolerance: float, latency_tolerance: float) -> list:
+    """Regressions of report against baseline, as messages"""
+    regressions = []
+    if "accuracy" in report and "accuracy" in baseline:
+        for key in ("top1_accuracy", "top3_accuracy"):
+            if report["accuracy"][key] < baseline["accuracy"][key] - accuracy_tolerance:
+                regressions.append(f"{key} {baseline['accuracy'][key]:.3f} -> {report['accuracy'][key]:.3f}")
+    previous = {(r["sample_rate"], r["window_seconds"]): r for r in baseline.get("throughput", [])}
+    for result in report.get("throughput", []):
+        old = previous.get((result["sample_rate"], result["window_seconds"]))
+        if old is None:
+            continue
+        new_ms, old_ms = result["end_to_end"]["p50_ms"], old["end_to_end"]["p50_ms"]
+        if new_ms > old_ms * (1 + latency_tolerance):
+            regressions.append(f"p50 {result['window_seconds']}s @ {result['sample_rate']} Hz {old_ms:.2f} -> {new_ms:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated accuracy and throughput of SimpleAnimalClassifier")
+    parser.add_argument("--audio_dir", default="ECE4191 - Potential Audio Targets", help="Reference recordings")
+    parser.add_argument("--synthetic", type=int, default=6, help="Classes to generate if --audio_dir is missing")
+    parser.add_argument("--folds", type=int, default=2, help="Cross-validation folds (recordings per class)")
+    parser.add_argument("--eval_window", type=float, default=3.0, help="Seconds per classified test window")
+    parser.add_argument("--windows", type=float, nargs="+", default=[1.0, 3.0, 5.0, 10.0], help="Window lengths to time")
+    parser.add_argument("--sample_rates", type=int, nargs="+", default=[16000, 22050, 44100], help="Sample rates to time")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed windows per length/rate")
+    parser.add_argument("--workers", type=int, default=None, help="Training process pool size")
+    parser.add_argument("--model", default=os.path.join(parent_dir, "simple_animal_classifier.pkl"), help="Model used for throughput")
+    parser.add_argument("--skip_accuracy", action="store_true", help="Only measure throughput")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--accuracy_tolerance", type=float, default=0.02, help="Allowed absolute accuracy drop")
+    parser.add_argument("--latency_tolerance", type=float, default=0.2, help="Allowed relative p50 increase")
+    args = parser.parse_args()
+
+    audio_dir = os.path.abspath(args.audio_dir)
+    model_path = os.path.abspath(args.model)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0]}
+    work_dir = tempfile.mkdtemp(prefix="classifier_eval_")
+    cwd = os.getcwd()
+    # SimpleAnimalClassifier writes its prediction log to the working directory
+    os.chdir(work_dir)
+    try:
+        if not args.skip_accuracy:
+            if os.path.isdir(audio_dir):
+                source, extensions = audio_dir, (".mp3",)
+            else:
+                source, extensions = os.path.join(work_dir, "synthetic"), (".wav",)
+                os.makedirs(source)
+                write_synthetic_set(source, args.synthetic, 10.0, 22050)
+                report["synthetic_data"] = True
+            report["accuracy"] = cross_validate(source, extensions, args.folds, args.eval_window, work_dir, args.workers)
+
+        classifier = SimpleAnimalClassifier(audio_dir, model_path=model_path)
+        report["throughput"] = measure_throughput(classifier, args.windows, args.sample_rates, args.repeat)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if "accuracy" in report:
+        accuracy = report["accuracy"]
+        print(f"\nAccuracy over {accuracy['windows']} windows: top-1 {accuracy['top1_accuracy']:.1%}, top-3 {accuracy['top3_accuracy']:.1%}")
+        width = max(len(name) for name in accuracy["classes"])
+        print(" " * (width + 4) + " ".join(f"{i:>3}" for i in range(len(accuracy["classes"]))))
+        for i, (name, row) in enumerate(zip(accuracy["classes"], accuracy["confusion_matrix"])):
+            print(f"{name:>{width}} {i:>2} " + " ".join(f"{count:>3}" for count in row))
+    print(f"\n{'rate':>7}{'window s':>10}{'feat p50':>10}{'feat p99':>10}{'inf p50':>9}{'inf p99':>9}{'win/s':>9}")
+    for result in report["throughput"]:
+        print(f"{result['sample_rate']:>7}{result['window_seconds']:>10.1f}"
+              f"{result['features']['p50_ms']:>10.2f}{result['features']['p99_ms']:>10.2f}"
+              f"{result['inference']['p50_ms']:>9.3f}{result['inference']['p99_ms']:>9.3f}"
+              f"{result['end_to_end']['windows_per_second']:>9.0f}")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.accuracy_tolerance, args.latency_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Feature Cache Benchmark
+
+Per-window feature extraction cost for a stream of overlapping windows:
+
+    full:        SimpleAudioFeatureExtractor.extract_features on every window
+    incremental: IncrementalFeatureExtractor, pushing each hop of new audio
+                 and building the window features from the frame cache
+
+at 50% and 90% overlap (or --overlaps, hops rounded to whole STFT frames),
+plus how far the incremental features are from the full ones, in units of
+the full features' spread (they should agree to float32 rounding).
+
+Example:
+    python3 benchmarks/feature_cache.py
+    python3 benchmarks/feature_cache.py --window 5 --overlaps 0.5 0.75 0.9 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from audio_features import HOP_LENGTH, IncrementalFeatureExtractor
+from simple_classifier import SimpleAudioFeatureExtractor
+
+
+def synthetic_audio(seconds: float, sr: int, seed: int = 0) -> np.ndarray:
+    """Background noise with intermittent frequency-modulated calls"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    calls = np.sin(2 * np.pi * (900 + 400 * np.sin(3 * t)) * t) * (np.sin(0.7 * t) > 0.3)
+    return (0.02 * rng.standard_normal(len(t)) + 0.3 * calls).astype(np.float32)
+
+
+def run_overlap(audio: np.ndarray, sr: int, window_seconds: float, overlap: float) -> dict:
+    window = int(window_seconds * sr)
+    # Windows have to start on the cache's frame grid
+    hop = max(HOP_LENGTH, int(window * (1 - overlap)) // HOP_LENGTH * HOP_LENGTH)
+    ends = range(window, len(audio) + 1, hop)
+
+    full = SimpleAudioFeatureExtractor(sr=sr)
+    start = time.perf_counter()
+    full_features = np.array([full.extract_features(audio[end - window:end]) for end in ends])
+    full_seconds = time.perf_counter() - start
+
+    incremental = IncrementalFeatureExtractor(sr=sr, history_seconds=2 * window_seconds)
+    incremental_features = []
+    pushed = 0
+    start = time.perf_counter()
+    for end in ends:
+        incremental.push(audio[pushed:end])
+        pushed = end
+        incremental_features.append(incremental.latest_window_features(audio[end - window:end]))
+    incremental_seconds = time.perf_counter() - start
+    incremental_features = np.array(incremental_features)
+
+    spread = full_features.std(axis=0) + 1e-9
+    deviation = np.abs(incremental_features - full_features) / spread
+    return {
+        "overlap": overlap,
+        "windows": len(full_features),
+        "full_ms_per_window": full_seconds / len(full_features) * 1000,
+        "incremental_ms_per_window": incremental_seconds / len(full_features) * 1000,
+        "speedup": full_seconds / incremental_seconds,
+        "median_deviation": float(np.median(deviation)),
+        "max_deviation": float(deviation.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs incremental (frame cached) feature extraction per window")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the synthetic stream")
+    parser.add_argument("--window", type=float, default=3.0, help="Window length in seconds")
+    parser.add_argument("--overlaps", type=float, nargs="+", default=[0.5, 0.9], help="Window overlap fractions")
+    parser.add_argument("--sr", type=int, default=22050, help="Sample rate")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    audio = synthetic_audio(args.seconds, args.sr)
+    # Warm up librosa's caches and FFT plans before timing
+    run_overlap(audio[:int(2 * args.window * args.sr)], args.sr, args.window, 0.5)
+    results = [run_overlap(audio, args.sr, args.window, overlap) for overlap in args.overlaps]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.window:.1f} s windows over {args.seconds:.0f} s of audio at {args.sr} Hz")
+    print(f"{'overlap':>8}{'windows':>9}{'full ms':>10}{'incr ms':>10}{'speedup':>9}{'med dev':>9}{'max dev':>9}")
+    for result in results:
+        print(f"{result['overlap']:>8.0%}{result['windows']:>9}{result['full_ms_per_window']:>10.2f}"
+              f"{result['incremental_ms_per_window']:>10.2f}{result['speedup']:>8.1f}x"
+              f"{result['median_deviation']:>9.3f}{result['max_deviation']:>9.3f}")
+    print("deviation: |incremental - full| in standard deviations of the full features")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Feature Extraction Benchmark
+
+Checks that SimpleAudioFeatureExtractor.extract_features (one fused STFT, see
+audio_features.fused_features) produces the same 58-dim vectors as the four
+separate librosa calls it replaced, then times both per clip. Features must
+match for the saved simple_animal_classifier.pkl to stay valid.
+
+Exits non-zero if any feature differs by more than --tolerance (relative).
+
+Example:
+    python3 benchmarks/feature_extraction.py
+    python3 benchmarks/feature_extraction.py --seconds 1 3 10 --repeat 20 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import librosa
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from simple_classifier import SimpleAudioFeatureExtractor
+
+
+def librosa_features(audio_data: np.ndarray, sr: int = 22050, n_mfcc: int = 13) -> np.ndarray:
+    """The previous extract_features body: separate librosa passes per feature"""
+    if len(audio_data.shape) > 1:
+        audio_data = audio_data.flatten()
+    if len(audio_data) < 2048:
+        audio_data = np.pad(audio_data, (0, 2048 - len(audio_data)), mode='constant')
+    if np.max(np.abs(audio_data)) > 0:
+        audio_data = audio_data / np.max(np.abs(audio_data))
+    else:
+        return np.zeros(50)
+
+    mfccs = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=n_mfcc)
+    spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sr)[0]
+    zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
+    rms = librosa.feature.rms(y=audio_data)[0]
+    return np.concatenate((
+        np.mean(mfccs, axis=1), np.std(mfccs, axis=1), np.max(mfccs, axis=1), np.min(mfccs, axis=1),
+        [np.mean(spectral_centroids), np.std(spectral_centroids), np.mean(zcr), np.std(zcr),
+         np.mean(rms), np.std(rms)],
+    ))
+
+
+def test_clips(sr: int, seed: int = 0) -> dict:
+    """Clips covering the shapes and dtypes extract_features is called with"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(3 * sr) / sr
+    call = 0.4 * np.sin(2 * np.pi * (1200 + 500 * np.sin(5 * t)) * t) * (np.sin(2 * t) > 0)
+    noisy = call + 0.01 * rng.standard_normal(len(t))
+    return {
+        "call_float32": noisy.astype(np.float32),
+        "call_float64": noisy,
+        "quiet_float32": (1e-4 * noisy).astype(np.float32),
+        "short_padded": noisy[:1000].astype(np.float32),
+        "odd_length": noisy[:sr + 123].astype(np.float32),
+        "stereo_flattened": np.stack((noisy, noisy), axis=1)[:sr].astype(np.float32),
+        "sparse_clicks": np.where(rng.random(len(t)) > 0.999, 1.0, 0.0).astype(np.float32),
+        "silent": np.zeros(sr, dtype=np.float32),
+    }
+
+
+def check_equivalence(extractor: SimpleAudioFeatureExtractor, sr: int, tolerance: float) -> dict:
+    results = {}
+    for name, clip in test_clips(sr).items():
+        expected = librosa_features(clip, sr)
+        actual = extractor.extract_features(clip)
+        if expected.shape != actual.shape:
+            results[name] = {"ok": False, "error": f"shape {actual.shape} != {expected.shape}"}
+            continue
+        scale = np.maximum(np.abs(expected), 1e-3)
+        error = float(np.max(np.abs(actual - expected) / scale))
+        results[name] = {"ok": error <= tolerance, "max_relative_error": error}
+    return results
+
+
+def time_clip_lengths(extractor: SimpleAudioFeatureExtractor, sr: int, seconds_list, repeat: int) -> list:
+    rng = np.random.default_rng(1)
+    timings = []
+    for seconds in seconds_list:
+        clip = (0.1 * rng.standard_normal(int(seconds * sr))).astype(np.float32)
+        row = {"seconds": seconds}
+        for name, func in (("librosa", lambda: librosa_features(clip, sr)), ("fused", lambda: extractor.extract_features(clip))):
+            func()  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            row[f"{name}_ms"] = (time.perf_counter() - start) / repeat * 1000
+        row["speedup"] = row["librosa_ms"] / row["fused_ms"]
+        timings.append(row)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fused single-STFT features vs separate librosa calls")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1.0, 3.0, 10.0], help="Clip lengths to time")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per clip length")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max relative difference per feature")
+    parser.add_argument("--sr", type=int, default=22050, help="Sample rate")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    extractor = SimpleAudioFeatureExtractor(sr=args.sr)
+    report = {
+        "equivalence": check_equivalence(extractor, args.sr, args.tolerance),
+        "timing": time_clip_lengths(extractor, args.sr, args.seconds, args.repeat),
+    }
+    all_ok = all(result["ok"] for result in report["equivalence"].values())
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Equivalence with the librosa features (tolerance {args.tolerance:g} relative)")
+        for name, result in report["equivalence"].items():
+            detail = result.get("error") or f"max error {result['max_relative_error']:.2e}"
+            print(f"  {name:<18} {'ok' if result['ok'] else 'MISMATCH':<9} {detail}")
+        print(f"{'clip s':>8}{'librosa ms':>12}{'fused ms':>10}{'speedup':>9}")
+        for row in report["timing"]:
+            print(f"{row['seconds']:>8.1f}{row['librosa_ms']:>12.2f}{row['fused_ms']:>10.2f}{row['speedup']:>8.1f}x")
+
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Classifier Artifact Benchmark
+
+Compares the pickled sklearn model with the flat .npz artifact
+(classifier_artifact.py):
+
+    load:      fresh interpreter, import + load, as the GUI does at startup
+    inference: scaler + predict_proba latency for a single window's features
+    agreement: max probability difference on random feature vectors
+
+Example:
+    python3 classifier_artifact.py simple_animal_classifier.pkl
+    python3 benchmarks/model_loading.py --repeat 5 --json
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from classifier_artifact import load_artifact
+
+# Run in a child interpreter, prints seconds from before the imports to loaded
+LOAD_STATEMENTS = {
+    "pickle": (
+        "import time; start = time.perf_counter(); import pickle\n"
+        "with open({path!r}, 'rb') as f: pickle.load(f)\n"
+        "import sys; print(time.perf_counter() - start, 'sklearn' in sys.modules)"
+    ),
+    "artifact": (
+        "import time; start = time.perf_counter(); from classifier_artifact import load_artifact\n"
+        "load_artifact({path!r})\n"
+        "import sys; print(time.perf_counter() - start, 'sklearn' in sys.modules)"
+    ),
+}
+
+
+def measure_load(kind: str, path: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-W", "ignore", "-c", LOAD_STATEMENTS[kind].format(path=path)],
+                                cwd=parent_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        seconds, sklearn_imported = result.stdout.split()
+        runs.append(float(seconds))
+    return {"load_ms": min(runs) * 1000, "sklearn_imported": sklearn_imported == "True"}
+
+
+def measure_inference(scaler, model, features: np.ndarray, repeat: int) -> dict:
+    latencies = []
+    for row in features[:repeat]:
+        start = time.perf_counter()
+        model.predict_proba(scaler.transform(row[None, :]))
+        latencies.append(time.perf_counter() - start)
+    latencies_ms = np.array(latencies) * 1000
+    return {"p50_ms": float(np.median(latencies_ms)), "p99_ms": float(np.percentile(latencies_ms, 99))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickle vs .npz artifact load time and inference latency")
+    parser.add_argument("--model", default=os.path.join(parent_dir, "simple_animal_classifier.pkl"), help="Pickled model")
+    parser.add_argument("--artifact", default=None, help="Artifact, defaults to the model path with .npz")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per load measurement")
+    parser.add_argument("--windows", type=int, default=500, help="Single-window predictions to time")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    artifact = args.artifact or os.path.splitext(args.model)[0] + ".npz"
+
+    report = {"load": {
+        "pickle": measure_load("pickle", args.model, args.repeat),
+        "artifact": measure_load("artifact", artifact, args.repeat),
+    }}
+
+    with open(args.model, 'rb') as f:
+        data = pickle.load(f)
+    model, scaler, _classes, _references = load_artifact(artifact)
+    rng = np.random.default_rng(0)
+    features = data['scaler'].mean_ + 2 * data['scaler'].scale_ * rng.standard_normal((args.windows, len(data['scaler'].mean_)))
+
+    # Warm up both paths before timing
+    measure_inference(data['scaler'], data['model'], features, 10)
+    measure_inference(scaler, model, features, 10)
+    report["inference"] = {
+        "pickle": measure_inference(data['scaler'], data['model'], features, args.windows),
+        "artifact": measure_inference(scaler, model, features, args.windows),
+    }
+    expected = data['model'].predict_proba(data['scaler'].transform(features))
+    actual = model.predict_proba(scaler.transform(features))
+    report["max_probability_difference"] = float(np.abs(expected - actual).max())
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'':<10}{'load ms':>10}{'sklearn':>9}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind in ("pickle", "artifact"):
+        load = report["load"][kind]
+        inference = report["inference"][kind]
+        if "error" in load:
+            print(f"{kind:<10} load error: {load['error']}")
+            continue
+        print(f"{kind:<10}{load['load_ms']:>10.1f}{'yes' if load['sklearn_imported'] else 'no':>9}"
+              f"{inference['p50_ms']:>10.3f}{inference['p99_ms']:>10.3f}")
+    print(f"max probability difference: {report['max_probability_difference']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
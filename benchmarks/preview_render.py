@@ -0,0 +1,111 @@
+"""
+Preview Render Benchmark
+
+Frames per second the Tk preview can render, at each camera resolution:
+
+    before: a new ImageTk.PhotoImage from the full-resolution frame every
+            frame (the old video_loop)
+    after:  the frame scaled to the label size by the resize stage, pasted
+            into one reused PhotoImage
+
+Each method renders --frames frames into a label of --label_size, calling
+update() after every frame so Tk actually redraws. The resize runs on the
+pipeline worker in the app, its cost is reported separately. Needs a
+display (run under xvfb-run on a headless machine).
+
+Example:
+    python3 benchmarks/preview_render.py
+    python3 benchmarks/preview_render.py --label_size 960 540 --frames 100 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tkinter as tk
+
+import cv2
+from PIL import Image, ImageTk
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from frame_processing import resize_stage
+from video_buffer_memory import RESOLUTIONS, synthetic_frames
+
+
+def render_new_photo(label, frames, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        frame = cv2.cvtColor(frames[i % len(frames)], cv2.COLOR_BGR2RGB)
+        imgtk = ImageTk.PhotoImage(image=Image.fromarray(frame))
+        label.imgtk = imgtk
+        label.config(image=imgtk)
+        label.update()
+    return count / (time.perf_counter() - start)
+
+
+def render_resized_paste(label, frames, count: int, size) -> tuple:
+    stage = resize_stage(lambda: size)
+    photo = None
+    resize_seconds = 0.0
+    start = time.perf_counter()
+    for i in range(count):
+        resize_start = time.perf_counter()
+        frame = stage.func(frames[i % len(frames)], {})
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        resize_seconds += time.perf_counter() - resize_start
+        img = Image.fromarray(frame)
+        if photo is None:
+            photo = ImageTk.PhotoImage(image=img)
+            label.config(image=photo)
+        else:
+            photo.paste(img)
+        label.update()
+    total = time.perf_counter() - start
+    return count / (total - resize_seconds), resize_seconds / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tk preview render rate before/after resize and PhotoImage reuse")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--label_size", type=int, nargs=2, default=[640, 400], help="Preview label width height")
+    parser.add_argument("--frames", type=int, default=60, help="Frames rendered per method")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"✗ Needs a display: {e}")
+        sys.exit(1)
+    label = tk.Label(root)
+    label.pack()
+
+    results = []
+    for name in args.resolutions:
+        height, width = RESOLUTIONS[name]
+        frames = synthetic_frames(height, width, 4)
+        before_fps = render_new_photo(label, frames, args.frames)
+        after_fps, resize_ms = render_resized_paste(label, frames, args.frames, tuple(args.label_size))
+        results.append({
+            "resolution": name,
+            "before_fps": before_fps,
+            "after_fps": after_fps,
+            "resize_ms_on_worker": resize_ms,
+        })
+    root.destroy()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Label {args.label_size[0]}x{args.label_size[1]}, {args.frames} frames per method")
+    print(f"{'resolution':>10}{'before fps':>12}{'after fps':>11}{'resize ms':>11}")
+    for result in results:
+        print(f"{result['resolution']:>10}{result['before_fps']:>12.1f}{result['after_fps']:>11.1f}"
+              f"{result['resize_ms_on_worker']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Training Data Pipeline Benchmark
+
+Times building the classifier training set three ways:
+
+    serial:   the old path, librosa.load then features (+ one noisy copy) per file
+    cold:     classifier_training.build_training_set with an empty cache
+    warm:     the same again, everything served from the cache
+    one_new:  warm cache plus one added reference file
+
+Uses the reference recordings in --audio_dir, or generates --synthetic
+classes of tone/noise WAV files when that directory doesn't exist. The cache
+lives in a temporary directory and is removed afterwards.
+
+Example:
+    python3 benchmarks/training_pipeline.py --audio_dir "ECE4191 - Potential Audio Targets"
+    python3 benchmarks/training_pipeline.py --synthetic 14 --workers 4 --json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import librosa
+import numpy as np
+import soundfile
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from classifier_training import build_training_set
+from simple_classifier import SimpleAudioFeatureExtractor
+
+
+def extract_animal_name(filename: str) -> str:
+    """Same naming rule as SimpleAnimalClassifier.extract_animal_name"""
+    name = os.path.splitext(filename)[0]
+    if name.endswith('A') or name.endswith('B'):
+        name = name[:-1]
+    return name
+
+
+def write_synthetic_set(directory: str, classes: int, seconds: float, sr: int) -> str:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    for i in range(classes + 1):
+        for variant in "AB":
+            base = 300 + 150 * i
+            call = np.sin(2 * np.pi * (base + 0.2 * base * np.sin((i + 1) * t)) * t) * (np.sin((i + 2) * t) > 0)
+            audio = 0.4 * call + 0.02 * rng.standard_normal(len(t))
+            soundfile.write(os.path.join(directory, f"Animal{i:02d}{variant}.wav"), audio.astype(np.float32), sr)
+    # The last class is held back for the one_new run
+    return os.path.join(directory, f"Animal{classes:02d}A.wav")
+
+
+def serial_baseline(audio_dir: str, extractor, sr: int, extensions) -> float:
+    start = time.perf_counter()
+    for filename in sorted(os.listdir(audio_dir)):
+        if not filename.lower().endswith(extensions):
+            continue
+        audio, _ = librosa.load(os.path.join(audio_dir, filename), sr=sr)
+        extractor.extract_features(audio)
+        extractor.extract_features(audio + 0.005 * np.random.randn(len(audio)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm training data pipeline timing")
+    parser.add_argument("--audio_dir", default="ECE4191 - Potential Audio Targets", help="Reference recordings")
+    parser.add_argument("--synthetic", type=int, default=14, help="Classes to generate if --audio_dir is missing")
+    parser.add_argument("--clip_seconds", type=float, default=10.0, help="Length of synthetic clips")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--skip_serial", action="store_true", help="Don't time the old serial path")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    sr = 22050
+    extractor = SimpleAudioFeatureExtractor(sr=sr)
+    work_dir = tempfile.mkdtemp(prefix="training_pipeline_")
+    try:
+        held_back = None
+        if os.path.isdir(args.audio_dir):
+            audio_dir = os.path.join(work_dir, "audio")
+            shutil.copytree(args.audio_dir, audio_dir)
+            extensions = (".mp3",)
+            candidates = sorted(f for f in os.listdir(audio_dir) if f.lower().endswith(extensions))
+            if candidates:
+                held_back = os.path.join(audio_dir, candidates[-1])
+        else:
+            audio_dir = os.path.join(work_dir, "audio")
+            os.makedirs(audio_dir)
+            extensions = (".wav",)
+            held_back = write_synthetic_set(audio_dir, args.synthetic, args.clip_seconds, sr)
+
+        # Keep one file out of the initial runs so adding it can be timed
+        held_back_store = os.path.join(work_dir, "held_back")
+        if held_back:
+            shutil.move(held_back, held_back_store)
+
+        cache_dir = os.path.join(work_dir, "cache")
+        report = {"files": len(os.listdir(audio_dir)), "workers": args.workers or os.cpu_count()}
+        if not args.skip_serial:
+            report["serial_seconds"] = serial_baseline(audio_dir, extractor, sr, extensions)
+
+        def run(name):
+            start = time.perf_counter()
+            _, _, _, stats = build_training_set(audio_dir, extractor, extract_animal_name, sr, cache_dir,
+                                                max_workers=args.workers, extensions=extensions)
+            report[name] = {"seconds": time.perf_counter() - start, **stats}
+
+        run("cold")
+        run("warm")
+        if held_back:
+            shutil.move(held_back_store, held_back)
+            run("one_new")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{report['files']} reference files, {report['workers']} workers")
+    if "serial_seconds" in report:
+        print(f"  {'serial (1 augmentation)':<26}{report['serial_seconds']:8.2f} s")
+    for name in ("cold", "warm", "one_new"):
+        if name in report:
+            result = report[name]
+            print(f"  {name:<26}{result['seconds']:8.2f} s  ({result['files_processed']} processed, "
+                  f"{result['files_cached']} cached, {result['samples']} samples)")
+
+
+if __name__ == "__main__":
+    main()
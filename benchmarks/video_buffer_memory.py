@@ -0,0 +1,123 @@
+"""
+Video Buffer Memory Benchmark
+
+Memory of the "save past clip" rolling buffer at common resolutions:
+
+    raw:  one BGR array per frame (the old deque of frame copies)
+    jpeg: EncodedFrameBuffer at each --qualities JPEG quality
+
+Frames are a synthetic scene (gradient background, textured moving shapes
+and sensor noise), so sizes are indicative. A real camera image compresses
+about as well, flat test patterns much better. Reports buffer size for
+--fps * --seconds frames, the compression ratio, and the per-frame encode
+(capture thread) and decode (export) cost.
+
+Example:
+    python3 benchmarks/video_buffer_memory.py
+    python3 benchmarks/video_buffer_memory.py --qualities 70 90 --frames 60 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from video_processing import EncodedFrameBuffer
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+def synthetic_frames(height: int, width: int, count: int, seed: int = 0) -> list:
+    """Gradient background with textured shapes drifting across it, plus noise"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    background = np.stack([
+        80 + 60 * x / width,
+        100 + 50 * y / height,
+        90 + 40 * np.sin(x / width * 6 + y / height * 3),
+    ], axis=-1)
+    texture = 25 * np.sin(x / 7) * np.cos(y / 11)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        for k in range(4):
+            cx = (width * (0.2 + 0.2 * k) + i * 4 * (k + 1)) % width
+            cy = height * (0.3 + 0.15 * k)
+            mask = (x - cx) ** 2 + (y - cy) ** 2 < (height * 0.08 * (k + 1)) ** 2
+            frame[mask] = (40 * k + 60 + texture[mask])[:, None]
+        frame += rng.normal(0, 3, frame.shape)
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames
+
+
+def measure(frames: list, quality: int, buffered_frames: int) -> dict:
+    buffer = EncodedFrameBuffer(max_seconds=float("inf"), quality=quality)
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        buffer.append(float(i), frame)
+    encode_seconds = (time.perf_counter() - start) / len(frames)
+
+    entries = buffer.snapshot()
+    start = time.perf_counter()
+    for entry in entries:
+        EncodedFrameBuffer.decode(entry)
+    decode_seconds = (time.perf_counter() - start) / len(entries)
+
+    bytes_per_frame = buffer.nbytes / len(buffer)
+    return {
+        "quality": quality,
+        "bytes_per_frame": bytes_per_frame,
+        "buffer_mb": bytes_per_frame * buffered_frames / 2 ** 20,
+        "encode_ms": encode_seconds * 1000,
+        "decode_ms": decode_seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw vs JPEG rolling video buffer memory")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--qualities", type=int, nargs="+", default=[75, 90], help="JPEG qualities to measure")
+    parser.add_argument("--fps", type=int, default=24, help="Stream frame rate")
+    parser.add_argument("--seconds", type=int, default=30, help="Seconds kept in the buffer")
+    parser.add_argument("--frames", type=int, default=48, help="Frames encoded per measurement")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    buffered_frames = args.fps * args.seconds
+    results = []
+    for name in args.resolutions:
+        height, width = RESOLUTIONS[name]
+        frames = synthetic_frames(height, width, args.frames)
+        raw_bytes = frames[0].nbytes
+        result = {
+            "resolution": name,
+            "raw_bytes_per_frame": raw_bytes,
+            "raw_buffer_mb": raw_bytes * buffered_frames / 2 ** 20,
+            "jpeg": [measure(frames, quality, buffered_frames) for quality in args.qualities],
+        }
+        for jpeg in result["jpeg"]:
+            jpeg["reduction"] = raw_bytes / jpeg["bytes_per_frame"]
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Rolling buffer of {buffered_frames} frames ({args.seconds} s at {args.fps} fps)")
+    print(f"{'resolution':>10}{'format':>10}{'KB/frame':>10}{'buffer MB':>11}{'smaller':>9}{'enc ms':>8}{'dec ms':>8}")
+    for result in results:
+        print(f"{result['resolution']:>10}{'raw':>10}{result['raw_bytes_per_frame'] / 1024:>10.0f}"
+              f"{result['raw_buffer_mb']:>11.0f}{'1x':>9}{'':>8}{'':>8}")
+        for jpeg in result["jpeg"]:
+            print(f"{'':>10}{'jpeg q' + str(jpeg['quality']):>10}{jpeg['bytes_per_frame'] / 1024:>10.0f}"
+                  f"{jpeg['buffer_mb']:>11.0f}{jpeg['reduction']:>8.0f}x{jpeg['encode_ms']:>8.1f}{jpeg['decode_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
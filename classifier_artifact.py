@@ -0,0 +1,172 @@
+"""
+Flat-array model artifact for SimpleAnimalClassifier.
+
+The pickle holds live sklearn objects, so loading it imports sklearn and
+rebuilds the whole object graph. The artifact stores the same model as plain
+arrays in an uncompressed .npz, with a format name and version header:
+
+    scaler_mean, scaler_scale          StandardScaler parameters
+    classes, reference_features        class names and per-class reference vectors
+    feature, threshold, left, right    all forest nodes, trees concatenated
+    value                              per-node class probabilities
+    roots                              index of each tree's root node
+
+ForestEvaluator and ArtifactScaler mirror the predict_proba / transform
+interface the classifier uses, so they can stand in for the sklearn objects.
+Only numpy is needed to load and predict.
+
+Convert an existing pickle with:
+    python3 classifier_artifact.py simple_animal_classifier.pkl
+"""
+
+import json
+import sys
+
+import numpy as np
+
+ARTIFACT_FORMAT = "simple_animal_classifier"
+ARTIFACT_VERSION = 1
+
+
+class ArtifactScaler:
+    """StandardScaler.transform from stored parameters"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class ForestEvaluator:
+    """RandomForestClassifier.predict_proba over flattened trees.
+
+    Leaves point to themselves, so every tree is walked for max_depth steps
+    for all samples at once without per-node branching.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node index per (sample, tree)"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def flatten_forest(model) -> dict:
+    """Concatenate the nodes of every tree in a fitted RandomForestClassifier"""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+        # Leaves loop back to themselves and test feature 0 (the result is ignored)
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        values.append(value / np.where(totals == 0, 1.0, totals))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    index_dtype = np.int32 if offset < 2 ** 31 else np.int64
+    return {
+        "feature": np.concatenate(features).astype(index_dtype),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts).astype(index_dtype),
+        "right": np.concatenate(rights).astype(index_dtype),
+        "value": np.concatenate(values),
+        "roots": np.array(roots, dtype=index_dtype),
+        "model_classes": np.asarray(model.classes_),
+        "max_depth": np.array(max_depth),
+    }
+
+
+def save_artifact(path: str, model, scaler, classes, reference_features: dict):
+    """Write a fitted forest, scaler, class list and reference features to path (.npz)"""
+    has_reference = [name in reference_features for name in classes]
+    references = np.array([reference_features.get(name, np.zeros(len(scaler.mean_))) for name in classes])
+    header = {"format": ARTIFACT_FORMAT, "version": ARTIFACT_VERSION, "num_features": int(len(scaler.mean_))}
+    np.savez(
+        path,
+        header=np.array(json.dumps(header)),
+        scaler_mean=scaler.mean_,
+        scaler_scale=scaler.scale_,
+        classes=np.array(classes),
+        reference_features=references,
+        has_reference=np.array(has_reference),
+        **flatten_forest(model),
+    )
+
+
+def load_artifact(path: str):
+    """
+    Load a saved artifact.
+
+    Returns:
+        Tuple[ForestEvaluator, ArtifactScaler, List[str], Dict[str, np.ndarray]]: model, scaler, classes, reference features
+    """
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data["header"]))
+        if header.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} artifact")
+        if header.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"{path} has artifact version {header.get('version')}, expected {ARTIFACT_VERSION}")
+
+        classes = [str(name) for name in data["classes"]]
+        reference_features = {
+            name: data["reference_features"][i]
+            for i, name in enumerate(classes) if data["has_reference"][i]
+        }
+        model = ForestEvaluator(
+            data["feature"], data["threshold"], data["left"], data["right"], data["value"],
+            data["roots"], data["model_classes"], data["max_depth"],
+        )
+        scaler = ArtifactScaler(data["scaler_mean"], data["scaler_scale"])
+    return model, scaler, classes, reference_features
+
+
+def main():
+    import os
+    import pickle
+
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} model.pkl [artifact.npz]")
+        sys.exit(1)
+    pickle_path = sys.argv[1]
+    artifact_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(pickle_path)[0] + ".npz"
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+    save_artifact(artifact_path, data['model'], data['scaler'], data['classes'], data['reference_features'])
+    print(f"✓ Wrote {artifact_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Parallel, cached training data pipeline for SimpleAnimalClassifier.
+
+Each reference file is decoded and turned into feature vectors (the clip
+itself plus one augmented copy per entry in AUGMENTATIONS) in a process pool.
+Decoded audio and per-file feature matrices are cached on disk under the
+SHA-256 of the file contents, so a retrain only processes files that are new
+or changed, and changing the augmentations or feature extractor settings only
+redoes feature extraction, not decoding.
+
+The process pool needs the calling script's top level to be under an
+`if __name__ == "__main__":` guard on platforms that start workers with
+spawn (Windows, macOS), because each worker re-imports the main module.
+Pass max_workers=1 to extract in the calling process instead. Inside a
+worker process (e.g. an unguarded script being re-imported) extraction also
+runs serially rather than starting a nested pool.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import librosa
+import numpy as np
+
+DEFAULT_CACHE_DIR = ".classifier_cache"
+
+# Bump when feature extraction changes in a way its settings don't capture
+FEATURE_VERSION = 1
+
+# (name, parameters) of the augmented copies made of every reference clip
+AUGMENTATIONS = (
+    ("noise", {"scale": 0.005}),
+    ("shift", {"max_fraction": 0.25}),
+    ("gain", {"min_db": -12.0, "max_db": 6.0}),
+    ("pitch", {"max_steps": 2.0}),
+    ("background", {"min_snr_db": 5.0, "max_snr_db": 20.0}),
+)
+
+
+def file_content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_atomic(path: str, array: np.ndarray):
+    # Workers may race on the same entry, never leave a partial file behind
+    temp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(temp_path, array)
+    os.replace(temp_path, path)
+
+
+def load_audio_cached(path: str, content_hash: str, sample_rate: int, cache_dir: str) -> np.ndarray:
+    """librosa.load(path, sr=sample_rate), decoded once per file content."""
+    cache_path = os.path.join(cache_dir, "audio", f"{content_hash}_{sample_rate}.npy")
+    if os.path.exists(cache_path):
+        return np.load(cache_path)
+    audio, _ = librosa.load(path, sr=sample_rate)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    _save_atomic(cache_path, audio)
+    return audio
+
+
+def _background(length: int, rng: np.random.Generator, backgrounds: Sequence[np.ndarray]) -> np.ndarray:
+    if backgrounds:
+        source = backgrounds[rng.integers(len(backgrounds))]
+        if len(source) < length:
+            source = np.tile(source, length // len(source) + 1)
+        start = rng.integers(len(source) - length + 1)
+        return source[start:start + length]
+    # Brown-ish noise (wind, traffic) when no background recordings are given
+    noise = np.cumsum(rng.standard_normal(length))
+    noise -= np.convolve(noise, np.ones(256) / 256, mode="same")
+    return noise
+
+
+def augment(audio: np.ndarray, sample_rate: int, name: str, params: dict,
+            rng: np.random.Generator, backgrounds: Sequence[np.ndarray] = ()) -> np.ndarray:
+    """Return an augmented copy of a clip. See AUGMENTATIONS for the parameters."""
+    if name == "noise":
+        return audio + params["scale"] * rng.standard_normal(len(audio))
+    if name == "shift":
+        limit = int(params["max_fraction"] * len(audio))
+        return np.roll(audio, rng.integers(-limit, limit + 1))
+    if name == "gain":
+        return audio * 10 ** (rng.uniform(params["min_db"], params["max_db"]) / 20)
+    if name == "pitch":
+        steps = rng.uniform(-params["max_steps"], params["max_steps"])
+        return librosa.effects.pitch_shift(audio, sr=sample_rate, n_steps=steps)
+    if name == "background":
+        background = _background(len(audio), rng, backgrounds)
+        signal_power = np.mean(np.square(audio)) + 1e-12
+        background_power = np.mean(np.square(background)) + 1e-12
+        snr_db = rng.uniform(params["min_snr_db"], params["max_snr_db"])
+        return audio + background * np.sqrt(signal_power / (background_power * 10 ** (snr_db / 10)))
+    raise ValueError(f"Unknown augmentation {name!r}")
+
+
+def _features_key(feature_extractor, sample_rate: int, augmentations, background_hashes) -> str:
+    settings = {
+        "version": FEATURE_VERSION,
+        "extractor": type(feature_extractor).__name__,
+        "extractor_settings": vars(feature_extractor),
+        "sample_rate": sample_rate,
+        "augmentations": augmentations,
+        "backgrounds": background_hashes,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _clip_features(task) -> Tuple[str, Optional[np.ndarray], bool, float, Optional[str]]:
+    """
+    Process pool worker: feature rows (original + augmented copies) for one file.
+
+    Returns:
+        Tuple: path, features (None if the file failed), from cache, seconds, error message
+    """
+    path, content_hash, features_key, sample_rate, cache_dir, feature_extractor, augmentations, backgrounds = task
+    start = time.perf_counter()
+    try:
+        cache_path = os.path.join(cache_dir, "features", f"{content_hash}_{features_key}.npy")
+        if os.path.exists(cache_path):
+            return path, np.load(cache_path), True, time.perf_counter() - start, None
+
+        audio = load_audio_cached(path, content_hash, sample_rate, cache_dir)
+        background_audio = [load_audio_cached(p, h, sample_rate, cache_dir) for p, h in backgrounds]
+        rows = [feature_extractor.extract_features(audio)]
+        for index, (name, params) in enumerate(augmentations):
+            # Seeded from the file so cached and recomputed features agree
+            rng = np.random.default_rng([int(content_hash[:16], 16), index])
+            rows.append(feature_extractor.extract_features(augment(audio, sample_rate, name, params, rng, background_audio)))
+
+        features = np.stack(rows)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        _save_atomic(cache_path, features)
+        return path, features, False, time.perf_counter() - start, None
+    except Exception as e:
+        # One unreadable file must not take the whole training run down with it
+        return path, None, False, time.perf_counter() - start, str(e) or type(e).__name__
+
+
+def _map_files(func, tasks, max_workers: int = None):
+    """executor.map over a process pool, or the builtin map when a pool can't or shouldn't be used"""
+    if max_workers == 1 or multiprocessing.parent_process() is not None:
+        yield from map(func, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(func, tasks)
+
+
+def build_training_set(
+    audio_dir: str,
+    feature_extractor,
+    label_func: Callable[[str], str],
+    sample_rate: int = 22050,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    augmentations=AUGMENTATIONS,
+    background_files: Sequence[str] = (),
+    max_workers: int = None,
+    extensions: Tuple[str, ...] = (".mp3",),
+) -> Tuple[np.ndarray, np.ndarray, List[str], Dict[str, float]]:
+    """
+    Features and labels for every reference file in audio_dir.
+
+    Args:
+        audio_dir: Directory of reference recordings
+        feature_extractor: Picklable object with extract_features(audio) -> 1D array
+        label_func: Maps a file name to its class name
+        sample_rate: Rate audio is decoded at
+        cache_dir: Root of the decoded audio / features cache
+        augmentations: (name, params) pairs, one augmented copy each per file
+        background_files: Recordings mixed in by the "background" augmentation
+        max_workers: Process pool size, None for one per CPU, 1 to extract serially in this process
+        extensions: File extensions treated as reference audio
+
+    Returns:
+        Tuple: X (samples, features), y (class indices), sorted class names, timing stats
+
+    Raises:
+        ValueError: If no file could be turned into features
+    """
+    start = time.perf_counter()
+    filenames = sorted(f for f in os.listdir(audio_dir) if f.lower().endswith(extensions))
+    paths = [os.path.join(audio_dir, f) for f in filenames]
+    labels = {path: label_func(f) for path, f in zip(paths, filenames)}
+
+    hashes = {path: file_content_hash(path) for path in paths}
+    backgrounds = [(path, file_content_hash(path)) for path in background_files]
+    augmentations = [(name, dict(params)) for name, params in augmentations]
+    features_key = _features_key(feature_extractor, sample_rate, augmentations, [h for _, h in backgrounds])
+    hashed = time.perf_counter()
+
+    print(f"Extracting features for {len(paths)} reference files ({len(augmentations)} augmentations each)...")
+    tasks = [
+        (path, hashes[path], features_key, sample_rate, cache_dir, feature_extractor, augmentations, backgrounds)
+        for path in paths
+    ]
+    results = {}
+    cached = 0
+    failed = 0
+    for path, features, from_cache, seconds, error in _map_files(_clip_features, tasks, max_workers):
+        if error is not None:
+            failed += 1
+            print(f"  ✗ Error loading {os.path.basename(path)}: {error}")
+            continue
+        results[path] = features
+        cached += from_cache
+        status = "cached" if from_cache else f"{seconds:.1f}s"
+        print(f"  ✓ {os.path.basename(path)} -> {labels[path]} ({status})")
+
+    # Files that failed are left out, along with any class they were the only example of
+    loaded = [path for path in paths if path in results]
+    if not loaded:
+        raise ValueError(
+            f"No training data: {len(paths)} files in {audio_dir!r} matched {', '.join(extensions)}"
+            + (f", all {failed} failed to load" if failed else "")
+        )
+    classes = sorted({labels[path] for path in loaded})
+    X = np.concatenate([results[path] for path in loaded])
+    y = np.concatenate([np.full(len(results[path]), classes.index(labels[path])) for path in loaded])
+    stats = {
+        "files": len(paths),
+        "files_cached": cached,
+        "files_processed": len(loaded) - cached,
+        "files_failed": failed,
+        "samples": len(X),
+        "hash_seconds": hashed - start,
+        "total_seconds": time.perf_counter() - start,
+    }
+    print(f"Generated {len(X)} training samples in {stats['total_seconds']:.1f}s ({cached}/{len(paths)} files from cache"
+          + (f", {failed} failed)" if failed else ")"))
+    return X, y, classes, stats
@@ -9,15 +9,21 @@ import vlc
 import threading
 import time
 import datetime
-from collections import deque
 
 import sounddevice as sd
 import numpy as np
-import wave
 import requests
 
-# Import the high accuracy audio classifier
-from high_accuracy_classifier import HighAccuracyAnimalClassifier
+# The audio classifier is imported in _init_audio_classifier, under the startup profiler
+from startup_profiler import StartupProfiler
+from audio_processing import AudioRingBuffer, DownmixResampleStage
+from audio_detection import StreamingClassifierDriver
+from audio_visualisation import IncrementalSpectrogram, SpectrogramView
+from video_processing import EncodedFrameBuffer, FrameGrabber, StreamRecorder
+from export_service import ExportService, aligned_pcm16
+from object_detection import DetectionWorker, OnnxDetector, detection_overlay_source
+from frame_processing import (FramePipeline, FrameStage, GrayWorldAWB, PipelineWorker, awb_stage,
+                              color_convert_stage, draw_detections, resize_stage)
 
 pan_speed_percent = 0  # start at middle
 tilt_angle = 0
@@ -30,18 +36,51 @@ class DeviceControl(tk.Frame):
         self.recorded_audio_file = f"media/recorded_audio.ogg"
         self.buffer_audio_clip_file = f"media/buffer_audio.wav" # filename for the audio clip saved by the audio buffer
         self.recorded_video_file = f"media/recorded_video.mp4" # filename for the manually recorded video clip
+        self.buffer_av_clip_file = f"media/av_clip.mp4" # filename for the combined audio and video clip
 
         ## Video stream stuff
         self.fps = 24   # FPS of the stream
         self.buffer_seconds = 30  # how many seconds to keep for save past clip functionality
-        self.frame_buffer = deque(maxlen=self.fps * self.buffer_seconds)    # where frames for the past clip are stored
+        self.buffer_jpeg_quality = 90
+        # where frames for the past clip are stored, JPEG-encoded with capture timestamps
+        self.frame_buffer = EncodedFrameBuffer(self.buffer_seconds, max_frames=self.fps * self.buffer_seconds * 2,
+                                               quality=self.buffer_jpeg_quality)
+        self.display_fps = 30  # how often the newest frame is rendered, independent of the stream rate
+        self.frame_grabber = None  # reads the stream on its own thread, see stream_toggle
+        self.frames_displayed = 0
+        self.frames_skipped = 0  # read but replaced by a newer frame before they were displayed
+        self._last_displayed_sequence = 0
 
         ## Audio Stream stuff
         # audio buffer 
         self.audio_buffer_seconds = 30  # how many seconds of audio to keep
         self.audio_sample_rate = 44100  
         self.audio_channels = 2
-        self.audio_buffer = deque(maxlen=self.audio_buffer_seconds * self.audio_sample_rate // 1024)  # 1024-frame chunks
+        # preallocated float32 history, written in place by the capture callback
+        self.audio_buffer = AudioRingBuffer(
+            self.audio_buffer_seconds * self.audio_sample_rate,
+            channels=self.audio_channels,
+            sample_rate=self.audio_sample_rate,
+            mirrored=False  # only read in whole windows when saving, no need for contiguous views
+        )
+        # how much later the video stream delivers a frame than the microphone hears the same moment,
+        # combined clips take a frame's audio from this many seconds before its timestamp
+        self.av_offset_seconds = 0.0
+
+        # classifier input: mono audio resampled to the rate the feature extractor assumes,
+        # filled straight from the capture callback
+        self.classifier_sample_rate = 22050  # SimpleAudioFeatureExtractor sr
+        self.classification_window_seconds = 10
+        # overlapping windows so calls between window starts are still heard whole
+        self.classification_hop_seconds = 2
+        # twice the window so a window read stays valid while it is being classified
+        self.classification_buffer = AudioRingBuffer(
+            2 * self.classification_window_seconds * self.classifier_sample_rate,
+            sample_rate=self.classifier_sample_rate
+        )
+        self.classification_stage = DownmixResampleStage(
+            self.audio_sample_rate, self.classifier_sample_rate, self.classification_buffer, max_block=1024
+        )
         
         self.audio_stream_process = None
         
@@ -54,7 +93,9 @@ class DeviceControl(tk.Frame):
         self.classification_enabled = False
         self.classification_thread = None
         self.detected_creatures = []
-        self.creature_counts = {}  # Track occurrence counts for top 1 predictions
+        self.creature_counts = {}  # Track occurrence counts of detection events
+        self.classification_driver = None
+        self.classifier_startup_log = "classifier_startup_log.jsonl"  # phase timings, one JSON line per start
         self.recent_predictions = []  # Store recent top 3 predictions
         
         # Initialize audio classifier in a separate thread to avoid blocking UI
@@ -66,15 +107,38 @@ class DeviceControl(tk.Frame):
 
         # variables to control the live recording function
         self.recording = False
-        self.record_start_time = None
         self.max_record_seconds = 60
-        self.recorded_frames = deque(maxlen=self.fps * self.max_record_seconds)
-        self.record_thread = None
+        self.recorder = None  # StreamRecorder listening to the frame grabber while recording
+        self.audio_recorder = None
+
+        # Clip saving runs on background workers, so exports never stall the UI or the live stream
+        self.export_service = ExportService(workers=2, on_update=self._on_export_update)
 
         # Variable to control the camera torches
         self.torch_1 = tk.BooleanVar(value=False)
         self.torch_2 = tk.BooleanVar(value=False)
         self.awb_enabled = tk.BooleanVar(value=False)
+        self.awb = GrayWorldAWB(update_interval=5, smoothing=0.3, subsample=8)
+
+        # Preview processing, run on a worker thread (PipelineWorker) while streaming.
+        # Stages are switched by the AWB and bounding box buttons
+        self.preview_size = None  # inner size of video_label, kept up to date by <Configure>
+        self._preview_photo = None  # one PhotoImage per preview size, frames are pasted into it
+        self.frame_pipeline = FramePipeline([
+            resize_stage(lambda: self.preview_size),  # PhotoImage cost scales with pixels, render at widget size
+            color_convert_stage(cv2.COLOR_BGR2RGB),  # new array, later stages work in place
+            awb_stage(self.awb, enabled=self.awb_enabled.get()),
+            FrameStage("detections", detection_overlay_source(lambda: self.detection_worker), enabled=False),
+            FrameStage("overlay", draw_detections, enabled=False),
+        ])
+        self.pipeline_worker = None
+
+        # Animal detector for the bounding box overlay, a YOLO-style ONNX model with
+        # its class names (one per line) in a .txt file of the same name. Neither
+        # ships with the repo, models/README.md describes how to export them
+        self.detector_model_path = "models/animal_detector.onnx"
+        self.detector_max_load = 0.5  # share of time the detector may spend inferring
+        self.detection_worker = None
         
         self.layout()
 
@@ -91,6 +155,8 @@ class DeviceControl(tk.Frame):
 
         self.video_label = tk.Label(self.video_frame, bd=1, relief="groove")
         self.video_label.pack(fill="both", expand=True, padx=10, pady=10)
+        self.video_stats_label = tk.Label(self.video_frame, text="", anchor="w", justify="left")
+        self.video_stats_label.pack(fill="x", padx=10)
         img = Image.open("stream_standby_image.jpg").resize((600, 400))
         self.stream_standby_photo = ImageTk.PhotoImage(img)
         self.video_label.config(image=self.stream_standby_photo)
@@ -100,6 +166,7 @@ class DeviceControl(tk.Frame):
         self.video_label.bind("<KeyPress>", self.keydown)
         self.video_label.bind("<KeyRelease>", self.keyup)
         self.video_label.bind("<Button-1>", lambda e: self.video_label.focus_set())
+        self.video_label.bind("<Configure>", self._on_video_label_configure)
 
         # Right panel
         right_frame = tk.Frame(main_frame)
@@ -197,6 +264,8 @@ class DeviceControl(tk.Frame):
 
         def awb_control():
             self.awb_enabled.set(not self.awb_enabled.get())
+            self.awb.reset()  # estimate fresh gains for the current scene
+            self.frame_pipeline.set_enabled("awb", self.awb_enabled.get())
             btn_awb.config(text=f"AWB: {'ON' if self.awb_enabled.get() else 'OFF'}")
 
         btn_torch_1 = tk.Button(
@@ -239,7 +308,16 @@ class DeviceControl(tk.Frame):
         self.record_button.grid(row=0, column=2, sticky="nsew")
         self.stream_toggle_button.grid(row=1, column=0, sticky="nsew")
         # tk.Button(button_frame, text="Audio filter toggle", width=18).grid(row=1, column=1, sticky="nsew")
-        tk.Button(button_frame, text="Bounding Box Toggle", width=18).grid(row=1, column=2, sticky="nsew")
+        self.bounding_box_button = tk.Button(button_frame, text="Bounding Boxes: OFF", width=18, command=self.toggle_bounding_boxes)
+        self.bounding_box_button.grid(row=1, column=2, sticky="nsew")
+        if not os.path.exists(self.detector_model_path):
+            # No model ships with the repo, see models/README.md for how to make one
+            self.bounding_box_button.config(text="Bounding Boxes: no model", state=tk.DISABLED)
+            print(f"✗ Detector model not found: {self.detector_model_path}, bounding boxes disabled "
+                  f"(see models/README.md)")
+        tk.Button(button_frame, text="Save last 30s A/V", width=18, command=self.save_last_av).grid(row=2, column=0, sticky="nsew")
+        self.export_status_label = tk.Label(button_frame, text="", anchor="w", justify="left")
+        self.export_status_label.grid(row=3, column=0, columnspan=3, sticky="ew")
         
         # --- Audio Section ---
         bottom_frame = tk.Frame(self)
@@ -252,6 +330,13 @@ class DeviceControl(tk.Frame):
         audio_frame = tk.LabelFrame(bottom_left_frame, text="Audio Visualisation")
         audio_frame.pack(side="top", fill="both", expand=True, padx=10, pady=5)
 
+        # Live spectrogram of the microphone, from the mono classifier-rate buffer the capture callback fills
+        self.spectrogram_view = SpectrogramView(
+            audio_frame, IncrementalSpectrogram(self.classification_buffer, rows=128), width=400, max_fps=15
+        )
+        self.spectrogram_view.pack(side="top", anchor="w", padx=10, pady=5)
+        self.spectrogram_view.start()
+
         # Right: Audio controls
         bottom_right_frame = tk.Frame(bottom_frame)
         bottom_right_frame.pack(side="right", fill="both")
@@ -307,16 +392,35 @@ class DeviceControl(tk.Frame):
     ### Video capture rolling buffer 
     def save_last_video(self):
         output_file = self._name_output_file("media/video_clip.mp4")
-        if not self.frame_buffer:
+        frames = self.frame_buffer.snapshot()
+        if not frames:
             print("No frames in buffer!")
             return 0
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_file, fourcc, self.fps,
-                              (self.frame_buffer[0].shape[1], self.frame_buffer[0].shape[0]))
-        for f in list(self.frame_buffer):
-            out.write(f)
-        out.release()
-        print(f"Saved last 30 seconds of video to {output_file}")
+        # Write at the rate the frames actually arrived, so the clip plays back in real time
+        fps = EncodedFrameBuffer.measured_fps(frames, self.fps)
+        # The snapshot holds references to the encoded frames, decoding happens on the export worker
+        self.export_service.submit_video(output_file, frames, fps, decode=EncodedFrameBuffer.decode)
+        print(f"Saving last {frames[-1][0] - frames[0][0]:.1f} seconds of video ({len(frames)} frames at {fps:.1f} fps) to {output_file}")
+        return 1
+
+    def save_last_av(self):
+        """
+        Save the last buffer_seconds of video together with the audio captured over
+        the same time span, as one file.
+        """
+        output_file = self._name_output_file(self.buffer_av_clip_file)
+        frames = self.frame_buffer.snapshot(self.buffer_seconds)
+        if not frames:
+            print("No frames in buffer!")
+            return 0
+        if not self.audio_buffer.has_timestamps:
+            print("No audio in buffer!")
+            return 0
+        start, end = frames[0][0], frames[-1][0] + 1 / self.fps
+        # Copy the matching audio now, the ring buffer keeps overwriting it
+        audio = aligned_pcm16(self.audio_buffer, start - self.av_offset_seconds, end - self.av_offset_seconds)
+        self.export_service.submit_av(output_file, frames, self.fps, audio, self.audio_sample_rate)
+        print(f"Saving last {end - start:.1f} seconds of audio and video to {output_file}")
         return 1
     
     
@@ -326,69 +430,63 @@ class DeviceControl(tk.Frame):
         Toggles the recording function. This is to be called by the recording button whne the user presses it
         """
         if not self.recording:
+            if self.frame_grabber is None:
+                print("Start the stream before recording")
+                return
             # Start recording
             self.recording = True
-            self.record_start_time = time.time()
-            self.recorded_frames.clear()
-
-            # Start background thread to record video + audio
-            self.record_thread = threading.Thread(target=self._record_loop, daemon=True)
-            self.record_thread.start()
+            # Write at the rate the stream has actually been delivering, so playback runs in real time
+            fps = EncodedFrameBuffer.measured_fps(self.frame_buffer.snapshot(), self.fps)
+            self.recorder = StreamRecorder(
+                self._name_output_file(self.recorded_video_file), fps,
+                max_seconds=self.max_record_seconds,
+                on_finished=lambda recorder: self.after(0, self._finish_recording, recorder)
+            )
+            self.frame_grabber.add_listener(self.recorder.on_frame)
+            self._start_audio_recording()
 
             self.record_button.config(bg="red", text="Stop Recording")
             print("Recording started")
-        else:
-            # Stop recording
-            self.recording = False
-            self.record_button.config(bg="white", text="Start Recording") # set record button back to white
+        elif self.recorder is not None:
+            # Stop recording, the file is closed and the button reset in _finish_recording
+            self.recorder.stop()
+            self.record_button.config(text="Saving...")
             print("Recording stopped")
-            # self._save_recording()
 
 
-    def _record_loop(self):
+    def _start_audio_recording(self):
         """
-        Background loop to capture video frames and audio while recording.
-        Stops automatically after self.max_record_seconds.
+        Optional: Record audio via VLC stream alongside the video
         """
-        # Optional: Record audio via VLC stream
         output_file = self._name_output_file(self.recorded_audio_file)
         options = f":sout=#file{{dst={output_file}}}"
         media = self.instance.media_new(globals.audio_url, options)
-        recorder = self.instance.media_player_new()
-        recorder.set_media(media)
-        recorder.play()
-
-        while self.recording:
-            if self.frame_buffer:
-                self.recorded_frames.append(self.frame_buffer[-1].copy())
-            if time.time() - self.record_start_time >= self.max_record_seconds:
-                self.recording = False
-                self.toggle_recording()
-                print("recording limit reached")
-                break
-            time.sleep(1 / self.fps)  # sync to frame rate
+        self.audio_recorder = self.instance.media_player_new()
+        self.audio_recorder.set_media(media)
+        self.audio_recorder.play()
 
-        recorder.stop()
-        self._save_video_recording()
 
-
-    def _save_video_recording(self):
+    def _finish_recording(self, recorder):
         """
-        This function saves the manual recording to the output file.
+        Runs on the Tk thread once the recorder has closed its file, whether it was stopped
+        by the button, by reaching max_record_seconds or by the stream stopping.
         """
-        if not self.recorded_frames:
+        if self.frame_grabber is not None:
+            self.frame_grabber.remove_listener(recorder.on_frame)
+        if self.audio_recorder is not None:
+            self.audio_recorder.stop()
+            self.audio_recorder = None
+        if recorder.duration >= self.max_record_seconds:
+            print("recording limit reached")
+        if recorder.error:
+            print(f"Recording failed: {recorder.error}")
+        elif recorder.frames_received == 0:
             print("No frames recorded!")
-            return
-        
-        output_file = self._name_output_file(self.recorded_video_file)
-
-        # Save video
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        height, width = self.recorded_frames[0].shape[:2]
-        out = cv2.VideoWriter(output_file, fourcc, self.fps, (width, height))
-        for f in self.recorded_frames:
-            out.write(cv2.cvtColor(f, cv2.COLOR_BGR2RGB))
-        out.release()
+        else:
+            print(f"Saved recording {recorder.summary(self.fps)}")
+        self.recording = False
+        self.recorder = None
+        self.record_button.config(bg="white", text="Start Recording") # set record button back to white
 
 
     ### Audio capture rolling buffer
@@ -396,11 +494,13 @@ class DeviceControl(tk.Frame):
         """
         Continuously capture audio into a rolling memory buffer.
         """
-        def callback(indata, frames, time, status):
+        def callback(indata, frames, time_info, status):
             if status:
                 print(status)
-            # store a copy of the chunk in the rolling buffer
-            self.audio_buffer.append(indata.copy())
+            # copy the chunk into the rolling buffer, stamped on the same clock as the video frames
+            self.audio_buffer.write(indata, time.monotonic())
+            # mono, classifier-rate copy for classification
+            self.classification_stage.process(indata)
 
         with sd.InputStream(
             samplerate=self.audio_sample_rate,
@@ -416,65 +516,67 @@ class DeviceControl(tk.Frame):
         """
         Save the last N seconds of audio from the buffer to a WAV file.
         """
-        if not self.audio_buffer:
+        if len(self.audio_buffer) == 0:
             print("No audio in buffer!")
             return
 
-        # Concatenate all buffered chunks
-        data = np.concatenate(list(self.audio_buffer), axis=0)
-
-        # Convert float32 (-1.0 to 1.0) to 16-bit PCM
-        pcm_data = (data * 32767).astype(np.int16)
+        # Read by absolute index from one total_written snapshot, and keep clear of the
+        # oldest 100 ms: the capture callback may be overwriting them while we copy
+        ring = self.audio_buffer
+        end = ring.total_written
+        n = min(end, ring.capacity) - self.audio_sample_rate // 10
+        if n <= 0:
+            print("No audio in buffer!")
+            return
+        # Take the 16-bit PCM copy now (a few ms) and leave the file writing to the export worker
+        blocks = [(np.clip(ring.window(end, n), -1.0, 1.0) * 32767).astype(np.int16)]
 
         write_file = self._name_output_file(self.buffer_audio_clip_file)
-
-        # Write to WAV file
-        with wave.open(write_file, "wb") as wf:
-            wf.setnchannels(self.audio_channels)
-            wf.setsampwidth(2)  # 16-bit
-            wf.setframerate(self.audio_sample_rate)
-            wf.writeframes(pcm_data.tobytes())
-
-        print(f"Saved last {self.audio_buffer_seconds} seconds of audio to {write_file}")
+        self.export_service.submit_wav(write_file, blocks, self.audio_sample_rate, self.audio_channels)
+        print(f"Saving last {self.audio_buffer_seconds} seconds of audio to {write_file}")
 
     def stream_toggle(self):
-        def gray_world_awb(img):
-            # Convert to float
-            img_float = img.astype(np.float32)
-            
-            # Compute average per channel
-            avg_b = np.mean(img_float[:, :, 0])
-            avg_g = np.mean(img_float[:, :, 1])
-            avg_r = np.mean(img_float[:, :, 2])
-            
-            # Compute scale factors
-            avg_gray = (avg_b + avg_g + avg_r) / 3
-            scale_b = avg_gray / avg_b
-            scale_g = avg_gray / avg_g
-            scale_r = avg_gray / avg_r
-            
-            # Apply scaling
-            img_float[:, :, 0] *= scale_b
-            img_float[:, :, 1] *= scale_g
-            img_float[:, :, 2] *= scale_r
-            
-            # Clip and convert back
-            img_float = np.clip(img_float, 0, 255).astype(np.uint8)
-            return img_float
-
         def video_loop():
-            ret, frame = globals.capture.read()
-            if ret:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                #frame = cv2.resize(frame, (600, 400))  # fit the label size
-                if self.awb_enabled.get():
-                    frame = gray_world_awb(frame)
-                img = Image.fromarray(frame)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.video_label.imgtk = imgtk
-                self.video_label.config(image=imgtk)
-                self.video_label.after(1, video_loop)  # schedule next frame
-                self.frame_buffer.append(frame.copy()) # add recording to video buffer
+            # Display scheduler: runs on the Tk thread at display_fps and only
+            # renders the newest frame the pipeline worker has processed
+            grabber, worker = self.frame_grabber, self.pipeline_worker
+            if not globals.streaming or grabber is None or worker is None:
+                return
+            self.video_label.after(int(1000 / self.display_fps), video_loop)  # schedule next tick
+
+            sequence, _timestamp, frame = worker.output.get()
+            if sequence == self._last_displayed_sequence:
+                if worker.error:
+                    # Frames are failing in the pipeline, the stats below wouldn't refresh
+                    text = f"frame pipeline error ({worker.frames_failed} frames dropped): {worker.error}"
+                    if self.video_stats_label.cget("text") != text:
+                        self.video_stats_label.config(text=text)
+                return  # nothing new since the last tick
+            if self._last_displayed_sequence:
+                self.frames_skipped += sequence - self._last_displayed_sequence - 1
+            self._last_displayed_sequence = sequence
+            self.frames_displayed += 1
+
+            img = Image.fromarray(frame)  # RGB, resized and converted by the pipeline
+            photo = self._preview_photo
+            if photo is None or (photo.width(), photo.height()) != img.size:
+                # First frame or the widget was resized
+                photo = self._preview_photo = ImageTk.PhotoImage(image=img)
+                self.video_label.config(image=photo)
+            else:
+                photo.paste(img)
+
+            if self.frames_displayed % self.display_fps == 0:
+                self.video_stats_label.config(
+                    text=f"read {grabber.frames_read} ({grabber.read_fps:.1f} fps) | "
+                         f"processed {worker.frames_processed} ({worker.processed_fps:.1f} fps) | "
+                         f"shown {self.frames_displayed} ({self.frames_displayed / max(time.monotonic() - grabber.started_at, 1e-9):.1f} fps) | "
+                         f"skipped {worker.frames_skipped + self.frames_skipped}\n"
+                         f"{self.frame_pipeline.timing_summary()}"
+                         + (f"\n{self.detection_worker.summary()}" if self.detection_worker is not None else "")
+                         + (f"\nframe pipeline error ({worker.frames_failed} frames dropped): {worker.error}"
+                            if worker.error else "")
+                )
             # else:
             #     if globals.streaming:
             #         globals.streaming = False
@@ -505,8 +607,16 @@ class DeviceControl(tk.Frame):
 
 
         if not globals.streaming:
-            # Start video stream if not streaming
-            globals.capture = cv2.VideoCapture(globals.video_url)
+            # Start video stream if not streaming, the capture is opened and read on its own thread
+            self.frame_grabber = FrameGrabber(globals.video_url)
+            self.frame_grabber.add_listener(self._on_video_frame)
+            self.frames_displayed = self.frames_skipped = self._last_displayed_sequence = 0
+            self._preview_photo = None
+            self.pipeline_worker = PipelineWorker(self.frame_pipeline, self.frame_grabber.slot)
+            self.frame_grabber.start()
+            self.pipeline_worker.start()
+            if self.frame_pipeline.stage("overlay").enabled:
+                self._start_detection_worker()
             globals.streaming = True
             self.play_audio_stream()
             self.stream_toggle_button.config(text="Stop Stream")
@@ -526,7 +636,7 @@ class DeviceControl(tk.Frame):
         else:
             # Stop video and audio stream if already streaming
             globals.streaming = False
-            globals.capture.release()
+            self.stop_video_stream()
             self.stop_audio_stream()
             # audio_stream.stop_stream()
             # audio_stream.close()
@@ -536,7 +646,81 @@ class DeviceControl(tk.Frame):
             self.video_label.config(image=self.stream_standby_photo)
 
     def stop_video_stream(self):
-        globals.capture.release()
+        # The capture thread releases the capture once its current read returns
+        if self.recorder is not None:
+            self.recorder.stop()
+        if self.pipeline_worker is not None:
+            self.pipeline_worker.stop()
+            self.pipeline_worker = None
+        self._stop_detection_worker()
+        if self.frame_grabber is not None:
+            self.frame_grabber.stop()
+            print(f"Video: read {self.frame_grabber.frames_read}, displayed {self.frames_displayed}, "
+                  f"skipped {self.frames_skipped}, read failures {self.frame_grabber.read_failures}")
+            self.frame_grabber = None
+
+    def _on_video_label_configure(self, event):
+        """Keep the preview render size at the label's inner size"""
+        border = int(self.video_label.cget("bd")) + int(self.video_label.cget("highlightthickness"))
+        width = event.width - 2 * (border + int(self.video_label.cget("padx")))
+        height = event.height - 2 * (border + int(self.video_label.cget("pady")))
+        if width < 2 or height < 2:
+            return
+        # The label's requested size follows the image, ignore the pixel of rounding
+        # that could otherwise feed back into a slow shrink
+        if self.preview_size and abs(width - self.preview_size[0]) <= 2 and abs(height - self.preview_size[1]) <= 2:
+            return
+        self.preview_size = (width, height)
+
+    def toggle_bounding_boxes(self):
+        enabled = not self.frame_pipeline.stage("overlay").enabled
+        if enabled and not os.path.exists(self.detector_model_path):
+            print(f"✗ Detector model not found: {self.detector_model_path} (see models/README.md)")
+            self.bounding_box_button.config(text="Bounding Boxes: no model", state=tk.DISABLED)
+            return
+        self.frame_pipeline.set_enabled("detections", enabled)
+        self.frame_pipeline.set_enabled("overlay", enabled)
+        if not enabled:
+            self._stop_detection_worker()
+        elif self.frame_grabber is not None:
+            self._start_detection_worker()  # otherwise started with the stream
+        self.bounding_box_button.config(text=f"Bounding Boxes: {'ON' if enabled else 'OFF'}")
+
+    def _start_detection_worker(self):
+        """Detect on the grabber's newest full-resolution frames, the model loads on the worker thread"""
+        self._stop_detection_worker()
+        model_path = self.detector_model_path
+        self.detection_worker = DetectionWorker(
+            lambda: OnnxDetector(model_path), self.frame_grabber.slot, max_load=self.detector_max_load
+        )
+        self.detection_worker.start()
+
+    def _stop_detection_worker(self):
+        if self.detection_worker is not None:
+            self.detection_worker.stop()
+            stats = self.detection_worker.latency_stats()
+            if "p50_ms" in stats:
+                print(f"Detector: {stats['inferences']} inferences, p50 {stats['p50_ms']:.0f} ms, "
+                      f"p95 {stats['p95_ms']:.0f} ms, max {stats['max_ms']:.0f} ms, {stats['frames_skipped']} frames skipped")
+            self.detection_worker = None
+
+    def _on_export_update(self, job):
+        """Called on an export worker, hands the update over to the Tk thread"""
+        if job.finished:
+            print(job.describe())
+        self.after(0, self._show_export_status)
+
+    def _show_export_status(self):
+        active = self.export_service.active_jobs()
+        finished = [job for job in list(self.export_service.jobs.values()) if job.finished]
+        lines = [job.describe() for job in active]
+        if finished:
+            lines.append(max(finished, key=lambda job: job.finished_at).describe())
+        self.export_status_label.config(text="\n".join(lines))
+
+    def _on_video_frame(self, sequence, timestamp, frame):
+        """Called on the capture thread for every frame read"""
+        self.frame_buffer.append(timestamp, frame)  # encoded on this thread, the UI never pays for it
 
 
     def keyup(self, e):
@@ -606,28 +790,75 @@ class DeviceControl(tk.Frame):
     
     def _init_audio_classifier(self):
         """Initialize the audio classifier in a background thread"""
+        profiler = StartupProfiler("audio_classifier")
         try:
             print("Initializing audio classifier...")
             audio_dir = "ECE4191 - Potential Audio Targets"
-            
-            if not os.path.exists(audio_dir):
-                print(f"Warning: Audio directory '{audio_dir}' not found!")
+            model_path = "simple_animal_classifier.pkl"
+            artifact_path = os.path.splitext(model_path)[0] + ".npz"
+
+            # The reference recordings are only needed to train a model that isn't saved yet
+            if not os.path.exists(artifact_path) and not os.path.exists(model_path) and not os.path.exists(audio_dir):
+                print(f"Warning: No model and audio directory '{audio_dir}' not found!")
                 self.after(0, self._update_classifier_status, "Audio files not found")
                 return
-            
-            # Initialize the high accuracy classifier
-            self.audio_classifier = HighAccuracyAnimalClassifier(audio_dir)
-            self.after(0, self._update_classifier_status, "High-accuracy classifier ready")
-            print("High-accuracy audio classifier initialized successfully!")
+
+            with profiler.phase("import librosa"):
+                import librosa  # noqa: F401
+            if not os.path.exists(artifact_path):
+                # Unpickling or training the model needs sklearn, the .npz artifact doesn't
+                with profiler.phase("import sklearn"):
+                    import sklearn.ensemble  # noqa: F401
+            with profiler.phase("import classifier"):
+                from simple_classifier import SimpleAnimalClassifier
+
+            # Loads the flat .npz artifact (numpy only), training only if there is no saved model
+            with profiler.phase("load model"):
+                classifier = SimpleAnimalClassifier(audio_dir, model_path=model_path)
+
+            # One inference through the live path so the first window doesn't pay for
+            # lazy imports, the mel basis and FFT planning. The warm-up clip is a loud
+            # sweep over noise, well above the 0.01 RMS silence gate, so features are
+            # extracted and scored rather than short-circuited as silence
+            with profiler.phase("warm-up inference"):
+                sr = self.classifier_sample_rate
+                t = np.arange(self.classification_window_seconds * sr) / sr
+                warmup_audio = (
+                    0.3 * np.sin(2 * np.pi * (500 + 200 * t) * t)
+                    + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+                ).astype(np.float32)
+                predictions = classifier.predict_animal(warmup_audio)
+                if getattr(classifier, "predict_features", None) is not None:
+                    from audio_features import IncrementalFeatureExtractor
+                    extractor = IncrementalFeatureExtractor(sr=sr, history_seconds=self.classification_window_seconds)
+                    extractor.push(warmup_audio)
+                    predictions = classifier.predict_features(extractor.latest_window_features(warmup_audio))
+                if predictions[0][1] <= 0.0:
+                    print(f"Warning: warm-up inference was not scored: {predictions}")
+
+            self.audio_classifier = classifier
+            self.after(0, self._update_classifier_status, "Audio classifier ready", profiler.summary_lines())
+            print("Audio classifier initialized successfully!")
             
         except Exception as e:
             print(f"Error initializing audio classifier: {e}")
-            self.after(0, self._update_classifier_status, f"Error: {str(e)}")
+            self.after(0, self._update_classifier_status, f"Error: {str(e)}", profiler.summary_lines())
+        finally:
+            if profiler.phases:
+                print("Audio classifier startup:\n" + "\n".join(profiler.summary_lines()))
+                try:
+                    profiler.write_json(self.classifier_startup_log)
+                except OSError as e:
+                    print(f"Could not write {self.classifier_startup_log}: {e}")
     
-    def _update_classifier_status(self, message):
+    def _update_classifier_status(self, message, details=None):
         """Update the UI with classifier status - called from main thread"""
         self.detect_listbox.delete(0, tk.END)
         self.detect_listbox.insert("end", message)
+        if details:
+            self.detect_listbox.insert("end", "⏱ Startup:")
+            for line in details:
+                self.detect_listbox.insert("end", line)
         
         if self.audio_classifier is not None:
             self.audio_classification_button.config(state=tk.NORMAL)
@@ -653,8 +884,8 @@ class DeviceControl(tk.Frame):
             self.classification_thread.start()
             
             self.detect_listbox.delete(0, tk.END)
-            self.detect_listbox.insert("end", "Audio detection started (10s intervals)...")
-            print("High-accuracy audio classification started (10-second intervals)")
+            self.detect_listbox.insert("end", f"Audio detection started ({self.classification_window_seconds}s windows, every {self.classification_hop_seconds}s)...")
+            print(f"Audio classification started ({self.classification_window_seconds}s windows, {self.classification_hop_seconds}s hop)")
         else:
             # Stop classification
             self.classification_enabled = False
@@ -666,54 +897,58 @@ class DeviceControl(tk.Frame):
     
     def _classification_loop(self):
         """Background thread for continuous audio classification"""
+        classifier = self.audio_classifier
+        feature_extractor = None
+        predict_features = getattr(classifier, "predict_features", None)
+        if predict_features is not None:
+            # Classifiers that score feature vectors get them from cached frames: each 2 s hop
+            # is transformed once instead of the whole 10 s window, the features are the same
+            from audio_features import IncrementalFeatureExtractor
+            feature_extractor = IncrementalFeatureExtractor(
+                sr=self.classifier_sample_rate,
+                history_seconds=self.classification_window_seconds + self.classification_hop_seconds,
+            )
+        driver = StreamingClassifierDriver(
+            self.classification_buffer,
+            classifier.predict_animal,
+            window_seconds=self.classification_window_seconds,
+            hop_seconds=self.classification_hop_seconds,
+            energy_threshold=0.01,  # RMS threshold for silence
+            feature_extractor=feature_extractor,
+            predict_features_func=predict_features,
+        )
+        # First window ends one window length from now
+        driver.reset()
+        self.classification_driver = driver
         while self.classification_enabled and self.audio_classifier is not None:
             try:
-                # Get audio data from buffer
-                if len(self.audio_buffer) > 0:
-                    # Convert deque to numpy array and flatten
-                    audio_chunks = list(self.audio_buffer)
-                    if audio_chunks:
-                        # Concatenate more recent audio chunks (approximately 10 seconds)
-                        audio_data = np.concatenate(audio_chunks[-10:], axis=0)  # Last 10 chunks for ~10 seconds
-                        
-                        # Convert to mono if stereo
-                        if len(audio_data.shape) > 1:
-                            audio_data = np.mean(audio_data, axis=1)
-                        else:
-                            audio_data = audio_data.flatten()
-                        
-                        # Check if audio has meaningful content
-                        if np.max(np.abs(audio_data)) > 0.01:  # Threshold for silence
-                            # Get predictions
-                            predictions = self.audio_classifier.predict_animal(audio_data)
-                            
-                            # Update UI from main thread
-                            self.after(0, self._update_detections, predictions)
-                        else:
-                            # No meaningful audio detected
-                            self.after(0, self._update_detections_silence)
-                
-                # Wait before next classification (10 seconds to match high accuracy model)
-                time.sleep(10.0)  # 10-second intervals for high accuracy
-                
+                for result in driver.poll():
+                    if result.gated:
+                        # No meaningful audio detected
+                        self.after(0, self._update_detections_silence)
+                        continue
+                    # Update UI from main thread
+                    self.after(0, self._update_detections, result, list(driver.events), driver.compute_stats())
+
+                # Check for new windows a few times per hop
+                time.sleep(self.classification_hop_seconds / 4)
+
             except Exception as e:
                 print(f"Error in classification loop: {e}")
                 self.after(0, self._update_detections_error, str(e))
                 time.sleep(3.0)
-    
-    def _update_detections(self, predictions):
-        """Update the creatures detected listbox with predictions and track occurrence counts"""
+                driver.reset()
+
+    def _update_detections(self, result, events, stats):
+        """Update the creatures detected listbox with a window's predictions and the detection events"""
         if not self.classification_enabled:
             return
-            
-        # Track top 1 prediction occurrence
-        if predictions and len(predictions) > 0:
-            top_animal = predictions[0][0]
-            if top_animal in self.creature_counts:
-                self.creature_counts[top_animal] += 1
-            else:
-                self.creature_counts[top_animal] = 1
-        
+        predictions = result.predictions
+
+        # Count each detection event once, when it starts
+        for species in result.started:
+            self.creature_counts[species] = self.creature_counts.get(species, 0) + 1
+
         # Store recent predictions for logging
         self.recent_predictions.append(predictions)
         if len(self.recent_predictions) > 20:  # Keep last 20 predictions
@@ -722,9 +957,9 @@ class DeviceControl(tk.Frame):
         # Clear current list
         self.detect_listbox.delete(0, tk.END)
         
-        # Add timestamp
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.detect_listbox.insert("end", f"🕒 {timestamp} - Audio Analysis (10s):")
+        # Add timestamp of the end of the analysed window
+        timestamp = datetime.datetime.fromtimestamp(result.end_time).strftime('%H:%M:%S')
+        self.detect_listbox.insert("end", f"🕒 {timestamp} - Audio Analysis ({self.classification_window_seconds}s):")
         self.detect_listbox.insert("end", "=" * 45)
         
         # Add top 3 real-time predictions
@@ -735,6 +970,15 @@ class DeviceControl(tk.Frame):
             self.detect_listbox.insert("end", display_text)
         
         self.detect_listbox.insert("end", "=" * 45)
+
+        # Most recent detection events with their time span
+        if events:
+            self.detect_listbox.insert("end", "🔔 Detection Events:")
+            for event in reversed(events[-5:]):
+                start = datetime.datetime.fromtimestamp(event.start_time).strftime('%H:%M:%S')
+                end = datetime.datetime.fromtimestamp(event.end_time).strftime('%H:%M:%S')
+                state = " (ongoing)" if event.active else ""
+                self.detect_listbox.insert("end", f"   {start}-{end} {event.species} ({event.peak_score*100:.0f}%){state}")
         
         # Add occurrence summary for top detections
         if self.creature_counts:
@@ -743,13 +987,20 @@ class DeviceControl(tk.Frame):
             sorted_counts = sorted(self.creature_counts.items(), key=lambda x: x[1], reverse=True)
             for animal, count in sorted_counts[:5]:  # Show top 5
                 self.detect_listbox.insert("end", f"   {animal}: {count} detections")
+
+        # Compute time per window, relative to the hop it has to fit in
+        if stats:
+            self.detect_listbox.insert(
+                "end",
+                f"⏱ {stats['mean_ms']:.0f} ms/window (p95 {stats['p95_ms']:.0f} ms, {stats['hop_load']*100:.0f}% of hop)"
+            )
         
         # Auto-scroll to bottom
         self.detect_listbox.see(tk.END)
         
         # Log the prediction
         top_prediction = predictions[0] if predictions else ("Unknown", 0.0)
-        log_msg = f"TOP: {top_prediction[0]} ({top_prediction[1]*100:.2f}%) [Count: {self.creature_counts.get(top_prediction[0], 0)}] | ALL: {', '.join([f'{name}({conf*100:.1f}%)' for name, conf in predictions[:3]])}"
+        log_msg = f"TOP: {top_prediction[0]} ({top_prediction[1]*100:.2f}%) [Count: {self.creature_counts.get(top_prediction[0], 0)}] | ALL: {', '.join([f'{name}({conf*100:.1f}%)' for name, conf in predictions[:3]])} | {result.compute_seconds*1000:.0f} ms"
         print(f"Audio Detection Log: {log_msg}")
     
     def _update_detections_silence(self):
@@ -770,6 +1021,6 @@ class DeviceControl(tk.Frame):
             
         timestamp = datetime.datetime.now().strftime('%H:%M:%S')
         self.detect_listbox.delete(0, tk.END)
-        self.detect_listbox.insert("end", f"🕒 {timestamp} (10s interval)")
+        self.detect_listbox.insert("end", f"🕒 {timestamp}")
         self.detect_listbox.insert("end", f"❌ Error: {error_msg}")
-        self.detect_listbox.insert("end", "Retrying in 10 seconds...")
\ No newline at end of file
+        self.detect_listbox.insert("end", "Retrying in 3 seconds...")
\ No newline at end of file
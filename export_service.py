@@ -0,0 +1,279 @@
+"""
+Background export of buffered media.
+
+Saving a clip used to encode every frame on the Tk thread, freezing the UI
+(and the live preview) for seconds. ExportService runs exports on worker
+threads fed by a queue. The caller hands over a snapshot of the data and
+gets an ExportJob back immediately. Progress is reported through a callback
+on the worker thread (use Tk's after() to get back to the UI).
+
+Threads rather than processes: JPEG decoding and cv2.VideoWriter release the
+GIL, and a process would need the whole snapshot pickled across.
+
+submit_av muxes timestamped JPEG frames and the audio captured over the same
+span into one file through an ffmpeg pipe (the ffmpeg binary must be on
+PATH). Frames are placed on a constant frame rate grid by their capture
+timestamps, the audio is cut to exactly the same span, so both tracks start
+together and stay in sync even if the stream dropped frames.
+
+    service = ExportService(on_update=lambda job: print(job.describe()))
+    service.submit_video("clip.mp4", frames, fps, decode=EncodedFrameBuffer.decode)
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def aligned_pcm16(ring_buffer, start_time: float, end_time: float) -> np.ndarray:
+    """
+    Audio captured between two monotonic times, as int16 (frames, channels).
+
+    Reads a timestamped AudioRingBuffer. Parts of the span that are not in
+    the buffer (not captured yet, or already overwritten) are silence.
+    """
+    sample_rate = ring_buffer.sample_rate
+    start = ring_buffer.index_at(start_time)
+    n = max(0, int(round((end_time - start_time) * sample_rate)))
+    pcm = np.zeros((n, ring_buffer.channels), dtype=np.int16)
+    # Keep clear of the oldest 100 ms, the capture callback may be overwriting it while we read
+    end_index = ring_buffer.total_written
+    lo = max(start, end_index - len(ring_buffer) + sample_rate // 10)
+    hi = min(start + n, end_index)
+    if hi > lo:
+        samples = ring_buffer.window(hi, hi - lo).reshape(hi - lo, ring_buffer.channels)
+        pcm[lo - start:hi - start] = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    return pcm
+
+
+def constant_rate_indices(timestamps, fps: float, count: int) -> np.ndarray:
+    """
+    Index of the frame to show in each of count slots of 1/fps seconds from
+    timestamps[0]: the newest frame captured by the slot's time. Late or
+    dropped frames repeat the previous one, bursts drop the extras.
+    """
+    timestamps = np.asarray(timestamps)
+    slot_times = timestamps[0] + np.arange(count) / fps
+    # Half a slot of tolerance for capture jitter
+    return np.clip(np.searchsorted(timestamps, slot_times + 0.5 / fps, side="right") - 1, 0, len(timestamps) - 1)
+
+
+@dataclass
+class ExportJob:
+    job_id: int
+    kind: str
+    output_file: str
+    total: int
+    done: int = 0
+    status: str = QUEUED
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def describe(self) -> str:
+        if self.status == RUNNING:
+            return f"{self.kind} {self.output_file}: {self.progress:.0%}"
+        if self.status == DONE:
+            return f"{self.kind} {self.output_file}: saved in {self.finished_at - self.started_at:.1f}s"
+        if self.status == FAILED:
+            return f"{self.kind} {self.output_file}: failed ({self.error})"
+        return f"{self.kind} {self.output_file}: queued"
+
+
+class ExportService:
+    """Runs export jobs on a pool of daemon worker threads.
+
+    Args:
+        workers: Number of exports that can run at the same time
+        on_update: Called with the job on a worker thread when it starts,
+            every progress_interval seconds while running, and when it ends
+        progress_interval: Minimum seconds between progress updates of a job
+        finished_history: Finished jobs kept in jobs, older ones are dropped on submit
+    """
+
+    def __init__(self, workers: int = 2, on_update: Callable[[ExportJob], None] = None,
+                 progress_interval: float = 0.2, finished_history: int = 20):
+        self.on_update = on_update
+        self.progress_interval = progress_interval
+        self.finished_history = finished_history
+        self.jobs = {}  # job_id -> ExportJob, unfinished jobs and the newest finished ones
+        self._queue = queue.Queue()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"export-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind: str, output_file: str, total: int, task: Callable[[Callable[[int], None]], None]) -> ExportJob:
+        """
+        Queue task(progress) to run on a worker. The task calls progress(n)
+        after each of its total units of work.
+        """
+        with self._lock:
+            self._prune_finished()
+            job = ExportJob(self._next_id, kind, output_file, total)
+            self.jobs[job.job_id] = job
+            self._next_id += 1
+        self._queue.put((job, task))
+        return job
+
+    def submit_video(self, output_file: str, frames, fps: float, decode: Callable = None,
+                     fourcc: str = "mp4v") -> ExportJob:
+        """
+        Write frames (BGR arrays, or entries turned into arrays by decode) to a
+        video file. frames is only read, so a list of references is enough.
+        """
+        def task(progress):
+            writer = None
+            try:
+                for i, item in enumerate(frames, 1):
+                    frame = decode(item) if decode is not None else item
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        writer = cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+                        if not writer.isOpened():
+                            raise IOError(f"could not open video writer for {output_file}")
+                    writer.write(frame)
+                    progress(i)
+            finally:
+                if writer is not None:
+                    writer.release()
+
+        return self.submit("video", output_file, len(frames), task)
+
+    def submit_wav(self, output_file: str, blocks, sample_rate: int, channels: int) -> ExportJob:
+        """Write int16 (frames, channels) blocks to a WAV file"""
+        def task(progress):
+            with wave.open(output_file, "wb") as wf:
+                wf.setnchannels(channels)
+                wf.setsampwidth(2)  # 16-bit
+                wf.setframerate(sample_rate)
+                for i, block in enumerate(blocks, 1):
+                    wf.writeframes(np.ascontiguousarray(block, dtype=np.int16).tobytes())
+                    progress(i)
+
+        return self.submit("audio", output_file, len(blocks), task)
+
+    def submit_av(self, output_file: str, frames, fps: float, audio: np.ndarray, sample_rate: int,
+                  video_codec: str = "libx264", audio_codec: str = "aac", ffmpeg: str = "ffmpeg") -> ExportJob:
+        """
+        Mux (timestamp, jpeg) frames and int16 (frames, channels) audio covering
+        the same span, from frames[0]'s timestamp on, into one file.
+
+        The JPEG data is piped to ffmpeg as is, nothing is decoded in Python.
+        """
+        timestamps = [entry[0] for entry in frames]
+        count = max(1, int(round((timestamps[-1] - timestamps[0]) * fps)) + 1)
+        indices = constant_rate_indices(timestamps, fps, count)
+
+        def task(progress):
+            ffmpeg_path = shutil.which(ffmpeg)
+            if ffmpeg_path is None:
+                raise FileNotFoundError(f"{ffmpeg} not found on PATH")
+            handle, audio_file = tempfile.mkstemp(suffix=".wav", dir=os.path.dirname(os.path.abspath(output_file)))
+            os.close(handle)
+            try:
+                with wave.open(audio_file, "wb") as wf:
+                    wf.setnchannels(audio.shape[1])
+                    wf.setsampwidth(2)  # 16-bit
+                    wf.setframerate(sample_rate)
+                    wf.writeframes(np.ascontiguousarray(audio).tobytes())
+
+                command = [
+                    ffmpeg_path, "-y", "-loglevel", "error",
+                    "-f", "image2pipe", "-framerate", f"{fps}", "-c:v", "mjpeg", "-i", "-",
+                    "-i", audio_file,
+                    "-map", "0:v", "-map", "1:a",
+                    "-c:v", video_codec, "-pix_fmt", "yuv420p", "-c:a", audio_codec,
+                    output_file,
+                ]
+                process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+                try:
+                    for i, index in enumerate(indices, 1):
+                        process.stdin.write(frames[index][1].tobytes())
+                        progress(i)
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass  # ffmpeg exited early, its error is reported below
+                error = process.stderr.read().decode(errors="replace").strip()
+                if process.wait() != 0:
+                    raise RuntimeError(f"ffmpeg failed: {error.splitlines()[-1] if error else process.returncode}")
+            finally:
+                os.remove(audio_file)
+
+        return self.submit("audio+video", output_file, len(indices), task)
+
+    def _prune_finished(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        if len(finished) > self.finished_history:
+            finished.sort(key=lambda job: job.finished_at)
+            for job in finished[:len(finished) - self.finished_history]:
+                del self.jobs[job.job_id]
+
+    def active_jobs(self) -> list:
+        return [job for job in list(self.jobs.values()) if not job.finished]
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until every submitted job has finished, False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active_jobs():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _notify(self, job: ExportJob):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                print(f"Export update error: {e}")
+
+    def _worker(self):
+        while True:
+            job, task = self._queue.get()
+            job.started_at = time.monotonic()
+            job.status = RUNNING
+            self._notify(job)
+            last_update = job.started_at
+
+            def progress(done):
+                nonlocal last_update
+                job.done = done
+                now = time.monotonic()
+                if now - last_update >= self.progress_interval:
+                    last_update = now
+                    self._notify(job)
+
+            try:
+                task(progress)
+                status = DONE
+            except Exception as e:
+                job.error = str(e)
+                status = FAILED
+            job.finished_at = time.monotonic()
+            job.status = status
+            self._notify(job)
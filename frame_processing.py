@@ -0,0 +1,286 @@
+"""
+Per-frame image processing for the live video preview.
+
+FramePipeline runs an ordered list of FrameStages on each frame, timing
+every stage. Stages can be switched on and off at runtime and expensive ones
+can run only every N frames. PipelineWorker drives a pipeline on its own
+thread from a FrameGrabber's LatestFrameSlot, always taking the newest
+frame, and publishes results in another LatestFrameSlot for the display.
+
+GrayWorldAWB is the gray-world auto white balance the preview used to do
+with float arithmetic on every full frame. The channel means are estimated
+on a subsampled frame, only every few frames and smoothed over time, and the
+gains are applied through a 256-entry per-channel lookup table (cv2.LUT), a
+single uint8 pass with no temporaries.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from video_processing import LatestFrameSlot
+
+
+class GrayWorldAWB:
+    """Gray-world white balance with cached lookup table gains.
+
+    Args:
+        update_interval: Re-estimate the gains every this many frames
+        smoothing: Weight of a new estimate against the current gains (1 = no smoothing)
+        subsample: Estimate the channel means on every subsample-th row and column
+        max_gain: Limit on a channel gain, so a near-black channel is not blown up
+    """
+
+    def __init__(self, update_interval: int = 5, smoothing: float = 0.3, subsample: int = 8, max_gain: float = 4.0):
+        self.update_interval = update_interval
+        self.smoothing = smoothing
+        self.subsample = subsample
+        self.max_gain = max_gain
+        self.gains = None
+        self.frames_seen = 0
+        self._lut = None
+        self._reset_requested = False
+
+    def reset(self):
+        """
+        Forget the gains, e.g. after the scene or camera changed. Safe to call
+        from another thread while frames are processed: the gains are dropped
+        by the thread calling the AWB, before its next frame.
+        """
+        self._reset_requested = True
+
+    def estimate(self, frame: np.ndarray) -> np.ndarray:
+        """Gray-world gains of a frame, per channel"""
+        means = frame[::self.subsample, ::self.subsample].reshape(-1, frame.shape[2]).mean(axis=0)
+        gains = np.ones(len(means))
+        valid = means > 0
+        if valid.any():
+            gains[valid] = means.mean() / means[valid]
+        return np.minimum(gains, self.max_gain)
+
+    def update(self, frame: np.ndarray):
+        """Fold a new estimate into the gains and rebuild the lookup table"""
+        estimate = self.estimate(frame)
+        if self.gains is None:
+            self.gains = estimate
+        else:
+            self.gains = self.gains + self.smoothing * (estimate - self.gains)
+        levels = np.arange(256, dtype=np.float64)[:, None] * self.gains
+        # Truncating like the float version's astype(np.uint8)
+        self._lut = np.clip(levels, 0, 255).astype(np.uint8).reshape(1, 256, len(self.gains))
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        """
+        White balance a uint8 frame in place and return it. Don't pass frames
+        other code still reads (e.g. the capture's own array).
+        """
+        if self._reset_requested:
+            self._reset_requested = False
+            self.gains = None
+            self.frames_seen = 0
+        if self.gains is None or self.frames_seen % self.update_interval == 0:
+            self.update(frame)
+        self.frames_seen += 1
+        return cv2.LUT(frame, self._lut, dst=frame)
+
+
+class FrameStage:
+    """One step of a FramePipeline.
+
+    Args:
+        name: Used to look the stage up and in timing reports
+        func: func(frame, state) -> frame. May work in place, or return a
+            new array. state is a dict that lives as long as the pipeline,
+            for passing results between stages and across frames
+        enabled: Whether the stage runs
+        every: Run on every every-th frame only, the frame passes through
+            unchanged otherwise (results kept in state stay available)
+    """
+
+    def __init__(self, name: str, func: Callable[[np.ndarray, dict], np.ndarray], enabled: bool = True, every: int = 1):
+        self.name = name
+        self.func = func
+        self.enabled = enabled
+        self.every = every
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.average_ms = 0.0  # exponential moving average per call
+
+    def reset_stats(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.average_ms = 0.0
+
+
+class FramePipeline:
+    """Ordered frame processing stages with per-stage timing.
+
+    The input frame is handed to the first stage as is, so the first stage
+    must not modify it in place when the caller still reads it (a colour
+    conversion that returns a new array is a good first stage).
+    """
+
+    def __init__(self, stages: List[FrameStage] = None, timing_smoothing: float = 0.1):
+        self.stages = list(stages or [])
+        self.timing_smoothing = timing_smoothing
+        self.state = {}
+        self.frames_processed = 0
+
+    def add_stage(self, stage: FrameStage, before: str = None):
+        """Append a stage, or insert it in front of the stage named before"""
+        if before is None:
+            self.stages.append(stage)
+        else:
+            self.stages.insert(self.stages.index(self.stage(before)), stage)
+
+    def stage(self, name: str) -> FrameStage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(f"No stage named {name}")
+
+    def set_enabled(self, name: str, enabled: bool):
+        self.stage(name).enabled = enabled
+
+    def process(self, frame: np.ndarray, sequence: int = None, timestamp: float = None) -> np.ndarray:
+        self.state["sequence"] = sequence
+        self.state["timestamp"] = timestamp
+        for stage in self.stages:
+            if not stage.enabled or self.frames_processed % stage.every:
+                continue
+            start = time.perf_counter()
+            frame = stage.func(frame, self.state)
+            elapsed = time.perf_counter() - start
+            stage.calls += 1
+            stage.total_seconds += elapsed
+            if stage.calls == 1:
+                stage.average_ms = elapsed * 1000
+            else:
+                stage.average_ms += self.timing_smoothing * (elapsed * 1000 - stage.average_ms)
+        self.frames_processed += 1
+        return frame
+
+    def timing_summary(self) -> str:
+        """Average ms per call of each enabled stage, for display"""
+        return " | ".join(
+            f"{stage.name} {stage.average_ms:.1f}" + (f"/{stage.every}" if stage.every > 1 else "")
+            for stage in self.stages if stage.enabled
+        ) + " ms"
+
+
+class PipelineWorker:
+    """Runs a FramePipeline on a background thread over the newest frames of a slot.
+
+    Frames that arrive while the pipeline is busy are skipped, so a slow
+    stage lowers the processed frame rate instead of building up latency.
+    A frame whose stages raise is dropped. The error is kept in error (until
+    a frame gets through again) and printed once per distinct message.
+
+    Args:
+        pipeline: The stages to run
+        source: Slot the frames come from, e.g. FrameGrabber.slot
+        name: Thread name, for debugging
+    """
+
+    def __init__(self, pipeline: FramePipeline, source: LatestFrameSlot, name: str = "frame-pipeline"):
+        self.pipeline = pipeline
+        self.source = source
+        self.output = LatestFrameSlot()
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.frames_failed = 0
+        self.error = None
+        self.started_at = None
+        self._reported_error = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread.start()
+
+    def stop(self, timeout: float = 0):
+        self._stop_event.set()
+        if timeout and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def processed_fps(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return self.frames_processed / max(time.monotonic() - self.started_at, 1e-9)
+
+    def _run(self):
+        sequence = 0
+        while not self._stop_event.is_set():
+            newest, timestamp, frame = self.source.wait_newer(sequence, timeout=0.1)
+            if newest == sequence or frame is None:
+                continue
+            if sequence:
+                self.frames_skipped += newest - sequence - 1
+            sequence = newest
+            try:
+                processed = self.pipeline.process(frame, sequence, timestamp)
+            except Exception as e:
+                self.frames_failed += 1
+                self.error = str(e) or type(e).__name__
+                if self.error != self._reported_error:
+                    # A broken stage fails every frame, don't print it for each one
+                    print(f"Frame pipeline error: {self.error}")
+                    self._reported_error = self.error
+                continue
+            self.error = None
+            self.frames_processed += 1
+            self.output.put(processed, timestamp)
+
+
+def fit_size(width: int, height: int, box: Tuple[int, int]) -> Tuple[int, int]:
+    """Largest size with the frame's aspect ratio that fits inside box (width, height)"""
+    scale = min(box[0] / width, box[1] / height)
+    return (max(1, min(box[0], round(width * scale))),
+            max(1, min(box[1], round(height * scale))))
+
+
+def resize_stage(get_size: Callable[[], Optional[Tuple[int, int]]]) -> FrameStage:
+    """
+    Scale frames to fit get_size() (e.g. the preview widget, None leaves
+    them as they are), keeping the aspect ratio. Records the scale in
+    state["display_scale"] for stages drawing in source coordinates.
+    """
+    def resize(frame, state):
+        height, width = frame.shape[:2]
+        box = get_size()
+        target = (width, height) if not box else fit_size(width, height, box)
+        state["display_scale"] = (target[0] / width, target[1] / height)
+        if target == (width, height):
+            return frame
+        interpolation = cv2.INTER_AREA if target[0] < width else cv2.INTER_LINEAR
+        return cv2.resize(frame, target, interpolation=interpolation)
+
+    return FrameStage("resize", resize)
+
+
+def color_convert_stage(code: int = cv2.COLOR_BGR2RGB) -> FrameStage:
+    """Colour conversion into a new array, so later stages may work in place"""
+    return FrameStage("convert", lambda frame, state: cv2.cvtColor(frame, code))
+
+
+def awb_stage(awb: GrayWorldAWB, enabled: bool = False) -> FrameStage:
+    return FrameStage("awb", lambda frame, state: awb(frame), enabled=enabled)
+
+
+def draw_detections(frame: np.ndarray, state: dict) -> np.ndarray:
+    """
+    Draw state["detections"], a list of (x1, y1, x2, y2, label, score) boxes in
+    source frame pixel coordinates, in place (scaled by state["display_scale"]).
+    """
+    scale_x, scale_y = state.get("display_scale", (1.0, 1.0))
+    for x1, y1, x2, y2, label, score in state.get("detections", ()):
+        x1, x2, y1, y2 = x1 * scale_x, x2 * scale_x, y1 * scale_y, y2 * scale_y
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
+        cv2.putText(frame, f"{label} {score:.2f}", (int(x1), max(int(y1) - 6, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1, cv2.LINE_AA)
+    return frame
@@ -0,0 +1,275 @@
+"""
+Object/animal detection on the live camera feed.
+
+OnnxDetector runs a YOLO-style detector exported to ONNX (YOLOv5 or YOLOv8
+output layout, given or detected from the first output) on the CPU, with
+ONNX Runtime when it is installed and OpenCV's DNN module otherwise. Class
+names come from a text file with one name per line next to the model.
+
+DetectionWorker runs a detector on its own thread, always on the newest
+frame of a FrameGrabber slot. Between inferences it waits long enough to
+keep inference to a set share of the time (measured, not assumed), so the
+detection rate adapts to the machine. The latest result is cached and the
+preview pipeline overlays it on every frame until a newer one arrives.
+
+    worker = DetectionWorker(lambda: OnnxDetector("models/animal_detector.onnx"), grabber.slot)
+    worker.start()
+    sequence, timestamp, detections = worker.latest
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from video_processing import LatestFrameSlot
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# (x1, y1, x2, y2, label, score) in source frame pixels
+Detection = Tuple[float, float, float, float, str, float]
+
+
+def load_class_names(path: str) -> Optional[List[str]]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class OnnxDetector:
+    """YOLO-style ONNX detector.
+
+    Args:
+        model_path: .onnx file with a (1, 3, size, size) input
+        class_names: Names per class index, default the .txt file next to the model
+        input_size: Network input size, frames are letterboxed to it
+        score_threshold: Minimum class score to keep a box
+        nms_threshold: IoU above which overlapping boxes are suppressed
+        allowed_classes: Only report these class names (None: all)
+        layout: "yolov5" (x, y, w, h, objectness, class scores) or "yolov8"
+            (x, y, w, h, class scores). None detects it from the first output,
+            see resolve_layout
+    """
+
+    def __init__(self, model_path: str, class_names: List[str] = None, input_size: int = 640,
+                 score_threshold: float = 0.35, nms_threshold: float = 0.45, allowed_classes=None,
+                 layout: str = None):
+        if layout not in (None, "yolov5", "yolov8"):
+            raise ValueError(f"Unknown output layout {layout!r}, expected 'yolov5' or 'yolov8'")
+        self.model_path = model_path
+        self.layout = layout
+        self.class_names = class_names or load_class_names(os.path.splitext(model_path)[0] + ".txt")
+        self.input_size = input_size
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+        self.allowed_classes = set(allowed_classes) if allowed_classes else None
+        if onnxruntime is not None:
+            self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+            self.net = None
+            self.backend = "onnxruntime"
+        else:
+            self.session = None
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+            self.backend = "opencv-dnn"
+
+    def _letterbox(self, frame: np.ndarray):
+        """Scale to fit input_size keeping the aspect ratio, pad the rest"""
+        height, width = frame.shape[:2]
+        scale = min(self.input_size / width, self.input_size / height)
+        resized = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_LINEAR)
+        pad_x = (self.input_size - resized.shape[1]) // 2
+        pad_y = (self.input_size - resized.shape[0]) // 2
+        padded = np.full((self.input_size, self.input_size, 3), 114, dtype=np.uint8)
+        padded[pad_y:pad_y + resized.shape[0], pad_x:pad_x + resized.shape[1]] = resized
+        return padded, scale, pad_x, pad_y
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        if self.session is not None:
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def resolve_layout(self, width: int, anchors_last: bool) -> str:
+        """
+        Output layout for boxes of width values. With class names the width
+        decides (C+5 is YOLOv5, C+4 is YOLOv8). Without, the axis order does:
+        YOLOv8 exports put the anchors last, (1, 4+C, N), YOLOv5 exports first,
+        (1, N, 5+C).
+        """
+        if self.class_names:
+            layouts = {len(self.class_names) + 5: "yolov5", len(self.class_names) + 4: "yolov8"}
+            if width not in layouts:
+                raise ValueError(f"{self.model_path} outputs {width} values per box, which fits neither YOLOv5 "
+                                 f"nor YOLOv8 with {len(self.class_names)} class names")
+            return layouts[width]
+        return "yolov8" if anchors_last else "yolov5"
+
+    def postprocess(self, output: np.ndarray, scale: float, pad_x: int, pad_y: int,
+                    frame_size: Tuple[int, int]) -> List[Detection]:
+        """Boxes from a raw (1, 4+C, N) YOLOv8 or (1, N, 5+C) YOLOv5 output"""
+        predictions = output.reshape(output.shape[-2:])  # drop the batch (and any singleton) axes
+        anchors_last = predictions.shape[0] < predictions.shape[1]
+        if anchors_last:
+            predictions = predictions.T  # one row per anchor
+        if self.layout is None:
+            self.layout = self.resolve_layout(predictions.shape[1], anchors_last)
+        if self.layout == "yolov5":
+            class_scores = predictions[:, 5:] * predictions[:, 4:5]  # objectness times class score
+        else:
+            class_scores = predictions[:, 4:]
+
+        class_ids = np.argmax(class_scores, axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        keep = scores >= self.score_threshold
+        if not keep.any():
+            return []
+        boxes, scores, class_ids = predictions[keep, :4], scores[keep], class_ids[keep]
+
+        # Centre/size in letterboxed input pixels -> corners in frame pixels
+        width, height = frame_size
+        x1 = np.clip((boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / scale, 0, width)
+        y1 = np.clip((boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / scale, 0, height)
+        x2 = np.clip((boxes[:, 0] + boxes[:, 2] / 2 - pad_x) / scale, 0, width)
+        y2 = np.clip((boxes[:, 1] + boxes[:, 3] / 2 - pad_y) / scale, 0, height)
+        rects = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+        indices = cv2.dnn.NMSBoxes(rects.tolist(), scores.tolist(), self.score_threshold, self.nms_threshold)
+
+        detections = []
+        for i in np.array(indices).reshape(-1):
+            class_id = int(class_ids[i])
+            label = self.class_names[class_id] if self.class_names and class_id < len(self.class_names) else f"class {class_id}"
+            if self.allowed_classes is None or label in self.allowed_classes:
+                detections.append((float(x1[i]), float(y1[i]), float(x2[i]), float(y2[i]), label, float(scores[i])))
+        return detections
+
+    def detect(self, frame: np.ndarray) -> List[Detection]:
+        """Detections in a BGR frame"""
+        padded, scale, pad_x, pad_y = self._letterbox(frame)
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+        output = self._forward(blob)
+        return self.postprocess(output, scale, pad_x, pad_y, (frame.shape[1], frame.shape[0]))
+
+
+class DetectionWorker:
+    """Runs a detector on the newest frames of a slot on a background thread.
+
+    Args:
+        detector_factory: Builds the detector (anything with detect(frame)),
+            called on the worker thread so loading the model never blocks the UI
+        source: Slot the frames come from, e.g. FrameGrabber.slot
+        max_load: Share of time spent inferring, the worker idles
+            latency * (1 / max_load - 1) seconds after each inference
+        max_age: Seconds a result stays valid for overlays
+        latency_history: Inferences kept for the latency statistics
+    """
+
+    def __init__(self, detector_factory: Callable[[], object], source: LatestFrameSlot, max_load: float = 0.5,
+                 max_age: float = 1.0, latency_history: int = 200):
+        self.detector_factory = detector_factory
+        self.source = source
+        self.max_load = max_load
+        self.max_age = max_age
+        self.detector = None
+        self.error = None
+        self.latest = (0, 0.0, [])  # (frame sequence, frame timestamp, detections)
+        self.latencies = deque(maxlen=latency_history)
+        self.inferences = 0
+        self.frames_skipped = 0
+        self.ready_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="detection-worker", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 0):
+        self._stop_event.set()
+        if timeout and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self._stop_event.is_set()
+
+    def current_detections(self, now: float = None) -> List[Detection]:
+        """The latest detections, or none if they are older than max_age"""
+        _sequence, timestamp, detections = self.latest
+        now = time.monotonic() if now is None else now
+        return detections if now - timestamp <= self.max_age else []
+
+    def latency_stats(self) -> dict:
+        if not self.latencies:
+            return {"inferences": self.inferences, "frames_skipped": self.frames_skipped}
+        latencies_ms = np.array(self.latencies) * 1000
+        return {
+            "inferences": self.inferences,
+            "frames_skipped": self.frames_skipped,
+            "p50_ms": float(np.median(latencies_ms)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "max_ms": float(latencies_ms.max()),
+        }
+
+    def summary(self) -> str:
+        stats = self.latency_stats()
+        if self.error:
+            return f"detector error: {self.error}"
+        if "p50_ms" not in stats:
+            return "detector loading..." if not self.ready_event.is_set() else "detector waiting for frames"
+        return (f"detect p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms | "
+                f"{stats['inferences']} runs, {stats['frames_skipped']} frames skipped")
+
+    def _run(self):
+        try:
+            self.detector = self.detector_factory()
+        except Exception as e:
+            self.error = str(e)
+            print(f"✗ Could not load detector: {e}")
+            return
+        finally:
+            self.ready_event.set()
+
+        sequence = 0
+        while not self._stop_event.is_set():
+            newest, timestamp, frame = self.source.wait_newer(sequence, timeout=0.1)
+            if newest == sequence or frame is None:
+                continue
+            if sequence:
+                self.frames_skipped += newest - sequence - 1
+            sequence = newest
+
+            start = time.perf_counter()
+            try:
+                detections = self.detector.detect(frame)
+            except Exception as e:
+                self.error = str(e)
+                print(f"Detection error: {e}")
+                return
+            latency = time.perf_counter() - start
+            self.latencies.append(latency)
+            self.inferences += 1
+            self.latest = (sequence, timestamp, detections)
+
+            # Leave the CPU to capture, preview and audio for a while, in proportion to what this run cost
+            self._stop_event.wait(latency * (1 / self.max_load - 1))
+
+
+def detection_overlay_source(worker_getter: Callable[[], Optional[DetectionWorker]]):
+    """
+    FrameStage func that puts the cached detections of the current worker
+    into state["detections"] for draw_detections, without touching the frame.
+    """
+    def stage(frame, state):
+        worker = worker_getter()
+        state["detections"] = worker.current_detections() if worker is not None else []
+        return frame
+
+    return stage
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Offline bulk scanner for recorded audio.
+
+Streams long recordings (media/buffer_audio_*.wav, media/recorded_audio_*.ogg,
+...) through SimpleAnimalClassifier in overlapping windows and writes a
+detections index of (file, offset, species, confidence) to CSV or SQLite.
+
+WAV files are memory-mapped, so a segment only pages in the audio it covers.
+Other formats are decoded with soundfile. Segments of every file are
+downmixed, resampled and featurised in a process pool. Scoring runs in the
+main process as one batched matrix call per segment.
+
+Example:
+    python3 scan_recordings.py media --output detections.db
+    python3 scan_recordings.py media/*.wav --output detections.csv --window 3 --hop 1 --min_confidence 0.3
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sqlite3
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd
+from typing import List, Tuple
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from simple_classifier import SimpleAnimalClassifier
+
+AUDIO_EXTENSIONS = (".wav", ".ogg", ".flac", ".mp3")
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def open_wav_memmap(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Memory-map the samples of a PCM or float WAV file.
+
+    Returns:
+        Tuple[np.ndarray, int]: (frames, channels) read-only array in the file's sample type, sample rate
+    """
+    with open(path, "rb") as f:
+        riff, _size, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} is not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size, os.SEEK_CUR)
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)  # chunks are word aligned
+
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk")
+    format_tag, channels, sample_rate, _byte_rate, _block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+    if format_tag == WAVE_FORMAT_PCM and bits in (16, 32):
+        dtype = np.dtype(f"<i{bits // 8}")
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype = np.dtype(f"<f{bits // 8}")
+    else:
+        raise ValueError(f"{path}: unsupported WAV format {format_tag} with {bits} bits")
+
+    frames = min(chunk_size, os.path.getsize(path) - data_offset) // (dtype.itemsize * channels)
+    samples = np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=(frames, channels))
+    return samples, sample_rate
+
+
+def audio_info(path: str) -> Tuple[int, int]:
+    """(frames, sample rate) without decoding the audio"""
+    if path.lower().endswith(".wav"):
+        try:
+            samples, sample_rate = open_wav_memmap(path)
+            return len(samples), sample_rate
+        except ValueError:
+            pass  # e.g. 24-bit, let soundfile handle it
+    import soundfile
+    info = soundfile.info(path)
+    return info.frames, info.samplerate
+
+
+def read_frames(path: str, start: int, stop: int) -> Tuple[np.ndarray, int]:
+    """Frames [start, stop) as float32 (frames, channels), and the sample rate"""
+    if path.lower().endswith(".wav"):
+        try:
+            samples, sample_rate = open_wav_memmap(path)
+            block = np.asarray(samples[start:stop], dtype=np.float32)
+            if samples.dtype.kind == "i":
+                block /= float(np.iinfo(samples.dtype).max) + 1
+            return block, sample_rate
+        except ValueError:
+            pass
+    import soundfile
+    block, sample_rate = soundfile.read(path, start=start, stop=stop, dtype="float32", always_2d=True)
+    return block, sample_rate
+
+
+def _segment_features(task):
+    """
+    Process pool worker: features of every window in one segment of a file.
+
+    Returns (path, window start times in seconds, features or None per window)
+    where None marks a window below the silence threshold.
+    """
+    path, first_start, num_windows, window, hop, target_rate, silence_rms, feature_extractor = task
+    frames, source_rate = audio_info(path)
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+
+    # Segment span in target-rate samples, read with a margin so the
+    # resampling filter has context at both ends
+    span_start = first_start
+    span_stop = first_start + (num_windows - 1) * hop + window
+    margin = target_rate // 10
+    # Start on a multiple of `down` source samples, so the first resampled sample
+    # is exactly at target position source_start * up / down and the windows
+    # land on whole samples of the resampled block
+    source_start = max(0, (span_start - margin) * source_rate // target_rate) // down * down
+    source_stop = min(frames, (span_stop + margin) * source_rate // target_rate + 1)
+    block, _ = read_frames(path, source_start, source_stop)
+    mono = block.mean(axis=1)
+    if up != down:
+        mono = resample_poly(mono, up, down).astype(np.float32)
+    offset = span_start - source_start // down * up
+
+    starts, features = [], []
+    for i in range(num_windows):
+        begin = offset + i * hop
+        clip = mono[begin:begin + window]
+        starts.append((first_start + i * hop) / target_rate)
+        if len(clip) == 0 or np.sqrt(np.mean(np.square(clip))) < silence_rms:
+            features.append(None)
+        else:
+            features.append(feature_extractor.extract_features(clip))
+    return path, starts, features
+
+
+def plan_segments(path: str, window: int, hop: int, target_rate: int, windows_per_segment: int) -> List[Tuple[int, int]]:
+    """(first window start, number of windows) per segment, in target-rate samples"""
+    frames, source_rate = audio_info(path)
+    length = frames * target_rate // source_rate
+    total_windows = 1 if length <= window else (length - window) // hop + 1
+    return [
+        (first * hop, min(windows_per_segment, total_windows - first))
+        for first in range(0, total_windows, windows_per_segment)
+    ]
+
+
+class DetectionWriter:
+    """Writes detection rows to a CSV file or an SQLite database, by extension"""
+
+    COLUMNS = ("file", "offset_seconds", "duration_seconds", "rank", "species", "confidence")
+
+    def __init__(self, output: str):
+        self.output = output
+        self.sqlite = output.lower().endswith((".db", ".sqlite", ".sqlite3"))
+        if self.sqlite:
+            self.connection = sqlite3.connect(output)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS detections ("
+                "file TEXT, offset_seconds REAL, duration_seconds REAL, rank INTEGER, species TEXT, confidence REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS detections_species ON detections (species, confidence)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS detections_file ON detections (file, offset_seconds)")
+        else:
+            self.file = open(output, "w", newline="")
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(self.COLUMNS)
+
+    def clear_file(self, path: str):
+        """Drop earlier rows of a file that is being rescanned (SQLite only)"""
+        if self.sqlite:
+            self.connection.execute("DELETE FROM detections WHERE file = ?", (path,))
+
+    def finish_file(self):
+        """Commit a file's rows, together with the clear_file that preceded them"""
+        if self.sqlite:
+            self.connection.commit()
+        else:
+            self.file.flush()
+
+    def write(self, rows):
+        if self.sqlite:
+            self.connection.executemany("INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?)", rows)
+        else:
+            self.csv.writerows(rows)
+
+    def close(self):
+        """Close the output. An SQLite file that wasn't finished keeps its earlier rows"""
+        if self.sqlite:
+            self.connection.close()
+        else:
+            self.file.close()
+
+
+def find_recordings(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(os.path.join(item, f) for f in sorted(os.listdir(item)) if f.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            paths.extend(sorted(glob.glob(item)))
+    return paths
+
+
+def scan(paths: List[str], classifier: SimpleAnimalClassifier, writer: DetectionWriter, window_seconds: float,
+         hop_seconds: float, top_k: int, min_confidence: float, silence_rms: float, workers: int,
+         segment_seconds: float = 60.0) -> dict:
+    target_rate = classifier.sample_rate
+    window = int(window_seconds * target_rate)
+    hop = int(hop_seconds * target_rate)
+    windows_per_segment = max(1, int(segment_seconds * target_rate) // hop)
+
+    tasks = []
+    for path in paths:
+        for first_start, num_windows in plan_segments(path, window, hop, target_rate, windows_per_segment):
+            tasks.append((path, first_start, num_windows, window, hop, target_rate, silence_rms, classifier.feature_extractor))
+
+    stats = {"files": len(paths), "segments": len(tasks), "windows": 0, "silent_windows": 0, "detections": 0}
+    start = time.perf_counter()
+    current_path = None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields in task order, so each file's segments arrive together
+        for done, (path, starts, features) in enumerate(executor.map(_segment_features, tasks), 1):
+            if path != current_path:
+                if current_path is not None:
+                    writer.finish_file()
+                writer.clear_file(path)
+                current_path = path
+            stats["windows"] += len(features)
+            audible = [i for i, f in enumerate(features) if f is not None]
+            stats["silent_windows"] += len(features) - len(audible)
+            rows = []
+            if audible:
+                scores = classifier.score_features(np.stack([features[i] for i in audible]))
+                ranked = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+                for i, clip_scores, order in zip(audible, scores, ranked):
+                    for rank, class_index in enumerate(order, 1):
+                        if clip_scores[class_index] >= min_confidence:
+                            rows.append((path, round(starts[i], 3), window_seconds, rank,
+                                         classifier.animal_classes[class_index], float(clip_scores[class_index])))
+            writer.write(rows)
+            stats["detections"] += len(rows)
+            print(f"  [{done}/{len(tasks)}] {os.path.basename(path)} @ {starts[0]:.0f}s: "
+                  f"{len(audible)}/{len(features)} windows classified, {len(rows)} detections")
+    if current_path is not None:
+        writer.finish_file()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-classify recordings into a detections index")
+    parser.add_argument("inputs", nargs="+", help="Audio files, globs or directories")
+    parser.add_argument("--output", default="detections.csv", help="Output .csv, or .db/.sqlite for SQLite")
+    parser.add_argument("--window", type=float, default=3.0, help="Window length in seconds")
+    parser.add_argument("--hop", type=float, default=1.5, help="Seconds between window starts")
+    parser.add_argument("--top_k", type=int, default=3, help="Predictions stored per window")
+    parser.add_argument("--min_confidence", type=float, default=0.2, help="Minimum score to store a prediction")
+    parser.add_argument("--silence_rms", type=float, default=0.003, help="Windows quieter than this are skipped")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--audio_dir", default="ECE4191 - Potential Audio Targets", help="Reference recordings (for training if no model)")
+    parser.add_argument("--model", default="simple_animal_classifier.pkl", help="Classifier model path")
+    args = parser.parse_args()
+
+    paths = find_recordings(args.inputs)
+    if not paths:
+        print("No recordings found")
+        return
+    print(f"Scanning {len(paths)} recordings ({args.window}s windows every {args.hop}s)...")
+
+    classifier = SimpleAnimalClassifier(args.audio_dir, model_path=args.model)
+    writer = DetectionWriter(args.output)
+    try:
+        stats = scan(paths, classifier, writer, args.window, args.hop, args.top_k,
+                     args.min_confidence, args.silence_rms, args.workers)
+    finally:
+        writer.close()
+
+    audio_hours = stats["windows"] * args.hop / 3600
+    print(f"✓ {stats['windows']} windows ({stats['silent_windows']} silent) from {stats['files']} files in "
+          f"{stats['seconds']:.1f}s (~{audio_hours * 3600 / max(stats['seconds'], 1e-9):.0f}x real time), "
+          f"{stats['detections']} detections written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
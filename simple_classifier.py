@@ -5,22 +5,22 @@ Designed for maximum accuracy on specific target recordings
 """
 
 import numpy as np
-import librosa
 import sounddevice as sd
 import os
 import pickle
 import logging
 from datetime import datetime
-from typing import List, Tuple, Dict
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Tuple
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
+from audio_features import FEATURE_LENGTH, fused_features
+from audio_processing import AudioRingBuffer, DurationHistogram
+from classifier_artifact import load_artifact, save_artifact
+
 class SimpleAudioFeatureExtractor:
     """Extract robust audio features for classification"""
     
@@ -40,73 +40,45 @@ class SimpleAudioFeatureExtractor:
                 audio_data = np.pad(audio_data, (0, min_length - len(audio_data)), mode='constant')
             
             # Normalize audio
-            if np.max(np.abs(audio_data)) > 0:
-                audio_data = audio_data / np.max(np.abs(audio_data))
+            peak = np.max(np.abs(audio_data))
+            if peak > 0:
+                audio_data = audio_data / peak
             else:
-                return np.zeros(50)  # Return zeros for silent audio
-            
-            features = []
-            
-            # MFCC features - most important for animal sounds
-            try:
-                mfccs = librosa.feature.mfcc(y=audio_data, sr=self.sr, n_mfcc=self.n_mfcc)
-                # Statistical features from MFCCs
-                features.extend(np.mean(mfccs, axis=1))  # 13 features
-                features.extend(np.std(mfccs, axis=1))   # 13 features
-                features.extend(np.max(mfccs, axis=1))   # 13 features
-                features.extend(np.min(mfccs, axis=1))   # 13 features
-            except:
-                features.extend(np.zeros(52))
-            
-            # Spectral features
-            try:
-                spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=self.sr)[0]
-                features.append(np.mean(spectral_centroids))
-                features.append(np.std(spectral_centroids))
-            except:
-                features.extend([0.0, 0.0])
-            
-            # Zero crossing rate
-            try:
-                zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
-                features.append(np.mean(zcr))
-                features.append(np.std(zcr))
-            except:
-                features.extend([0.0, 0.0])
-            
-            # RMS Energy
-            try:
-                rms = librosa.feature.rms(y=audio_data)[0]
-                features.append(np.mean(rms))
-                features.append(np.std(rms))
-            except:
-                features.extend([0.0, 0.0])
+                return np.zeros(FEATURE_LENGTH)  # Return zeros for silent audio
             
-            # Pad to ensure consistent length
-            while len(features) < 58:
-                features.append(0.0)
-            
-            return np.array(features[:58])  # Ensure consistent length
+            # MFCC, spectral centroid, zero crossing rate and RMS energy
+            # statistics, all from one STFT
+            return fused_features(audio_data, sr=self.sr, n_mfcc=self.n_mfcc)
             
         except Exception as e:
             print(f"Error extracting features: {e}")
-            return np.zeros(58)
+            return np.zeros(FEATURE_LENGTH)
 
 class SimpleAnimalClassifier:
     """Simplified real-time animal audio classification system"""
     
-    def __init__(self, audio_dir: str, model_path: str = "simple_animal_classifier.pkl"):
+    # Reference recordings in audio_dir that are used for training
+    audio_extensions = ('.mp3',)
+    
+    def __init__(self, audio_dir: str, model_path: str = "simple_animal_classifier.pkl",
+                 cache_dir: str = None, training_workers: int = None, audio_extensions: Tuple[str, ...] = None):
         self.audio_dir = audio_dir
+        if audio_extensions is not None:
+            self.audio_extensions = tuple(audio_extensions)
         self.model_path = model_path
+        self.cache_dir = cache_dir  # decoded audio / features cache used when training, None for the default
+        self.training_workers = training_workers
         self.feature_extractor = SimpleAudioFeatureExtractor()
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.model = None
         self.animal_classes = []
         self.reference_features = {}
+        self._reference_cache = None  # stacked reference_features, rebuilt after load/train
         self.is_listening = False
-        self.audio_buffer = []
+        self.audio_buffer = None  # AudioRingBuffer, created by start_listening
         self.buffer_duration = 3.0
         self.sample_rate = 22050
+        self.block_size = 1024
         
         self.setup_logging()
         self.load_or_train_model()
@@ -132,65 +104,33 @@ class SimpleAnimalClassifier:
             name = name[:-1]
         return name
     
-    def load_reference_audio(self) -> Dict[str, List[np.ndarray]]:
-        """Load all reference audio files"""
-        audio_files = [f for f in os.listdir(self.audio_dir) if f.endswith('.mp3')]
-        audio_data = {}
-        
-        print(f"Loading {len(audio_files)} reference audio files...")
-        
-        for filename in audio_files:
-            filepath = os.path.join(self.audio_dir, filename)
-            animal_name = self.extract_animal_name(filename)
-            
-            try:
-                audio, sr = librosa.load(filepath, sr=self.sample_rate)
-                if animal_name not in audio_data:
-                    audio_data[animal_name] = []
-                audio_data[animal_name].append(audio)
-                print(f"✓ Loaded {filename} -> {animal_name}")
-            except Exception as e:
-                print(f"✗ Error loading {filename}: {e}")
-        
-        self.animal_classes = sorted(audio_data.keys())
+    def prepare_training_data_cached(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Prepare augmented training data in parallel, reusing cached audio/features"""
+        # Training only: librosa decoding and the process pool stay out of artifact loading
+        from classifier_training import DEFAULT_CACHE_DIR, build_training_set
+        X, y, self.animal_classes, self.training_stats = build_training_set(
+            self.audio_dir,
+            self.feature_extractor,
+            self.extract_animal_name,
+            sample_rate=self.sample_rate,
+            cache_dir=self.cache_dir or DEFAULT_CACHE_DIR,
+            max_workers=self.training_workers,
+            extensions=self.audio_extensions,
+        )
         print(f"Found {len(self.animal_classes)} animal classes")
-        return audio_data
-    
-    def prepare_training_data(self, audio_data: Dict[str, List[np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare training data"""
-        X = []
-        y = []
-        
-        print("Extracting features...")
-        
-        for animal_name, audio_list in audio_data.items():
-            class_idx = self.animal_classes.index(animal_name)
-            
-            for i, audio in enumerate(audio_list):
-                print(f"  Processing {animal_name} sample {i+1}/{len(audio_list)}")
-                
-                # Extract features from original audio
-                features = self.feature_extractor.extract_features(audio)
-                X.append(features)
-                y.append(class_idx)
-                
-                # Simple augmentation - add slight noise
-                try:
-                    noisy_audio = audio + 0.005 * np.random.randn(len(audio))
-                    features_noisy = self.feature_extractor.extract_features(noisy_audio)
-                    X.append(features_noisy)
-                    y.append(class_idx)
-                except:
-                    pass
-        
-        print(f"Generated {len(X)} training samples")
-        return np.array(X), np.array(y)
+        return X, y
     
     def train_model(self, X: np.ndarray, y: np.ndarray):
         """Train the classification model"""
+        if len(X) == 0:
+            raise ValueError("No training samples, check the reference audio directory")
         print("Training model...")
+        # sklearn is only needed to train, loading uses the .npz artifact
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
         
         # Scale features
+        self.scaler = StandardScaler()
         X_scaled = self.scaler.fit_transform(X)
         
         # Use Random Forest - simple and effective
@@ -203,14 +143,40 @@ class SimpleAnimalClassifier:
         self.model.fit(X_scaled, y)
         
         # Store reference features for similarity matching
+        self._reference_cache = None
         for i, animal_name in enumerate(self.animal_classes):
             class_features = X_scaled[y == i]
             self.reference_features[animal_name] = np.mean(class_features, axis=0)
         
         print("Model training completed!")
     
+    @property
+    def artifact_path(self) -> str:
+        """Flat-array copy of the model, loadable without sklearn"""
+        return os.path.splitext(self.model_path)[0] + ".npz"
+    
+    def save_artifact(self):
+        try:
+            save_artifact(self.artifact_path, self.model, self.scaler, self.animal_classes, self.reference_features)
+            print(f"✓ Model artifact saved to {self.artifact_path}")
+        except Exception as e:
+            print(f"✗ Error saving model artifact: {e}")
+    
     def load_or_train_model(self):
         """Load existing model or train new one"""
+        # The artifact is only trusted if it isn't older than the pickle it came from
+        if os.path.exists(self.artifact_path) and (
+                not os.path.exists(self.model_path)
+                or os.path.getmtime(self.artifact_path) >= os.path.getmtime(self.model_path)):
+            print("Loading existing model artifact...")
+            try:
+                self.model, self.scaler, self.animal_classes, self.reference_features = load_artifact(self.artifact_path)
+                self._reference_cache = None
+                print("✓ Model loaded successfully!")
+                return
+            except Exception as e:
+                print(f"✗ Error loading model artifact: {e}, trying {self.model_path}...")
+
         if os.path.exists(self.model_path):
             print("Loading existing model...")
             try:
@@ -220,14 +186,16 @@ class SimpleAnimalClassifier:
                     self.scaler = data['scaler']
                     self.animal_classes = data['classes']
                     self.reference_features = data['reference_features']
+                    self._reference_cache = None
                 print("✓ Model loaded successfully!")
+                # Next start can skip unpickling
+                self.save_artifact()
                 return
             except Exception as e:
                 print(f"✗ Error loading model: {e}, training new one...")
         
         # Train new model
-        audio_data = self.load_reference_audio()
-        X, y = self.prepare_training_data(audio_data)
+        X, y = self.prepare_training_data_cached()
         self.train_model(X, y)
         
         # Save model
@@ -242,61 +210,161 @@ class SimpleAnimalClassifier:
             print(f"✓ Model saved to {self.model_path}")
         except Exception as e:
             print(f"✗ Error saving model: {e}")
+        self.save_artifact()
     
+    def _reference_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Unit-norm reference features stacked in class order, and which classes have one"""
+        if self._reference_cache is not None:
+            return self._reference_cache
+        has_reference = np.array([name in self.reference_features for name in self.animal_classes])
+        references = np.zeros((len(self.animal_classes), len(self.scaler.mean_)))
+        for i, animal_name in enumerate(self.animal_classes):
+            if has_reference[i]:
+                references[i] = self.reference_features[animal_name]
+        norms = np.linalg.norm(references, axis=1, keepdims=True)
+        references = references / np.where(norms == 0, 1.0, norms)
+        self._reference_cache = (references, has_reference)
+        return self._reference_cache
+
+    def score_features(self, features: np.ndarray) -> np.ndarray:
+        """Combined model/similarity scores for a (clips, 58) feature matrix, (clips, classes)"""
+        features_scaled = self.scaler.transform(features)
+
+        # Get prediction probabilities
+        if hasattr(self.model, 'predict_proba'):
+            probabilities = self.model.predict_proba(features_scaled)
+        else:
+            # Fallback if no predict_proba
+            predictions = self.model.predict(features_scaled)
+            probabilities = np.zeros((len(features_scaled), len(self.animal_classes)))
+            probabilities[np.arange(len(predictions)), predictions] = 1.0
+
+        # Cosine similarity to every class reference in one matrix product
+        references, has_reference = self._reference_matrix()
+        norms = np.linalg.norm(features_scaled, axis=1, keepdims=True)
+        similarities = (features_scaled / np.where(norms == 0, 1.0, norms)) @ references.T
+
+        # Combine model prediction with similarity
+        combined = np.maximum(0, 0.7 * probabilities + 0.3 * similarities)
+        return np.where(has_reference, combined, probabilities)
+
+    def predict_batch(self, clips: List[np.ndarray], top_k: int = 3, max_workers: int = None) -> List[List[Tuple[str, float]]]:
+        """
+        Predict animals for many clips at once, e.g. overlapping stream windows
+        or saved recordings.
+
+        Args:
+            clips: Audio clips at self.sample_rate
+            top_k: Number of (animal, score) pairs returned per clip
+            max_workers: Feature extraction threads, None for the executor default
+
+        Returns:
+            List[List[Tuple[str, float]]]: top_k predictions per clip, best first.
+            Silent (all-zero) clips get ("Unknown", 0.0) entries and are never scored
+        """
+        unknown = [("Unknown", 0.0)] * top_k
+        results = [unknown] * len(clips)
+        audible = [i for i, clip in enumerate(clips) if len(clip) and np.any(clip)]
+        if not audible:
+            return results
+        if len(audible) == 1:
+            features = [self.feature_extractor.extract_features(clips[audible[0]])]
+        else:
+            # numpy FFT/BLAS release the GIL, so threads overlap most of the work
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                features = list(executor.map(self.feature_extractor.extract_features, [clips[i] for i in audible]))
+
+        scores = self.score_features(np.stack(features))
+        # Stable sort keeps class order for equal scores, like sorted() on the dict did
+        ranked = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        for i, clip_scores, order in zip(audible, scores, ranked):
+            results[i] = [(self.animal_classes[j], float(clip_scores[j])) for j in order]
+        return results
+
+    def predict_features(self, features: np.ndarray, top_k: int = 3) -> List[Tuple[str, float]]:
+        """Predict animal from one precomputed feature vector, e.g. IncrementalFeatureExtractor's"""
+        try:
+            if not np.any(features):
+                return [("Unknown", 0.0)] * top_k  # silent window
+            scores = self.score_features(features[None, :])[0]
+            order = np.argsort(-scores, kind='stable')[:top_k]
+            return [(self.animal_classes[j], float(scores[j])) for j in order]
+
+        except Exception as e:
+            print(f"Error in prediction: {e}")
+            return [("Unknown", 0.0)] * top_k
+
     def predict_animal(self, audio_data: np.ndarray) -> List[Tuple[str, float]]:
         """Predict animal from audio with confidence scores"""
         try:
-            # Extract features
-            features = self.feature_extractor.extract_features(audio_data)
-            features_scaled = self.scaler.transform([features])
-            
-            # Get prediction probabilities
-            if hasattr(self.model, 'predict_proba'):
-                probabilities = self.model.predict_proba(features_scaled)[0]
-            else:
-                # Fallback if no predict_proba
-                prediction = self.model.predict(features_scaled)[0]
-                probabilities = np.zeros(len(self.animal_classes))
-                probabilities[prediction] = 1.0
-            
-            # Combine with similarity scores
-            similarities = {}
-            for i, animal_name in enumerate(self.animal_classes):
-                if animal_name in self.reference_features:
-                    ref_features = self.reference_features[animal_name]
-                    similarity = cosine_similarity([features_scaled[0]], [ref_features])[0][0]
-                    # Combine model prediction with similarity
-                    combined_score = 0.7 * probabilities[i] + 0.3 * similarity
-                    similarities[animal_name] = max(0, combined_score)
-                else:
-                    similarities[animal_name] = probabilities[i]
-            
-            # Sort by score and return top 3
-            sorted_predictions = sorted(similarities.items(), key=lambda x: x[1], reverse=True)
-            return sorted_predictions[:3]
+            return self.predict_batch([audio_data])[0]
             
         except Exception as e:
             print(f"Error in prediction: {e}")
             return [("Unknown", 0.0), ("Unknown", 0.0), ("Unknown", 0.0)]
     
-    def audio_callback(self, indata, frames, time, status):
-        """Callback for real-time audio input"""
+    def audio_callback(self, indata, frames, time_info, status):
+        """Callback for real-time audio input, copies into the ring buffer and returns"""
+        start = time.perf_counter()
         if status:
-            print(f"Audio status: {status}")
-        
-        # Convert to mono
-        if len(indata.shape) > 1:
-            audio_chunk = np.mean(indata, axis=1)
-        else:
-            audio_chunk = indata.flatten()
+            # Reported by the inference worker, printing here could stall the stream
+            self.callback_status_count += 1
+            self.last_callback_status = status
         
-        # Add to buffer
-        self.audio_buffer.extend(audio_chunk)
-        
-        # Keep buffer at desired duration
-        max_buffer_size = int(self.buffer_duration * self.sample_rate)
-        if len(self.audio_buffer) > max_buffer_size:
-            self.audio_buffer = self.audio_buffer[-max_buffer_size:]
+        # Stream is mono, write() takes the (frames, 1) block as a view
+        self.audio_buffer.write(indata)
+        self._audio_ready.set()
+        self.callback_histogram.record(time.perf_counter() - start)
+    
+    def _inference_worker(self):
+        """Classify each consecutive buffer_duration window as it fills"""
+        window = int(self.buffer_duration * self.sample_rate)
+        next_end = self.audio_buffer.total_written + window
+        reported_status = 0
+        while self.is_listening:
+            self._audio_ready.wait(timeout=0.5)
+            self._audio_ready.clear()
+            if self.callback_status_count != reported_status:
+                print(f"Audio status: {self.last_callback_status} ({self.callback_status_count} total)")
+                reported_status = self.callback_status_count
+            if self.audio_buffer.total_written < next_end:
+                continue
+            if not self.audio_buffer.is_available(next_end, window):
+                # Inference fell a whole buffer behind, resume from the newest window
+                self.windows_skipped += 1
+                next_end = self.audio_buffer.total_written
+            # View into the ring, stays valid while the next window is recorded
+            audio_data = self.audio_buffer.window(next_end, window)
+            next_end += window
+            
+            # Check for meaningful audio
+            if np.max(np.abs(audio_data)) > 0.01:
+                predictions = self.predict_animal(audio_data)
+                
+                # Display results
+                print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')} - 🎵 Audio Analysis:")
+                print("=" * 50)
+                
+                for i, (animal, confidence) in enumerate(predictions, 1):
+                    confidence_percent = confidence * 100
+                    emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
+                    print(f"{emoji} #{i}: {animal:<15} ({confidence_percent:6.2f}%)")
+                
+                # Log prediction
+                top_prediction = predictions[0]
+                log_msg = f"TOP: {top_prediction[0]} ({top_prediction[1]*100:.2f}%) | ALL: {', '.join([f'{name}({conf*100:.1f}%)' for name, conf in predictions])}"
+                self.logger.info(log_msg)
+                
+                print("=" * 50)
+            else:
+                print(f"⏰ {datetime.now().strftime('%H:%M:%S')} - 🔇 Low audio level...")
+    
+    def print_callback_report(self):
+        """Callback duration histogram, to check the capture callback never underruns"""
+        print("📈 Audio callback durations:")
+        for line in self.callback_histogram.summary_lines():
+            print(f"   {line}")
+        print(f"   stream status flags: {self.callback_status_count}, windows skipped: {self.windows_skipped}")
     
     def start_listening(self):
         """Start real-time audio classification"""
@@ -305,52 +373,38 @@ class SimpleAnimalClassifier:
         print(f"🔊 Listening for {self.buffer_duration} seconds per prediction...")
         print("🎯 Press Ctrl+C to stop\n")
         
+        # Two windows, so the one being classified isn't overwritten while the next records
+        self.audio_buffer = AudioRingBuffer(2 * int(self.buffer_duration * self.sample_rate), sample_rate=self.sample_rate)
+        self.callback_histogram = DurationHistogram(self.block_size / self.sample_rate)
+        self.callback_status_count = 0
+        self.last_callback_status = None
+        self.windows_skipped = 0
+        self._audio_ready = threading.Event()
+        
         self.is_listening = True
-        self.audio_buffer = []
+        worker = threading.Thread(target=self._inference_worker, daemon=True)
         
         try:
             with sd.InputStream(
                 callback=self.audio_callback,
                 channels=1,
                 samplerate=self.sample_rate,
-                blocksize=1024
+                blocksize=self.block_size,
+                dtype='float32'
             ):
-                while self.is_listening:
-                    time.sleep(self.buffer_duration)
-                    
-                    if len(self.audio_buffer) >= int(self.buffer_duration * self.sample_rate):
-                        audio_data = np.array(self.audio_buffer)
-                        
-                        # Check for meaningful audio
-                        if np.max(np.abs(audio_data)) > 0.01:
-                            predictions = self.predict_animal(audio_data)
-                            
-                            # Display results
-                            print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')} - 🎵 Audio Analysis:")
-                            print("=" * 50)
-                            
-                            for i, (animal, confidence) in enumerate(predictions, 1):
-                                confidence_percent = confidence * 100
-                                emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
-                                print(f"{emoji} #{i}: {animal:<15} ({confidence_percent:6.2f}%)")
-                            
-                            # Log prediction
-                            top_prediction = predictions[0]
-                            log_msg = f"TOP: {top_prediction[0]} ({top_prediction[1]*100:.2f}%) | ALL: {', '.join([f'{name}({conf*100:.1f}%)' for name, conf in predictions])}"
-                            self.logger.info(log_msg)
-                            
-                            print("=" * 50)
-                        else:
-                            print(f"⏰ {datetime.now().strftime('%H:%M:%S')} - 🔇 Low audio level...")
-                        
-                        self.audio_buffer = []
+                worker.start()
+                while self.is_listening and worker.is_alive():
+                    time.sleep(0.5)
                         
         except KeyboardInterrupt:
             print("\n\n🛑 Stopping audio classification...")
-            self.is_listening = False
         except Exception as e:
             print(f"\n❌ Error during audio capture: {e}")
+        finally:
             self.is_listening = False
+            if worker.is_alive():
+                worker.join(timeout=5)
+            self.print_callback_report()
 
 def main():
     """Main function"""
@@ -0,0 +1,117 @@
+"""
+Phase timing and memory instrumentation for slow startup work.
+
+    profiler = StartupProfiler("audio_classifier")
+    with profiler.phase("import librosa"):
+        import librosa
+    profiler.write_json("classifier_startup_log.jsonl")
+
+Memory is the process resident set size, read with psutil when installed
+and from the OS directly otherwise (None where neither works).
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes, or None if unavailable"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if sys.platform.startswith("linux"):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+class StartupProfiler:
+    """Records wall time and RSS change of named startup phases.
+
+    Args:
+        name: What is starting up, stored in the log
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self.phases = []
+        self.error = None
+        self._start_rss = current_rss_bytes()
+
+    @contextmanager
+    def phase(self, phase_name: str):
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        except Exception as e:
+            self.error = f"{phase_name}: {e}"
+            raise
+        finally:
+            rss_after = current_rss_bytes()
+            self.phases.append({
+                "phase": phase_name,
+                "seconds": time.perf_counter() - start,
+                "rss_delta_mb": None if rss_before is None else (rss_after - rss_before) / 2 ** 20,
+                "ok": ok,
+            })
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase["seconds"] for phase in self.phases)
+
+    def as_dict(self) -> dict:
+        rss = current_rss_bytes()
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_seconds": self.total_seconds,
+            "rss_mb": None if rss is None else rss / 2 ** 20,
+            "rss_delta_mb": None if rss is None or self._start_rss is None else (rss - self._start_rss) / 2 ** 20,
+            "phases": self.phases,
+            "error": self.error,
+        }
+
+    def summary_lines(self) -> list:
+        """One line per phase plus a total, for display"""
+        lines = []
+        for phase in self.phases:
+            memory = "" if phase["rss_delta_mb"] is None else f", {phase['rss_delta_mb']:+.0f} MB"
+            failed = "" if phase["ok"] else " (failed)"
+            lines.append(f"   {phase['phase']}: {phase['seconds'] * 1000:.0f} ms{memory}{failed}")
+        summary = self.as_dict()
+        memory = "" if summary["rss_mb"] is None else f", RSS {summary['rss_mb']:.0f} MB ({summary['rss_delta_mb']:+.0f} MB)"
+        lines.append(f"   total: {summary['total_seconds']:.2f} s{memory}")
+        return lines
+
+    def write_json(self, path: str):
+        """Append this run as one JSON line, so the log keeps a startup history"""
+        with open(path, "a") as f:
+            f.write(json.dumps(self.as_dict()) + "\n")
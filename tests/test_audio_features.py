@@ -0,0 +1,98 @@
+"""
+Checks audio_features.fused_features against the separate librosa
+mfcc/spectral_centroid/zero_crossing_rate/rms calls it replaced, on fixed
+deterministic clips. The saved classifiers were trained on the librosa
+features, so the two must agree within float32 rounding.
+
+Tolerances: MFCC statistics (dB scale, magnitudes up to a few hundred) to
+rtol 1e-4 / atol 1e-3; centroid (Hz), ZCR and RMS statistics to rtol 1e-4 /
+atol 1e-6.
+
+Example:
+    python3 -m pytest -q tests/test_audio_features.py
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+# Get the parent directory path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from audio_features import FEATURE_LENGTH, N_FFT, fused_features
+
+SR = 22050
+N_MFCC = 13
+MFCC_STATS = 4 * N_MFCC  # mean, std, max, min of each coefficient
+
+
+def librosa_features(audio: np.ndarray, sr: int = SR, n_mfcc: int = N_MFCC) -> np.ndarray:
+    mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc)
+    centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)[0]
+    zcr = librosa.feature.zero_crossing_rate(audio)[0]
+    rms = librosa.feature.rms(y=audio)[0]
+    return np.concatenate((
+        np.mean(mfccs, axis=1), np.std(mfccs, axis=1), np.max(mfccs, axis=1), np.min(mfccs, axis=1),
+        [np.mean(centroid), np.std(centroid), np.mean(zcr), np.std(zcr), np.mean(rms), np.std(rms)],
+    ))
+
+
+def make_clips() -> dict:
+    """Peak-normalised float32 clips, as extract_features passes them"""
+    rng = np.random.default_rng(1234)
+    t = np.arange(2 * SR) / SR
+    tone = 0.5 * np.sin(2 * np.pi * 1000 * t)
+    noise = rng.standard_normal(len(t))
+    chirp = np.sin(2 * np.pi * (800 + 400 * np.sin(3 * t)) * t) * np.hanning(len(t))
+    short = chirp[SR // 2:SR // 2 + N_FFT + 300] + 0.01 * noise[:N_FFT + 300]
+    clips = {
+        "tone": tone,
+        "noise": noise,
+        "short_clip": short,
+    }
+    clips = {name: (clip / np.max(np.abs(clip))).astype(np.float32) for name, clip in clips.items()}
+    clips["silence"] = np.zeros(SR, dtype=np.float32)
+    return clips
+
+
+CLIPS = make_clips()
+
+
+@pytest.mark.parametrize("name", sorted(CLIPS))
+def test_fused_features_match_librosa(name):
+    audio = CLIPS[name]
+    expected = librosa_features(audio)
+    actual = fused_features(audio, sr=SR, n_mfcc=N_MFCC)
+
+    assert actual.shape == (FEATURE_LENGTH,)
+    assert expected.shape == (FEATURE_LENGTH,)
+    assert np.all(np.isfinite(actual))
+    np.testing.assert_allclose(actual[:MFCC_STATS], expected[:MFCC_STATS], rtol=1e-4, atol=1e-3,
+                               err_msg=f"{name}: MFCC statistics")
+    np.testing.assert_allclose(actual[MFCC_STATS:], expected[MFCC_STATS:], rtol=1e-4, atol=1e-6,
+                               err_msg=f"{name}: centroid/ZCR/RMS statistics")
+
+
+def test_feature_layout():
+    """58 = 13 MFCCs x (mean, std, max, min) + (mean, std) of centroid, ZCR and RMS"""
+    assert FEATURE_LENGTH == MFCC_STATS + 3 * 2 == 58
+
+    features = fused_features(CLIPS["tone"], sr=SR, n_mfcc=N_MFCC)
+    mean, std, high, low = np.split(features[:MFCC_STATS], 4)
+    assert np.all(std >= 0)
+    assert np.all(low <= mean) and np.all(mean <= high)
+
+    centroid_mean, centroid_std, zcr_mean, zcr_std, rms_mean, rms_std = features[MFCC_STATS:]
+    # A 1 kHz tone: centroid near 1 kHz, about 2 crossings per cycle
+    assert 900 < centroid_mean < 1100
+    assert zcr_mean == pytest.approx(2 * 1000 / SR, rel=0.05)
+    assert 0 < rms_mean <= 1 and centroid_std >= 0 and zcr_std >= 0 and rms_std >= 0
+
+
+def test_silence_has_no_spectral_content():
+    centroid_mean, _, zcr_mean, _, rms_mean, _ = fused_features(CLIPS["silence"], sr=SR)[MFCC_STATS:]
+    assert centroid_mean == 0 and zcr_mean == 0 and rms_mean == 0
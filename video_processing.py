@@ -0,0 +1,345 @@
+"""
+Video capture off the Tk thread.
+
+FrameGrabber reads a cv2.VideoCapture on its own thread, so a stalled
+network stream never blocks the UI. Each frame gets a sequence number and a
+monotonic capture timestamp and goes into a LatestFrameSlot. The display
+only ever renders the newest frame. Listeners (rolling buffer, recorder) are
+called on the capture thread with every frame exactly once.
+
+EncodedFrameBuffer keeps the rolling "save past clip" history as JPEG
+frames with timestamps instead of raw arrays. StreamRecorder is a listener
+that streams every frame to a video file on its own writer thread.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class LatestFrameSlot:
+    """Thread-safe holder of the newest frame, older frames are simply replaced."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self.sequence = 0  # number of frames put so far, 0 means empty
+
+    def put(self, frame: np.ndarray, timestamp: float) -> int:
+        with self._condition:
+            self._frame = frame
+            self._timestamp = timestamp
+            self.sequence += 1
+            self._condition.notify_all()
+            return self.sequence
+
+    def get(self) -> Tuple[int, float, Optional[np.ndarray]]:
+        """(sequence, timestamp, frame) of the newest frame"""
+        with self._condition:
+            return self.sequence, self._timestamp, self._frame
+
+    def wait_newer(self, sequence: int, timeout: float = None) -> Tuple[int, float, Optional[np.ndarray]]:
+        """Block until a frame newer than sequence arrives, returns get() (unchanged on timeout)"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence > sequence, timeout=timeout)
+            return self.sequence, self._timestamp, self._frame
+
+
+class FrameGrabber:
+    """Reads frames from a video source on a background thread.
+
+    Args:
+        source: URL/device passed to cv2.VideoCapture, opened on the capture
+            thread since connecting can block too, or an already opened
+            capture (anything with read()/release())
+        name: Thread name, for debugging
+    """
+
+    def __init__(self, source, name: str = "frame-grabber"):
+        self.source = source
+        self.capture = None if isinstance(source, (str, int)) else source
+        self.opened_event = threading.Event()
+        self.slot = LatestFrameSlot()
+        self.frames_read = 0
+        self.read_failures = 0
+        self.last_read_seconds = 0.0
+        self.started_at = None
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def add_listener(self, listener: Callable[[int, float, np.ndarray], None]):
+        """Call listener(sequence, timestamp, frame) on the capture thread for every new frame."""
+        with self._listeners_lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener):
+        with self._listeners_lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread.start()
+
+    def stop(self, timeout: float = 0):
+        """
+        Ask the thread to stop, it releases the capture itself once the current
+        read returns. Waits up to timeout seconds, 0 never blocks the caller.
+        """
+        self._stop_event.set()
+        if timeout and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self._stop_event.is_set()
+
+    @property
+    def read_fps(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return self.frames_read / max(time.monotonic() - self.started_at, 1e-9)
+
+    def _run(self):
+        if self.capture is None:
+            self.capture = cv2.VideoCapture(self.source)
+        self.opened_event.set()
+        try:
+            while not self._stop_event.is_set():
+                start = time.monotonic()
+                ret, frame = self.capture.read()
+                now = time.monotonic()
+                self.last_read_seconds = now - start
+                if not ret:
+                    self.read_failures += 1
+                    # End of file or dropped connection, don't spin
+                    self._stop_event.wait(0.05)
+                    continue
+                self.frames_read += 1
+                sequence = self.slot.put(frame, now)
+                for listener in self._listeners:
+                    try:
+                        listener(sequence, now, frame)
+                    except Exception as e:
+                        print(f"Frame listener error: {e}")
+        finally:
+            self.capture.release()
+
+
+class EncodedFrameBuffer:
+    """Rolling buffer of JPEG-encoded frames with their capture timestamps.
+
+    Holds the last max_seconds of video (and at most max_frames frames) at a
+    fraction of the memory of raw frames. Reads hand out references to the
+    stored (timestamp, jpeg) entries, which are immutable, so a snapshot can be
+    exported while the buffer keeps filling.
+
+    Args:
+        max_seconds: Age of the oldest frame kept, by capture timestamp
+        max_frames: Hard cap on the number of frames
+        quality: JPEG quality (0-100)
+    """
+
+    def __init__(self, max_seconds: float, max_frames: int = None, quality: int = 90):
+        self.max_seconds = max_seconds
+        self.quality = quality
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        self._frames = deque(maxlen=max_frames)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.frame_shape = None
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __bool__(self):
+        return len(self._frames) > 0
+
+    def append(self, timestamp: float, frame: np.ndarray):
+        """Encode and store a frame, dropping frames older than max_seconds."""
+        ok, encoded = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            return
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.nbytes -= self._frames[0][1].nbytes
+            self._frames.append((timestamp, encoded))
+            self.nbytes += encoded.nbytes
+            self.frame_shape = frame.shape
+            while self._frames and timestamp - self._frames[0][0] > self.max_seconds:
+                self.nbytes -= self._frames.popleft()[1].nbytes
+
+    def snapshot(self, seconds: float = None) -> list:
+        """(timestamp, jpeg) entries, oldest first, optionally only the last seconds"""
+        with self._lock:
+            frames = list(self._frames)
+        if seconds is not None and frames:
+            newest = frames[-1][0]
+            frames = [entry for entry in frames if newest - entry[0] <= seconds]
+        return frames
+
+    @staticmethod
+    def decode(entry) -> np.ndarray:
+        """BGR frame of a snapshot entry"""
+        return cv2.imdecode(entry[1], cv2.IMREAD_COLOR)
+
+    @staticmethod
+    def measured_fps(frames: list, default: float) -> float:
+        """Frame rate implied by the timestamps of a snapshot"""
+        if len(frames) < 2 or frames[-1][0] <= frames[0][0]:
+            return default
+        return (len(frames) - 1) / (frames[-1][0] - frames[0][0])
+
+
+class StreamRecorder:
+    """Writes the frames of a FrameGrabber to a video file as they arrive.
+
+    Register on_frame as a FrameGrabber listener. Each frame is queued once
+    (by sequence number, by reference) and written by a writer thread, so
+    nothing accumulates in memory. Frames are placed on a constant-rate
+    grid by their capture timestamps so the file plays back in real time:
+    a gap in the stream repeats the last frame, frames arriving faster than
+    the file rate are dropped. All of these are counted, drops separately
+    for a full queue (dropped_full) and for the file rate (dropped_rate).
+
+    Args:
+        output_file: Video file to write
+        fps: Frame rate of the file, best set to the measured stream rate
+        max_seconds: Stop by itself after this much video (capture time)
+        on_finished: Called with the recorder on the writer thread once the
+            file is closed
+        fourcc: Codec of the file
+        max_queued: Frames that may wait for the writer before new ones are dropped
+    """
+
+    def __init__(self, output_file: str, fps: float, max_seconds: float = None,
+                 on_finished: Callable[["StreamRecorder"], None] = None, fourcc: str = "mp4v",
+                 max_queued: int = 120):
+        self.output_file = output_file
+        self.fps = fps
+        self.max_seconds = max_seconds
+        self.on_finished = on_finished
+        self.fourcc = fourcc
+        self.frames_received = 0
+        self.frames_written = 0
+        self.frames_repeated = 0  # extra copies written to fill stream gaps
+        # Each counter has a single writer thread
+        self.dropped_full = 0  # capture thread: the writer fell behind and the queue was full
+        self.dropped_rate = 0  # writer thread: arrived faster than the file rate
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.error = None
+        self._last_sequence = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._stopping = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stream-recorder", daemon=True)
+        self._thread.start()
+
+    def on_frame(self, sequence: int, timestamp: float, frame: np.ndarray):
+        """FrameGrabber listener, runs on the capture thread"""
+        if self._stopping.is_set() or sequence <= self._last_sequence:
+            return
+        self._last_sequence = sequence
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        if self.max_seconds is not None and timestamp - self.first_timestamp >= self.max_seconds:
+            self.stop()
+            return
+        try:
+            self._queue.put_nowait((timestamp, frame))
+        except queue.Full:
+            self.dropped_full += 1
+
+    def stop(self):
+        """Stop taking frames, the writer finishes the queued ones and closes the file"""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass  # never block the caller (capture or Tk thread), the writer sees _stopping once the queue drains
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._finished.wait(timeout)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def duration(self) -> float:
+        if self.first_timestamp is None or self.last_timestamp is None:
+            return 0.0
+        return self.last_timestamp - self.first_timestamp + 1 / self.fps
+
+    @property
+    def achieved_fps(self) -> float:
+        """Rate unique frames arrived at while recording"""
+        if self.frames_received < 2 or self.last_timestamp <= self.first_timestamp:
+            return 0.0
+        return (self.frames_received - 1) / (self.last_timestamp - self.first_timestamp)
+
+    def summary(self, nominal_fps: float = None) -> str:
+        nominal = f" (nominal {nominal_fps:g})" if nominal_fps else ""
+        return (f"{self.output_file}: {self.duration:.1f}s, {self.frames_received} frames at "
+                f"{self.achieved_fps:.1f} fps{nominal}, written at {self.fps:.1f} fps with "
+                f"{self.frames_repeated} repeated, {self.dropped_rate} dropped for the rate and "
+                f"{self.dropped_full} dropped behind a full queue")
+
+    def _run(self):
+        writer = None
+        pending = None  # newest frame not yet written for its grid slot
+        slot = 0
+        half_slot = 0.5 / self.fps
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break
+                    continue
+                if item is None:
+                    break
+                timestamp, frame = item
+                self.frames_received += 1
+                self.last_timestamp = timestamp
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.output_file, cv2.VideoWriter_fourcc(*self.fourcc),
+                                             self.fps, (width, height))
+                    if not writer.isOpened():
+                        raise IOError(f"could not open video writer for {self.output_file}")
+                if pending is not None:
+                    # Every slot that ends before this frame shows the pending one
+                    copies = 0
+                    while self.first_timestamp + slot / self.fps + half_slot < timestamp:
+                        writer.write(pending)
+                        copies += 1
+                        slot += 1
+                    self.frames_written += copies
+                    self.frames_repeated += max(0, copies - 1)
+                    self.dropped_rate += copies == 0
+                pending = frame
+
+            if pending is not None:
+                writer.write(pending)
+                self.frames_written += 1
+        except Exception as e:
+            self.error = str(e)
+            print(f"Recording error: {e}")
+            self._stopping.set()
+        finally:
+            if writer is not None:
+                writer.release()
+            self._finished.set()
+            if self.on_finished is not None:
+                self.on_finished(self)